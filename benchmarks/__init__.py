@@ -0,0 +1,13 @@
+"""
+Benchmarks for the static site generator.
+
+Run from the repository root:
+    python3 -m benchmarks --help
+"""
+import os
+import sys
+
+# The generator modules live in src/ and import each other by bare name
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
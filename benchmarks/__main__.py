@@ -0,0 +1,101 @@
+"""
+Run the benchmark suite and write the results as JSON.
+
+Examples:
+    python3 -m benchmarks --micro
+    python3 -m benchmarks --sizes 10,1000,10000 --jobs 1,0 --out results.json
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import subprocess
+
+from benchmarks.corpus import DEFAULT_INLINE, DEFAULT_MIX
+from benchmarks.end_to_end import run_end_to_end
+from benchmarks.micro import run_micro
+
+
+def parse_weights(text, defaults):
+    """
+    Parse "heading=3,code=0" into a copy of defaults with those values replaced.
+    """
+    weights = dict(defaults)
+    for item in filter(None, text.split(",")):
+        key, _, value = item.partition("=")
+        if key not in weights:
+            raise argparse.ArgumentTypeError(f"Unknown key {key!r} (expected one of {', '.join(weights)})")
+        weights[key] = float(value)
+    return weights
+
+
+def parse_ints(text):
+    return [int(value) for value in text.split(",")]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--micro", action="store_true", help="Run only the microbenchmarks")
+    parser.add_argument("--e2e", action="store_true", help="Run only the end-to-end build benchmarks")
+    parser.add_argument("--sizes", type=parse_ints, default=[10, 1000],
+                        help="Comma-separated page counts for end-to-end builds (default: 10,1000)")
+    parser.add_argument("--jobs", type=parse_ints, default=[1],
+                        help="Comma-separated --jobs values for end-to-end builds (default: 1)")
+    parser.add_argument("--micro-pages", type=int, default=200,
+                        help="Number of pages in the microbenchmark corpus (default: 200)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per microbenchmark (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed (default: 0)")
+    parser.add_argument("--mix", type=lambda text: parse_weights(text, DEFAULT_MIX), default=DEFAULT_MIX,
+                        help="Block type weights, e.g. heading=3,code=0 (keys: " + ", ".join(DEFAULT_MIX) + ")")
+    parser.add_argument("--inline", type=lambda text: parse_weights(text, DEFAULT_INLINE), default=DEFAULT_INLINE,
+                        help="Inline element chance per word, e.g. link=0.1 (keys: " + ", ".join(DEFAULT_INLINE) + ")")
+    parser.add_argument("--work-dir", help="Generate the end-to-end sites here and keep them")
+    parser.add_argument("--out", default="benchmark-results.json", help="JSON results file (default: benchmark-results.json)")
+    return parser.parse_args(argv)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_results(title, results):
+    print(title)
+    for item in results:
+        label = item["name"] if "jobs" not in item else f"{item['name']} ({item['pages']} pages, -j {item['jobs']})"
+        print(f"  {label:<40} {item['seconds'] * 1000:10.2f} ms {item['pages_per_s']:10.1f} pages/s "
+              f"{item['mb_per_s']:8.2f} MB/s {item['peak_memory_mb']:8.2f} MB peak")
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    run_all = not (args.micro or args.e2e)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "mix": args.mix,
+        "inline": args.inline,
+    }
+    if run_all or args.micro:
+        report["micro"] = run_micro(args.micro_pages, args.seed, args.mix, args.inline, args.repeat)
+        print_results(f"Microbenchmarks ({args.micro_pages} pages):", report["micro"])
+    if run_all or args.e2e:
+        report["end_to_end"] = run_end_to_end(args.sizes, args.seed, args.mix, args.inline,
+                                              args.jobs, args.work_dir, keep=args.work_dir is not None)
+        print_results("End-to-end builds:", report["end_to_end"])
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
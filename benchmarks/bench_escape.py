@@ -0,0 +1,150 @@
+"""
+Measure what HTML escaping costs, against the same code without escaping,
+on generated pages: leaf text is escaped when a LeafNode is created, and
+the serializer writes it as it is.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_escape
+"""
+import time
+from contextlib import contextmanager
+
+import benchmarks  # noqa: F401 (puts src/ on sys.path)
+from benchmarks.corpus import CorpusGenerator
+from htmlnode import FrozenProps, LeafNode, ParentNode
+from markdown_to_html import markdown_to_html_node
+
+
+def raw_props_to_html(props):
+    html_props = ""
+    for prop, value in props.items():
+        html_props += f' {prop}="{value}"'
+    return html_props
+
+
+@contextmanager
+def raw_leaves():
+    """
+    Create LeafNodes as they would be without escaping: the value is kept
+    as it is given.
+    """
+    init = LeafNode.__init__
+
+    def raw_init(self, tag, value, props=None):
+        super(LeafNode, self).__init__(tag, value, None, props)
+
+    LeafNode.__init__ = raw_init
+    try:
+        yield
+    finally:
+        LeafNode.__init__ = init
+
+
+def unescaped_to_html(node, batch_size=None):
+    """
+    ParentNode.to_html as it would be without escaping: htmlnode._serialize
+    line for line, with leaf and attribute values written raw.
+    """
+    pieces = []
+    append = pieces.append
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    countdown = batch_size or -1
+    children = iter((node,))
+    closing_tag = None
+    while True:
+        for item in children:
+            cls = item.__class__
+            if cls is LeafNode and item.value is not None:
+                value = item.value
+                tag = item.tag
+                if tag is None:
+                    append(value)
+                else:
+                    props = item.props
+                    if props:
+                        attributes = props.html if props.__class__ is FrozenProps else raw_props_to_html(props)
+                        append(f"<{tag}{attributes}>{value}</{tag}>")
+                    else:
+                        append(f"<{tag}>{value}</{tag}>")
+                continue
+
+            countdown -= 1
+            if countdown == 0:
+                countdown = batch_size
+
+            if cls is ParentNode and item.tag is not None and item.children is not None:
+                tag = item.tag
+                props = item.props
+                if props:
+                    attributes = props.html if props.__class__ is FrozenProps else raw_props_to_html(props)
+                    opening_tag = f"<{tag}{attributes}>"
+                else:
+                    opening_tag = f"<{tag}>"
+                nested_children = item.children
+                nested_closing_tag = f"</{tag}>"
+                if len(nested_children) == 1:
+                    child = nested_children[0]
+                    if child.__class__ is LeafNode and child.tag is None and child.value is not None:
+                        append(f"{opening_tag}{child.value}{nested_closing_tag}")
+                        continue
+                append(opening_tag)
+            else:
+                nested = item._write_parts(pieces)
+                if nested is None:
+                    continue
+                nested_children, nested_closing_tag = nested
+
+            push((children, closing_tag))
+            children = iter(nested_children)
+            closing_tag = nested_closing_tag
+            break
+        else:
+            if closing_tag is not None:
+                append(closing_tag)
+            if not stack:
+                break
+            children, closing_tag = pop()
+    return "".join(pieces)
+
+
+def run_time(function, arguments):
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return time.perf_counter() - start
+
+
+def bench(name, documents, rounds=40):
+    trees = [markdown_to_html_node(document) for document in documents]
+    with raw_leaves():
+        raw_trees = [markdown_to_html_node(document) for document in documents]
+
+    # Interleave the escaped and unescaped runs and keep each one's best
+    # round, which cancels out most machine noise
+    parse = raw_parse = serialize = raw_serialize = float("inf")
+    for _ in range(rounds):
+        parse = min(parse, run_time(markdown_to_html_node, documents))
+        with raw_leaves():
+            raw_parse = min(raw_parse, run_time(markdown_to_html_node, documents))
+        serialize = min(serialize, run_time(ParentNode.to_html, trees))
+        raw_serialize = min(raw_serialize, run_time(unescaped_to_html, raw_trees))
+    print(f"{name:<36} serializing {raw_serialize * 1000:7.2f} ms unescaped, {serialize * 1000:7.2f} ms escaped "
+          f"({100 * (serialize - raw_serialize) / raw_serialize:+5.1f}%); "
+          f"escaping leaves when created {100 * (parse - raw_parse) / raw_parse:+4.1f}% of parsing")
+
+
+def main():
+    generator = CorpusGenerator(seed=0)
+    documents = [generator.page() for _ in range(300)]
+    assert all(markdown_to_html_node(d).to_html() == unescaped_to_html(markdown_to_html_node(d)) for d in documents)
+    bench("300 pages, no special characters", documents)
+
+    noisy = [document.replace(" the ", " a < b & c ") for document in documents]
+    assert "a &lt; b &amp; c" in markdown_to_html_node(noisy[0]).to_html()
+    bench("300 pages, frequent < and &", noisy)
+
+
+if __name__ == "__main__":
+    main()
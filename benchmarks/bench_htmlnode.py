@@ -0,0 +1,93 @@
+"""
+Compare the streaming HTMLNode serializer with the previous recursive one.
+
+Run from the repository root:
+    python3 benchmarks/bench_htmlnode.py
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from htmlnode import LeafNode, ParentNode
+
+
+def recursive_to_html(node):
+    """
+    The serializer ParentNode.to_html used before write_html: recursive,
+    with the children's output built by string concatenation.
+    """
+    if isinstance(node, LeafNode):
+        return node.to_html()
+    props_html = ""
+    for prop, value in (node.props or {}).items():
+        props_html += f' {prop}="{value}"'
+    children_html = ""
+    for child in node.children:
+        children_html += recursive_to_html(child)
+    return f"<{node.tag}{props_html}>{children_html}</{node.tag}>"
+
+
+def wide_list(items):
+    return ParentNode("ul", [
+        ParentNode("li", [LeafNode(None, f"Item {i} with "), LeafNode("b", "bold"), LeafNode(None, " text")])
+        for i in range(items)
+    ])
+
+
+def big_table(rows, cols):
+    return ParentNode("table", [
+        ParentNode("tr", [ParentNode("td", [LeafNode(None, f"r{r}c{c}")], {"class": "cell"}) for c in range(cols)])
+        for r in range(rows)
+    ])
+
+
+def deep_tree(depth):
+    node = LeafNode(None, "core")
+    for _ in range(depth):
+        node = ParentNode("div", [node])
+    return node
+
+
+def bench(name, node, number):
+    new_time = min(timeit.repeat(node.to_html, number=number, repeat=7)) / number
+    try:
+        old_time = min(timeit.repeat(lambda: recursive_to_html(node), number=number, repeat=7)) / number
+        speedup = f"{old_time / new_time:5.2f}x"
+        old_text = f"{old_time * 1000:9.2f} ms"
+    except RecursionError:
+        speedup = "    n/a"
+        old_text = "RecursionError"
+    print(f"{name:<24} recursive {old_text:>14}   streaming {new_time * 1000:9.2f} ms   {speedup}")
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def bench_memory(name, node):
+    with open(os.devnull, "w") as devnull:
+        streamed = peak_memory(lambda: node.write_html(devnull))
+    recursive = peak_memory(lambda: recursive_to_html(node))
+    print(f"{name:<24} peak extra memory: recursive {recursive / 1e6:7.2f} MB   "
+          f"write_html to a file {streamed / 1e6:7.2f} MB")
+
+
+def main():
+    assert wide_list(10).to_html() == recursive_to_html(wide_list(10))
+    bench("list, 1k items", wide_list(1_000), 50)
+    bench("list, 100k items", wide_list(100_000), 3)
+    bench("table, 1000x20", big_table(1_000, 20), 3)
+    bench("nesting, depth 500", deep_tree(500), 50)
+    bench("nesting, depth 50k", deep_tree(50_000), 3)
+    bench_memory("list, 100k items", wide_list(100_000))
+
+
+if __name__ == "__main__":
+    main()
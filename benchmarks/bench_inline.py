@@ -0,0 +1,57 @@
+"""
+Compare the single-pass inline scanner with the previous five-pass pipeline
+on a paragraph-heavy generated corpus.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_inline
+"""
+import timeit
+
+import benchmarks  # noqa: F401 (puts src/ on sys.path)
+from benchmarks.corpus import CorpusGenerator
+from markdown_to_textnodes import text_to_textnodes
+from split_nodes import split_nodes_delimiter
+from split_nodes_markdown import split_nodes_image, split_nodes_link
+from textnode import TextNode, TextType
+
+
+def multipass_text_to_textnodes(text):
+    """
+    The pipeline text_to_textnodes used before the scanner: three delimiter
+    passes, then the image and link passes, each building a new node list.
+    """
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    return split_nodes_link(nodes)
+
+
+def paragraphs(count, words, inline=None, seed=0):
+    generator = CorpusGenerator(seed, inline=inline)
+    return [generator.inline_text(words) for _ in range(count)]
+
+
+def bench(name, texts, number):
+    size = sum(len(text.encode()) for text in texts)
+    new_time = min(timeit.repeat(lambda: [text_to_textnodes(t) for t in texts], number=number, repeat=5)) / number
+    old_time = min(timeit.repeat(lambda: [multipass_text_to_textnodes(t) for t in texts], number=number, repeat=5)) / number
+    print(f"{name:<32} multipass {old_time * 1000:9.2f} ms   scanner {new_time * 1000:9.2f} ms   "
+          f"{old_time / new_time:5.2f}x   ({size / 1e6 / new_time:6.2f} MB/s)")
+
+
+def main():
+    texts = paragraphs(2_000, 60)
+    mismatches = sum(text_to_textnodes(t) != multipass_text_to_textnodes(t) for t in texts)
+    print(f"{mismatches} of {len(texts)} paragraphs differ between the two pipelines")
+
+    bench("2k paragraphs, default mix", texts, 3)
+    bench("2k paragraphs, plain text", paragraphs(2_000, 60, inline={}), 3)
+    bench("2k paragraphs, dense markup", paragraphs(2_000, 60, inline={
+        "bold": 0.15, "italic": 0.15, "code": 0.1, "link": 0.1, "image": 0.05}), 3)
+    bench("200 long paragraphs (600 words)", paragraphs(200, 600), 3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare the memory held by parsed page trees: the slotted node classes and
+the previous dict-based classes.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_nodes [pages, default 500]
+"""
+import sys
+import time
+import tracemalloc
+
+import benchmarks  # noqa: F401 (puts src/ on sys.path)
+from benchmarks.corpus import CorpusGenerator
+from htmlnode import LeafNode, ParentNode
+from markdown_to_html import markdown_to_html_node
+
+
+class DictNode:
+    """
+    The node layout used before __slots__: a per-instance __dict__ and a
+    fresh props dict on every link and image.
+    """
+
+    def __init__(self, tag, value, children, props):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+def to_dict_nodes(node):
+    if isinstance(node, ParentNode):
+        return DictNode(node.tag, None, [to_dict_nodes(child) for child in node.children],
+                        None if node.props is None else dict(node.props))
+    return DictNode(node.tag, node.value, None, None if node.props is None else dict(node.props))
+
+
+def copy_nodes(node):
+    if isinstance(node, ParentNode):
+        return ParentNode(node.tag, [copy_nodes(child) for child in node.children], node.props)
+    return LeafNode(node.tag, node.value, node.props)
+
+
+def count_nodes(node):
+    if isinstance(node, LeafNode):
+        return 1
+    return 1 + sum(count_nodes(child) for child in node.children)
+
+
+def retained(build):
+    """
+    Run build() and return (its result, bytes still allocated by it).
+    """
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    generator = CorpusGenerator(seed=0)
+    documents = [generator.page() for _ in range(pages)]
+
+    start = time.perf_counter()
+    trees = [markdown_to_html_node(document) for document in documents]
+    parse_time = time.perf_counter() - start
+    nodes = sum(count_nodes(tree) for tree in trees)
+
+    # Every layout is measured as a copy of the same trees, so the text
+    # strings themselves (shared by all copies) are not counted
+    _, legacy = retained(lambda: [to_dict_nodes(tree) for tree in trees])
+    _, slotted = retained(lambda: [copy_nodes(tree) for tree in trees])
+
+    print(f"{pages} pages, {nodes} nodes, parsed in {parse_time:.2f} s")
+    print(f"  dict-based nodes (previous) {legacy / 1e6:8.2f} MB  {legacy / nodes:6.1f} bytes/node")
+    print(f"  slotted nodes               {slotted / 1e6:8.2f} MB  {slotted / nodes:6.1f} bytes/node")
+
+
+if __name__ == "__main__":
+    main()
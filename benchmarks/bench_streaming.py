@@ -0,0 +1,71 @@
+"""
+Compare peak memory and time of the in-memory and streaming page pipelines
+on one very large generated markdown file.
+
+Run from the repository root:
+    python3 -m benchmarks.bench_streaming [size in MB, default 50]
+"""
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+from benchmarks import SRC_DIR
+from benchmarks.corpus import TEMPLATE, CorpusGenerator
+
+# Renders the page in a child process so each run's peak RSS is its own (the
+# threshold is lifted so generate_page really keeps the document in memory)
+CHILD = """
+import sys
+sys.path.insert(0, {src!r})
+import generate_page
+generate_page.STREAMING_THRESHOLD = float("inf")
+generate_page.{function}({source!r}, {template!r}, {dest!r})
+"""
+
+
+def write_large_page(path, size):
+    generator = CorpusGenerator(seed=0)
+    written = 0
+    with open(path, "w") as f:
+        written += f.write("# Changelog\n\n")
+        while written < size:
+            # Drop each generated page's own h1 so the file has a single title
+            written += f.write(generator.page().split("\n\n", 1)[1] + "\n")
+    return written
+
+
+def run(function, source, template, dest):
+    code = CHILD.format(src=SRC_DIR, function=function, source=source, template=template, dest=dest)
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"{function} failed")
+    return time.perf_counter() - start, usage.ru_maxrss * 1024
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "changelog.md")
+        template = os.path.join(tmp, "template.html")
+        with open(template, "w") as f:
+            f.write(TEMPLATE)
+        size = write_large_page(source, int(size_mb * 1e6))
+        print(f"Page size: {size / 1e6:.1f} MB")
+
+        outputs = []
+        for label, function in (("in memory", "generate_page"), ("streaming", "generate_page_streaming")):
+            dest = os.path.join(tmp, function, "index.html")
+            seconds, peak = run(function, source, template, dest)
+            outputs.append(dest)
+            print(f"{label:<12} {seconds:8.2f} s {size / 1e6 / seconds:8.2f} MB/s   peak RSS {peak / 1e6:9.1f} MB")
+
+        with open(outputs[0]) as a, open(outputs[1]) as b:
+            print("Outputs identical" if a.read() == b.read() else "Outputs DIFFER")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Deterministic synthetic markdown corpus generator.
+
+The same seed, page count and mix always produce byte-identical files, so
+benchmark results from different commits compare like with like.
+"""
+import os
+import random
+
+# Relative weight of each block type in a generated page
+DEFAULT_MIX = {
+    "paragraph": 6,
+    "heading": 2,
+    "unordered_list": 1,
+    "ordered_list": 1,
+    "code": 1,
+    "quote": 1,
+}
+
+# Chance that an inline element is inserted after any given word of a paragraph
+DEFAULT_INLINE = {
+    "bold": 0.04,
+    "italic": 0.04,
+    "code": 0.02,
+    "link": 0.02,
+    "image": 0.005,
+}
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog ring bearer shire elf dwarf wizard "
+    "mountain river forest road tower sword song light shadow journey fellowship "
+    "council gate bridge stone star ancient hidden silver golden green grey white"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+
+class CorpusGenerator:
+    """
+    Generate markdown pages from a seeded random stream.
+
+    Args:
+        seed: Random seed
+        mix: Block type weights (see DEFAULT_MIX)
+        inline: Inline element probabilities per word (see DEFAULT_INLINE)
+        blocks_per_page: Average number of blocks on a page
+    """
+
+    def __init__(self, seed=0, mix=None, inline=None, blocks_per_page=20):
+        self.rng = random.Random(seed)
+        self.mix = dict(DEFAULT_MIX if mix is None else mix)
+        self.inline = dict(DEFAULT_INLINE if inline is None else inline)
+        self.blocks_per_page = blocks_per_page
+
+    def words(self, count):
+        return " ".join(self.rng.choice(WORDS) for _ in range(count))
+
+    def inline_text(self, word_count):
+        """
+        A run of words sprinkled with bold, italic, code, links and images.
+        """
+        parts = []
+        for _ in range(word_count):
+            parts.append(self.rng.choice(WORDS))
+            roll = self.rng.random()
+            for kind, chance in self.inline.items():
+                if roll < chance:
+                    parts.append(self._inline_element(kind))
+                    break
+                roll -= chance
+        return " ".join(parts)
+
+    def _inline_element(self, kind):
+        text = self.words(self.rng.randint(1, 3))
+        if kind == "bold":
+            return f"**{text}**"
+        if kind == "italic":
+            return f"_{text}_"
+        if kind == "code":
+            return f"`{text}`"
+        if kind == "link":
+            return f"[{text}](/s{self.rng.randint(0, 9):03d}/p{self.rng.randint(0, 999):06d})"
+        return f"![{text}](/images/{self.rng.choice(WORDS)}.png)"
+
+    def block(self, kind):
+        if kind == "paragraph":
+            lines = [self.inline_text(self.rng.randint(8, 16)) for _ in range(self.rng.randint(1, 4))]
+            return "\n".join(lines)
+        if kind == "heading":
+            return "#" * self.rng.randint(2, 4) + " " + self.inline_text(self.rng.randint(2, 6))
+        if kind == "unordered_list":
+            return "\n".join("- " + self.inline_text(self.rng.randint(3, 10)) for _ in range(self.rng.randint(2, 8)))
+        if kind == "ordered_list":
+            return "\n".join(f"{i}. " + self.inline_text(self.rng.randint(3, 10)) for i in range(1, self.rng.randint(3, 9)))
+        if kind == "code":
+            lines = [f"    {self.words(self.rng.randint(2, 6))}()" for _ in range(self.rng.randint(2, 10))]
+            return "```python\ndef " + self.rng.choice(WORDS) + "():\n" + "\n".join(lines) + "\n```"
+        if kind == "quote":
+            return "\n".join("> " + self.inline_text(self.rng.randint(5, 12)) for _ in range(self.rng.randint(1, 3)))
+        raise ValueError(f"Unknown block kind: {kind}")
+
+    def page(self, title=None):
+        """
+        Generate one markdown page starting with an h1 title.
+        """
+        if title is None:
+            title = self.words(self.rng.randint(2, 5)).title()
+        kinds = list(self.mix)
+        weights = [self.mix[kind] for kind in kinds]
+        count = max(1, int(self.rng.gauss(self.blocks_per_page, self.blocks_per_page / 4)))
+        blocks = [f"# {title}"]
+        blocks.extend(self.block(kind) for kind in self.rng.choices(kinds, weights, k=count))
+        return "\n\n".join(blocks) + "\n"
+
+
+def page_path(index):
+    """
+    Relative content path of page number index (100 pages per section).
+    """
+    return os.path.join(f"s{index // 100:03d}", f"p{index:06d}", "index.md")
+
+
+def generate_site(root, pages, seed=0, mix=None, inline=None, blocks_per_page=20):
+    """
+    Write a complete site (content/, static/, template.html) under root.
+
+    Args:
+        root: Directory to create the site in
+        pages: Number of content pages, e.g. 10, 1_000, 10_000 or 100_000
+        seed, mix, inline, blocks_per_page: See CorpusGenerator
+
+    Returns:
+        Total size of the generated markdown in bytes
+    """
+    generator = CorpusGenerator(seed, mix, inline, blocks_per_page)
+    total = 0
+
+    content_dir = os.path.join(root, "content")
+    os.makedirs(content_dir, exist_ok=True)
+    with open(os.path.join(content_dir, "index.md"), "w") as f:
+        total += f.write(generator.page("Benchmark Home"))
+
+    for index in range(pages - 1):
+        path = os.path.join(content_dir, page_path(index))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            total += f.write(generator.page())
+
+    static_dir = os.path.join(root, "static")
+    os.makedirs(static_dir, exist_ok=True)
+    with open(os.path.join(static_dir, "index.css"), "w") as f:
+        f.write("body { font-family: sans-serif; }\n")
+    with open(os.path.join(root, "template.html"), "w") as f:
+        f.write(TEMPLATE)
+    return total
@@ -0,0 +1,78 @@
+"""
+End-to-end build benchmarks.
+
+Each build runs src/main.py in a child process inside a generated site, so
+the measured time includes interpreter start-up, static copying and writing
+every page, and the peak memory is the child's own maximum resident set.
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+
+from benchmarks import SRC_DIR
+from benchmarks.corpus import generate_site
+
+
+def run_build(site_dir, build_args=()):
+    """
+    Build the site in site_dir once.
+
+    Returns:
+        (seconds, peak resident memory in bytes)
+    """
+    command = [sys.executable, os.path.join(SRC_DIR, "main.py"), "/", *build_args]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=site_dir, stdout=subprocess.DEVNULL)
+    # wait4 reports the resources of this child alone (ru_maxrss is in KiB on Linux)
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"Build failed with exit code {process.returncode}: {' '.join(command)}")
+    return seconds, usage.ru_maxrss * 1024
+
+
+def run_end_to_end(sizes, seed=0, mix=None, inline=None, jobs=(1,), work_dir=None, keep=False):
+    """
+    Generate a site per size and time full and no-op incremental builds.
+
+    Args:
+        sizes: Page counts to benchmark, e.g. [10, 1000, 10000, 100000]
+        seed, mix, inline: Corpus options (see CorpusGenerator)
+        jobs: Values of --jobs to benchmark for each size
+        work_dir: Directory for the generated sites (default: a temporary one)
+        keep: Keep the generated sites after the run
+
+    Returns:
+        A list of result dicts
+    """
+    root = work_dir or tempfile.mkdtemp(prefix="ssg-bench-")
+    results = []
+    try:
+        for pages in sizes:
+            site_dir = os.path.join(root, f"site-{pages}")
+            if os.path.exists(site_dir):
+                shutil.rmtree(site_dir)
+            size = generate_site(site_dir, pages, seed, mix, inline)
+
+            for job_count in jobs:
+                build_args = ["--jobs", str(job_count)]
+                for name, extra in (("full build", ["--force"]), ("no-op build", [])):
+                    seconds, peak = run_build(site_dir, build_args + extra)
+                    results.append({
+                        "name": name,
+                        "jobs": job_count,
+                        "seconds": seconds,
+                        "pages": pages,
+                        "bytes": size,
+                        "pages_per_s": pages / seconds,
+                        "mb_per_s": size / 1e6 / seconds,
+                        "peak_memory_mb": peak / 1e6,
+                    })
+    finally:
+        if not keep and work_dir is None:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
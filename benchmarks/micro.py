@@ -0,0 +1,88 @@
+"""
+Microbenchmarks for the markdown pipeline stages.
+
+Every stage runs over the same in-memory corpus of generated pages, so the
+numbers of one stage can be compared against another and across commits.
+"""
+import time
+import tracemalloc
+
+import benchmarks  # noqa: F401 (puts src/ on sys.path)
+from benchmarks.corpus import CorpusGenerator
+from block_type import block_to_block_type
+from markdown_to_blocks import markdown_to_blocks
+from markdown_to_html import markdown_to_html_node
+from markdown_to_textnodes import text_to_textnodes
+
+
+def measure(fn, repeat=5):
+    """
+    Time fn and record the peak memory it allocates.
+
+    Args:
+        fn: Callable taking no arguments
+        repeat: Number of timed runs; the fastest one is reported
+
+    Returns:
+        (best seconds, peak traced bytes)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    # Memory is measured in a separate run so tracing does not skew the timings
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def result(name, seconds, peak, pages, size):
+    return {
+        "name": name,
+        "seconds": seconds,
+        "pages": pages,
+        "bytes": size,
+        "pages_per_s": pages / seconds if seconds else None,
+        "mb_per_s": size / 1e6 / seconds if seconds else None,
+        "peak_memory_mb": peak / 1e6,
+    }
+
+
+def run_micro(pages=200, seed=0, mix=None, inline=None, repeat=5):
+    """
+    Run every microbenchmark over a generated corpus.
+
+    Args:
+        pages: Number of generated pages
+        seed, mix, inline: Corpus options (see CorpusGenerator)
+        repeat: Timed runs per benchmark
+
+    Returns:
+        A list of result dicts
+    """
+    generator = CorpusGenerator(seed, mix, inline)
+    documents = [generator.page() for _ in range(pages)]
+    size = sum(len(document.encode()) for document in documents)
+
+    # Inputs for the later stages are prepared outside the timed region
+    blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    paragraphs = [block for block in blocks if not block.startswith(("#", "```", "- ", "1. ", ">"))]
+    trees = [markdown_to_html_node(document) for document in documents]
+
+    stages = [
+        ("markdown_to_blocks", lambda: [markdown_to_blocks(document) for document in documents]),
+        ("block_to_block_type", lambda: [block_to_block_type(block) for block in blocks]),
+        ("text_to_textnodes", lambda: [text_to_textnodes(text) for text in paragraphs]),
+        ("markdown_to_html_node", lambda: [markdown_to_html_node(document) for document in documents]),
+        ("to_html", lambda: [tree.to_html() for tree in trees]),
+    ]
+
+    results = []
+    for name, fn in stages:
+        seconds, peak = measure(fn, repeat)
+        results.append(result(name, seconds, peak, pages, size))
+    return results
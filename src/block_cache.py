@@ -0,0 +1,234 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from build_manifest import BUILD_DIR, generator_version
+from output_staging import atomic_write
+
+# Default cap on the HTML kept in memory, in characters
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+DEFAULT_BLOCK_DIR = os.path.join(BUILD_DIR, "blocks")
+
+# The active block cache, or None when block caching is off
+_cache = None
+
+
+class BlockCache:
+    """
+    Memoizes the rendered HTML of markdown blocks.
+
+    Entries are keyed by a hash of the block text, the renderer version (a
+    hash of the generator's source, so changing the code never serves stale
+    HTML) and the URL rewriter's configuration. Recently used fragments are
+    kept in an in-memory LRU capped at max_size characters; with a directory
+    every fragment is also stored on disk, one file per block, so later runs
+    and other worker processes reuse it. Disk entries are grouped in one
+    subdirectory per version, so prune() can drop every entry no later run
+    will look up.
+
+    An entry can also carry metadata next to its HTML (e.g. the word count
+    and links of a block, see markdown_to_html), stored on disk as a JSON
+    file instead of an HTML file.
+
+    Args:
+        max_size: Cap on the total length of the fragments kept in memory
+        directory: Optional on-disk store, e.g. ".build/blocks"
+        version: Version the entries depend on (default: generator_version())
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, directory=None, version=None):
+        self.max_size = max_size
+        self.directory = directory
+        self.version = generator_version() if version is None else version
+        self.pid = os.getpid()
+        self.worker = False
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def key(self, block, context=None):
+        """
+        Return the cache key of a block rendered in a given context.
+
+        Args:
+            block: The markdown text of the block
+            context: Anything else the output depends on, e.g. UrlRewriter.key()
+        """
+        digest = hashlib.sha256(f"{self.version}\0{context!r}\0".encode())
+        digest.update(block.encode())
+        return digest.hexdigest()
+
+    def _version_directory(self):
+        return os.path.join(self.directory, self.version[:16])
+
+    def _path(self, key, extension=".html"):
+        return os.path.join(self._version_directory(), key[:2], key[2:] + extension)
+
+    def prune(self):
+        """
+        Delete the disk entries stored for other versions.
+
+        Returns:
+            The number of directories removed
+        """
+        if self.directory is None or not os.path.isdir(self.directory):
+            return 0
+        current = os.path.basename(self._version_directory())
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name != current and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def get(self, key):
+        """
+        Look up a fragment, counting the hit or miss.
+
+        Returns:
+            The cached HTML, or None
+        """
+        entry = self._lookup(key, ".html")
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """
+        Look up a fragment stored with metadata, counting the hit or miss.
+
+        Returns:
+            (html, metadata) as given to put, or None
+        """
+        return self._lookup(key, ".json")
+
+    def _lookup(self, key, extension):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        if self.directory is not None:
+            try:
+                with open(self._path(key, extension), 'r') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                pass
+            else:
+                if extension == ".json":
+                    data = json.loads(data)
+                    entry = (data["html"], data["metadata"])
+                else:
+                    entry = (data, None)
+                self._remember(key, entry)
+                with self._lock:
+                    self.hits += 1
+                return entry
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, html, metadata=None):
+        """
+        Store a freshly rendered fragment, and optionally its metadata (any
+        JSON-serializable value, read back with get_entry).
+        """
+        self._remember(key, (html, metadata))
+        if self.directory is not None:
+            if metadata is None:
+                path, data = self._path(key), html
+            else:
+                path = self._path(key, ".json")
+                data = json.dumps({"html": html, "metadata": metadata}, separators=(",", ":"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, data)
+
+    def _remember(self, key, entry):
+        size = len(entry[0])
+        with self._lock:
+            if key in self._entries or size > self.max_size:
+                return
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[0])
+
+    def take_counts(self):
+        """
+        Return (hits, misses) counted so far and reset them (used by workers
+        to report back to the main process).
+        """
+        with self._lock:
+            counts = (self.hits, self.misses)
+            self.hits = self.misses = 0
+        return counts
+
+    def add_counts(self, counts):
+        """
+        Add (hits, misses) reported by a worker process.
+        """
+        with self._lock:
+            self.hits += counts[0]
+            self.misses += counts[1]
+
+    def summary(self):
+        """
+        Describe the hit rate as one line of text.
+        """
+        lookups = self.hits + self.misses
+        rate = 100 * self.hits / lookups if lookups else 0
+        return f"Block cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)"
+
+
+def enable_block_cache(max_size=DEFAULT_MAX_SIZE, directory=None):
+    """
+    Start caching rendered blocks in this process.
+
+    With a directory, entries stored by other generator versions are
+    deleted first.
+
+    Returns:
+        The active BlockCache
+    """
+    global _cache
+    _cache = BlockCache(max_size, directory)
+    _cache.prune()
+    return _cache
+
+
+def disable_block_cache():
+    """
+    Stop caching rendered blocks.
+    """
+    global _cache
+    _cache = None
+
+
+def get_block_cache():
+    """
+    Return the active BlockCache, or None when block caching is off.
+    """
+    return _cache
+
+
+def worker_block_cache():
+    """
+    Return the block cache for code running in a (possibly forked) worker.
+
+    A forked worker inherits the parent's cache with its entries, which stay
+    valid, and its counters, which are reset so the worker only reports its
+    own lookups.
+    """
+    if _cache is not None and _cache.pid != os.getpid():
+        _cache.pid = os.getpid()
+        _cache.worker = True
+        _cache.hits = _cache.misses = 0
+    return _cache
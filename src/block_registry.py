@@ -0,0 +1,131 @@
+from collections import namedtuple
+
+# A block type: how to recognize it and how to render it
+#   block_type: The value reported for matching blocks, e.g. a BlockType
+#   first_chars: Characters a matching block can start with, or None if the
+#       block may start with anything
+#   detect: detect(lines) -> bool, called only for candidate blocks
+#   render: render(lines, rewriter) -> HTMLNode
+BlockHandler = namedtuple("BlockHandler", ["block_type", "first_chars", "detect", "render"])
+
+
+class BlockRegistry:
+    """
+    Maps markdown blocks to block types and block types to renderers.
+
+    Each handler declares the characters its blocks can start with, so a
+    block is only offered to the handlers registered for its first character
+    (one dict lookup); blocks no handler claims get the default type. Plain
+    paragraphs, which start with a letter, are therefore classified without
+    running any detector.
+
+    Handlers registered later are tried first, so a project can add block
+    types (admonitions, tables) or override a built-in one.
+
+    Args:
+        default_type: The type of blocks no handler claims
+    """
+
+    def __init__(self, default_type):
+        self.default_type = default_type
+        self._handlers = []
+        self._renderers = {}
+        # First character -> candidate detectors, in the order they are tried
+        self._candidates = {}
+        # Candidates for characters no handler names
+        self._anywhere = ()
+        self._key = None
+
+    def register(self, block_type, detect=None, render=None, first_chars=None):
+        """
+        Register how a block type is detected and/or rendered.
+
+        Args:
+            block_type: Any hashable value identifying the block type
+            detect: detect(lines) -> bool; omit for the default type or to
+                only replace the renderer of an existing type
+            render: render(lines, rewriter) -> HTMLNode
+            first_chars: String of characters matching blocks start with,
+                or None to be tried for every block (slower)
+        """
+        if detect is not None:
+            handler = BlockHandler(block_type, first_chars, detect, render)
+            self._handlers.insert(0, handler)
+            self._index()
+        if render is not None:
+            self._renderers[block_type] = render
+        self._key = None
+
+    def unregister(self, block_type):
+        """
+        Remove a block type's detectors and renderer.
+        """
+        self._handlers = [handler for handler in self._handlers if handler.block_type != block_type]
+        self._renderers.pop(block_type, None)
+        self._index()
+        self._key = None
+
+    def _index(self):
+        chars = {char for handler in self._handlers if handler.first_chars for char in handler.first_chars}
+        self._candidates = {
+            char: tuple((handler.block_type, handler.detect) for handler in self._handlers
+                        if handler.first_chars is None or char in handler.first_chars)
+            for char in chars
+        }
+        self._anywhere = tuple((handler.block_type, handler.detect) for handler in self._handlers
+                               if handler.first_chars is None)
+
+    def block_type(self, lines):
+        """
+        Determine the type of a block.
+
+        Args:
+            lines: The lines of the block (at least one), stripped so the
+                first line starts with the block's first character
+
+        Returns:
+            The block type of the first handler whose detector accepts the
+            block, or the default type
+        """
+        first = lines[0]
+        candidates = self._candidates.get(first[:1], self._anywhere)
+        for block_type, detect in candidates:
+            if detect(lines):
+                return block_type
+        return self.default_type
+
+    def render(self, block_type, lines, rewriter=None):
+        """
+        Render a block with the renderer registered for its type.
+
+        Raises:
+            ValueError: If no renderer is registered for the block type
+        """
+        render = self._renderers.get(block_type)
+        if render is None:
+            raise ValueError(f"Unknown block type: {block_type}")
+        return render(lines, rewriter)
+
+    def key(self):
+        """
+        A string identifying the registered handlers, for cache keys.
+        """
+        if self._key is None:
+            self._key = repr((
+                tuple((_name(handler.block_type), handler.first_chars, _name(handler.detect))
+                      for handler in self._handlers),
+                tuple(sorted((_name(block_type), _name(render))
+                             for block_type, render in self._renderers.items())),
+            ))
+        return self._key
+
+
+def _name(value):
+    """
+    A name for a block type or function that is stable between runs.
+    """
+    module = getattr(value, "__module__", None)
+    qualname = getattr(value, "__qualname__", None)
+    if module and qualname:
+        return f"{module}.{qualname}"
+    return repr(value)
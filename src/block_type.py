@@ -1,5 +1,6 @@
 from enum import Enum
 import re
+from block_registry import BlockRegistry
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -9,6 +10,9 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
+# A heading starts with 1-6 # characters followed by a space
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+
 def block_to_block_type(block):
     """
     Determine the type of a markdown block.
@@ -19,29 +23,62 @@ def block_to_block_type(block):
     Returns:
         A BlockType enum value representing the type of the block
     """
-    # Check for heading (starts with 1-6 # characters followed by a space)
-    if re.match(r"^#{1,6} ", block):
-        return BlockType.HEADING
-    
-    # Check for code block (starts and ends with ```)
-    if block.startswith("```") and block.endswith("```"):
-        return BlockType.CODE
+    return block_type_of_lines(block.split("\n"))
+
+def block_type_of_lines(lines):
+    """
+    Determine the type of a markdown block that is already split into lines.
     
-    # Check for quote block (each line starts with >)
-    lines = block.split("\n")
-    if all(line.startswith(">") for line in lines):
-        return BlockType.QUOTE
+    Only the detectors registered for the block's first character run (see
+    BlockRegistry); anything no detector claims is a paragraph.
     
-    # Check for unordered list (each line starts with "- ")
-    if all(line.startswith("- ") for line in lines):
-        return BlockType.UNORDERED_LIST
+    Args:
+        lines: The lines of the block (at least one)
+        
+    Returns:
+        The BlockType (or registered custom type) of the block
+    """
+    return BLOCK_REGISTRY.block_type(lines)
+
+def register_block_type(block_type, detect=None, render=None, first_chars=None):
+    """
+    Register a custom block type with the default registry.
     
-    # Check for ordered list (lines start with 1. 2. 3. etc.)
-    if _is_ordered_list(lines):
-        return BlockType.ORDERED_LIST
+    Example, for "!!! note" admonitions:
+        register_block_type("admonition", lambda lines: lines[0].startswith("!!! "),
+                            render_admonition, first_chars="!")
     
-    # Default to paragraph
-    return BlockType.PARAGRAPH
+    Args:
+        block_type: Any hashable value identifying the block type
+        detect: detect(lines) -> bool, called for blocks starting with one
+            of first_chars
+        render: render(lines, rewriter) -> HTMLNode
+        first_chars: Characters the block can start with; None runs the
+            detector for every block
+    """
+    BLOCK_REGISTRY.register(block_type, detect, render, first_chars)
+
+def _is_heading(lines):
+    # 1-6 # characters followed by a space
+    return HEADING_PATTERN.match(lines[0]) is not None
+
+def _is_code(lines):
+    # Starts and ends with ```
+    return lines[0].startswith("```") and lines[-1].endswith("```")
+
+def _is_quote(lines):
+    # Every line starts with >
+    for line in lines:
+        if line[:1] != ">":
+            return False
+    return True
+
+def _is_unordered_list(lines):
+    # Every line starts with "- "
+    for line in lines:
+        if line[:2] != "- ":
+            return False
+    return True
 
 def _is_ordered_list(lines):
     """
@@ -58,4 +95,12 @@ def _is_ordered_list(lines):
         if not line.startswith(expected_prefix):
             return False
             
-    return True
\ No newline at end of file
+    return True
+
+# The built-in block types; markdown_to_html registers their renderers
+BLOCK_REGISTRY = BlockRegistry(BlockType.PARAGRAPH)
+BLOCK_REGISTRY.register(BlockType.ORDERED_LIST, _is_ordered_list, first_chars="1")
+BLOCK_REGISTRY.register(BlockType.UNORDERED_LIST, _is_unordered_list, first_chars="-")
+BLOCK_REGISTRY.register(BlockType.QUOTE, _is_quote, first_chars=">")
+BLOCK_REGISTRY.register(BlockType.CODE, _is_code, first_chars="`")
+BLOCK_REGISTRY.register(BlockType.HEADING, _is_heading, first_chars="#")
@@ -0,0 +1,427 @@
+import os
+import json
+import hashlib
+import time
+from output_staging import atomic_writer
+
+# Bump this when the manifest layout changes so old manifests are ignored
+MANIFEST_VERSION = 3
+
+# Directory for build state (manifest, staging, caches), kept outside the
+# output directory so it is never deployed along with the site
+BUILD_DIR = ".build"
+DEFAULT_MANIFEST_PATH = os.path.join(BUILD_DIR, "manifest.json")
+
+
+def hash_file(path):
+    """
+    Compute the SHA-256 hex digest of a file's contents.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        The hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def generator_version(src_dir=None):
+    """
+    Compute a version string for the generator code itself.
+
+    Every non-test Python module next to this file is hashed, so any change
+    to the parser or renderer invalidates previously generated pages.
+
+    Args:
+        src_dir: Directory containing the generator modules (default: this module's directory)
+
+    Returns:
+        The hex digest string
+    """
+    if src_dir is None:
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+
+    digest = hashlib.sha256(str(MANIFEST_VERSION).encode())
+    for name in sorted(os.listdir(src_dir)):
+        if not name.endswith('.py') or name.startswith('test_'):
+            continue
+        digest.update(name.encode())
+        digest.update(hash_file(os.path.join(src_dir, name)).encode())
+    return digest.hexdigest()
+
+
+def remove_output_file(path, dest_root):
+    """
+    Delete an output file and any directories left empty by its removal.
+
+    Args:
+        path: The file to delete
+        dest_root: The output directory; it is never removed itself
+    """
+    os.remove(path)
+
+    root = os.path.abspath(dest_root)
+    parent = os.path.dirname(os.path.abspath(path))
+    while parent.startswith(root + os.sep) and not os.listdir(parent):
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
+
+
+def print_explanation(path, reason, manifest=None):
+    """
+    Print why an output file is regenerated, or that it is up to date.
+
+    The path printed is the one the file has in the live output, even while
+    the build writes into a staging directory.
+
+    Args:
+        path: Path of the output file as written by the build
+        reason: The rebuild reason, or None if the file is up to date
+        manifest: Optional BuildManifest of the build
+    """
+    if manifest is not None:
+        path = manifest.live_path(path)
+    if reason is None:
+        print(f"Up to date: {path}")
+    else:
+        print(f"Rebuilding {path}: {reason}")
+
+
+def write_if_changed(path, kind, items, write, manifest=None, explain=False):
+    """
+    Write a generated file (feed, sitemap, search shard) unless the manifest
+    shows it already holds the same items, and record it in the manifest.
+
+    Args:
+        path: Path of the output file
+        kind: Manifest field the fingerprint is kept under, e.g. "sitemap"
+        items: Everything the file's content depends on (hashed with repr)
+        write: Function called with a write(str) function to stream the file
+        manifest: Optional BuildManifest; without one the file is always written
+        explain: Print why the file was (or was not) rewritten
+
+    Returns:
+        True if the file was written
+    """
+    fingerprint = hashlib.sha256(repr(items).encode()).hexdigest()
+    reason = "no manifest" if manifest is None else manifest.listing_rebuild_reason(path, fingerprint, kind)
+    if explain:
+        print_explanation(path, reason, manifest)
+    if reason is not None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with atomic_writer(path) as out:
+            write(out.write)
+    if manifest is not None:
+        manifest.record_listing(path, fingerprint, kind)
+    return reason is not None
+
+
+class BuildManifest:
+    """
+    Persistent record of what the previous build produced.
+
+    The manifest maps every output file (relative to the output directory, so
+    a build can be staged elsewhere and moved into place) to the hash of the
+    markdown file it was rendered from, together with the template hash, generator version and
+    basepath used for the build. A page only needs to be regenerated when one
+    of those inputs changed or its output file disappeared. Each entry also
+    keeps the time its input last changed, used as the sitemap's lastmod,
+    and the URLs the page links to, so links are checked without parsing
+    the markdown again.
+
+    Attributes:
+        live_dir: Where the output is served from; output_dir differs from it
+            while a build is staged
+        options: Build options that change the output without being an
+            input of any single page (e.g. the listing page size)
+    """
+
+    def __init__(self, path, template_path, basepath="/", output_dir="docs"):
+        self.path = path
+        self.output_dir = output_dir
+        self.live_dir = output_dir
+        self.template_hash = hash_file(template_path)
+        self.generator = generator_version()
+        self.basepath = basepath
+        self.options = {}
+        previous = self._load()
+        # Without a usable manifest the outputs of earlier builds are unknown,
+        # so any HTML file this build does not produce counts as stale
+        self.has_previous = previous is not None
+        self.previous = previous if previous is not None else {"version": MANIFEST_VERSION, "pages": {}}
+        self.pages = {}
+        self.static_files = []
+        self._source_hashes = {}
+
+    def _load(self):
+        """
+        Load the previous manifest, returning None if it is missing,
+        unreadable or written by an incompatible version.
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return data
+
+    def reset(self):
+        """
+        Forget the previous build so every page is regenerated.
+
+        The list of synced static files and the output files of the
+        previous build are kept, so files deleted from the static and
+        content directories are still removed from the output.
+        """
+        self.previous = {
+            "version": MANIFEST_VERSION,
+            "pages": {},
+            "static": self.previous_static_files(),
+            "outputs": self.previous_outputs(),
+        }
+
+    def previous_static_files(self):
+        """
+        Relative paths of the static files synced by the previous build.
+        """
+        return self.previous.get("static", [])
+
+    def previous_outputs(self):
+        """
+        Manifest keys of the output files the previous build produced.
+        """
+        return sorted(set(self.previous["pages"]) | set(self.previous.get("outputs", [])))
+
+    def rebuild_reason(self, source_path, dest_path):
+        """
+        Decide whether a page must be regenerated.
+
+        Args:
+            source_path: Path to the markdown file
+            dest_path: Path of the HTML file it renders to
+
+        Returns:
+            A short human-readable reason, or None if the page is up to date
+        """
+        entry = self.previous["pages"].get(self._key(dest_path))
+        if entry is None:
+            return "new page"
+        if self.previous.get("generator") != self.generator:
+            return "generator code changed"
+        if self.previous.get("template") != self.template_hash:
+            return "template changed"
+        if self.previous.get("basepath") != self.basepath:
+            return "basepath changed"
+        if entry.get("source") != source_path:
+            return "source path changed"
+        if not os.path.exists(dest_path):
+            return "output missing"
+        if entry.get("hash") != self.source_hash(source_path):
+            return "source changed"
+        return None
+
+    def listing_rebuild_reason(self, dest_path, fingerprint, kind="listing"):
+        """
+        Decide whether a generated listing page (or feed, or sitemap) must be
+        regenerated.
+
+        Args:
+            dest_path: Path of the output file
+            fingerprint: Hash of the listing's entries (see listing_pages)
+            kind: "listing", "feed", "sitemap" or "search"
+
+        Returns:
+            A short human-readable reason, or None if the page is up to date
+        """
+        key = self._key(dest_path)
+        entry = self.pages.get(key)
+        if entry is None:
+            entry = self.previous["pages"].get(key)
+            if entry is None:
+                return "new page"
+            if self.previous.get("generator") != self.generator:
+                return "generator code changed"
+            if self.previous.get("template") != self.template_hash:
+                return "template changed"
+            if self.previous.get("basepath") != self.basepath:
+                return "basepath changed"
+        # else it was written earlier in this build (or watch session)
+        if entry.get(kind) != fingerprint:
+            return "listed pages changed"
+        if not os.path.exists(dest_path):
+            return "output missing"
+        return None
+
+    def record_listing(self, dest_path, fingerprint, kind="listing"):
+        """
+        Record a generated listing page (or feed, or sitemap) as present in
+        the current build.
+        """
+        key = self._key(dest_path)
+        self.pages[key] = {kind: fingerprint, "updated": self._updated(key, kind, fingerprint)}
+
+    def _updated(self, key, field, value):
+        """
+        When an output last changed: kept from the earlier entry while its
+        input (field) is the same, else now, as a W3C datetime in UTC.
+        """
+        for pages in (self.pages, self.previous["pages"]):
+            entry = pages.get(key)
+            if entry is not None and entry.get(field) == value and "updated" in entry:
+                return entry["updated"]
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    def keep_previous(self):
+        """
+        Carry the previous build over unchanged, for a build that found
+        nothing to do.
+        """
+        self.pages = dict(self.previous["pages"])
+        self.static_files = self.previous_static_files()
+
+    def live_path(self, dest_path):
+        """
+        The path an output file of this build has in the live output.
+        """
+        return os.path.join(self.live_dir, self._key(dest_path))
+
+    def lastmod(self, dest_path):
+        """
+        When an output of this build last changed, or None if it is unknown.
+        """
+        entry = self.pages.get(self._key(dest_path))
+        return None if entry is None else entry.get("updated")
+
+    def _key(self, dest_path):
+        """
+        Manifest key of an output file: its path relative to the output directory.
+        """
+        return os.path.relpath(dest_path, self.output_dir)
+
+    def source_hash(self, source_path):
+        """
+        Hash a source file once per build, however many pages it renders to.
+        """
+        if source_path not in self._source_hashes:
+            self._source_hashes[source_path] = hash_file(source_path)
+        return self._source_hashes[source_path]
+
+    def invalidate(self, source_path):
+        """
+        Drop the cached hash of a source file that changed during this build.
+        """
+        self._source_hashes.pop(source_path, None)
+
+    def record(self, source_path, dest_path, links=None):
+        """
+        Record a page as present in the current build.
+
+        Args:
+            source_path: Path to the markdown file
+            dest_path: Path of the HTML file it renders to
+            links: URLs of the page's links and images, as written; None for
+                a page that was up to date, which keeps the ones recorded
+                when it was rendered
+        """
+        key = self._key(dest_path)
+        source_hash = self.source_hash(source_path)
+        if links is None:
+            links = self.previous["pages"].get(key, {}).get("links", [])
+        self.pages[key] = {
+            "source": source_path,
+            "hash": source_hash,
+            "updated": self._updated(key, "hash", source_hash),
+            "links": links,
+        }
+
+    def page_links(self, dest_path):
+        """
+        URLs of the links and images of a page of this build, as written.
+        """
+        return self.pages.get(self._key(dest_path), {}).get("links", [])
+
+    def forget(self, dest_path):
+        """
+        Drop an output file that was removed during this build.
+
+        Args:
+            dest_path: Path of the removed HTML file
+        """
+        self.pages.pop(self._key(dest_path), None)
+
+    def stale_outputs(self):
+        """
+        List output files from the previous build that this build did not produce.
+
+        Without a usable previous manifest, every HTML file in the output
+        directory that is neither produced by this build nor a static file
+        is stale.
+
+        Returns:
+            A sorted list of output file paths
+        """
+        previous = set(self.previous_outputs())
+        if not self.has_previous:
+            previous.update(self._html_files())
+        stale = sorted(previous - set(self.pages) - set(self.static_files))
+        return [os.path.join(self.output_dir, key) for key in stale]
+
+    def _html_files(self):
+        """
+        Manifest keys of the HTML files in the output directory.
+        """
+        keys = []
+        for dirpath, _, filenames in os.walk(self.output_dir):
+            for name in filenames:
+                if name.endswith(".html"):
+                    keys.append(self._key(os.path.join(dirpath, name)))
+        return keys
+
+    def remove_stale_outputs(self):
+        """
+        Delete stale output files and any directories left empty by them.
+
+        Returns:
+            The list of removed file paths
+        """
+        removed = []
+        for path in self.stale_outputs():
+            if not os.path.exists(path):
+                continue
+            print(f"Removing stale output: {self.live_path(path)}")
+            remove_output_file(path, self.output_dir)
+            removed.append(path)
+        return removed
+
+    def save(self):
+        """
+        Write the manifest for the current build atomically.
+        """
+        data = {
+            "version": MANIFEST_VERSION,
+            "generator": self.generator,
+            "template": self.template_hash,
+            "basepath": self.basepath,
+            "options": self.options,
+            "pages": self.pages,
+            "static": self.static_files,
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# The active tracer, or None when tracing is off (spans are then no-ops)
+_tracer = None
+
+
+class Tracer:
+    """
+    Collects nested timing spans as Chrome trace "complete" events.
+
+    Timestamps come from time.perf_counter_ns(), which is the system-wide
+    monotonic clock on Linux, so spans recorded in worker processes line up
+    with the main process when their events are merged.
+    """
+
+    def __init__(self, worker=False):
+        self.pid = os.getpid()
+        self.worker = worker
+        self.events = []
+
+    def add_span(self, name, start_ns, end_ns, category="build", args=None):
+        """
+        Record one finished span.
+        """
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self.pid,
+            "tid": threading.get_native_id(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def drain(self):
+        """
+        Remove and return the events recorded so far (used by workers to
+        ship their spans back to the main process).
+        """
+        events = self.events
+        self.events = []
+        return events
+
+    def merge(self, events):
+        """
+        Add events recorded by a worker process.
+        """
+        self.events.extend(events)
+
+    def write_chrome_trace(self, path):
+        """
+        Write the events as a Chrome / Perfetto trace JSON file.
+
+        Args:
+            path: Output file path (open it in chrome://tracing or ui.perfetto.dev)
+        """
+        events = sorted(self.events, key=lambda event: event["ts"])
+        if events:
+            origin = events[0]["ts"]
+            events = [dict(event, ts=event["ts"] - origin) for event in events]
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def summary(self, top=10):
+        """
+        Build a text table of the slowest pages and the time spent per phase.
+
+        Args:
+            top: Number of pages to list
+
+        Returns:
+            The summary as a multi-line string
+        """
+        pages = [event for event in self.events if event["name"] == "page"]
+        pages.sort(key=lambda event: event["dur"], reverse=True)
+
+        phases = {}
+        for event in self.events:
+            total, count = phases.get(event["name"], (0.0, 0))
+            phases[event["name"]] = (total + event["dur"], count + 1)
+
+        lines = [f"Slowest pages (top {min(top, len(pages))} of {len(pages)}):"]
+        for event in pages[:top]:
+            source = event.get("args", {}).get("source", "?")
+            lines.append(f"  {event['dur'] / 1000:10.2f} ms  {source}")
+
+        lines.append("Time per phase (summed over all pages and workers):")
+        lines.append(f"  {'phase':<16} {'total ms':>10} {'count':>8} {'mean ms':>10}")
+        for name, (total, count) in sorted(phases.items(), key=lambda item: -item[1][0]):
+            lines.append(f"  {name:<16} {total / 1000:10.2f} {count:8d} {total / 1000 / count:10.3f}")
+        return "\n".join(lines)
+
+
+def enable_tracing():
+    """
+    Start recording spans in this process.
+
+    Returns:
+        The active Tracer
+    """
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable_tracing():
+    """
+    Stop recording spans.
+    """
+    global _tracer
+    _tracer = None
+
+
+def get_tracer():
+    """
+    Return the active Tracer, or None when tracing is off.
+    """
+    return _tracer
+
+
+def worker_tracer():
+    """
+    Return a tracer for code running in a (possibly forked) worker process.
+
+    A forked worker inherits the parent's tracer object and its events; those
+    are dropped and a fresh tracer owned by the worker is started instead.
+    """
+    global _tracer
+    if _tracer is None or _tracer.pid != os.getpid():
+        _tracer = Tracer(worker=True)
+    return _tracer
+
+
+@contextmanager
+def span(name, category="build", **args):
+    """
+    Time the enclosed block as a named span.
+
+    Args:
+        name: Span name, e.g. "parse" or "write"
+        category: Chrome trace category
+        **args: Extra values shown with the span, e.g. source="content/index.md"
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        tracer.add_span(name, start, time.perf_counter_ns(), category, args)
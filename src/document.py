@@ -0,0 +1,178 @@
+import re
+from collections import Counter, namedtuple
+from htmlnode import LeafNode, ParentNode
+from markdown_to_textnodes import text_to_textnodes
+from textnode import TextType
+
+# One heading of a document's outline: level (1-6), plain text and anchor id
+Heading = namedtuple("Heading", ["level", "text", "id"])
+
+# Heading levels listed in the table of contents by default (the h1 is the
+# page title)
+TOC_MIN_LEVEL = 2
+TOC_MAX_LEVEL = 3
+
+# Characters dropped from heading text when making a slug
+SLUG_STRIP_PATTERN = re.compile(r"[^\w\s-]")
+SLUG_SPACE_PATTERN = re.compile(r"[\s_]+")
+
+# Search terms: runs of at least two letters or digits
+TERM_PATTERN = re.compile(r"[^\W_][^\W_]+")
+
+
+def slugify(text):
+    """
+    Turn heading text into an anchor id: "Why Tom? (Part 1)" -> "why-tom-part-1".
+    """
+    slug = SLUG_STRIP_PATTERN.sub("", text.lower()).strip()
+    return SLUG_SPACE_PATTERN.sub("-", slug).strip("-")
+
+
+class Document:
+    """
+    A rendered markdown document and the metadata collected while it was built.
+
+    markdown_to_document fills it in during its single walk over the blocks,
+    from the TextNodes the renderer parses each block into, so the title,
+    outline, word count and links cost no extra pass over the markdown. With
+    index_terms it also counts the search terms of the text (link text but
+    not URLs; code blocks are left out) as each block goes by, so only the
+    counts are kept, never the page's text.
+
+    Attributes:
+        node: The HTML tree of the content
+        title: Text of the first h1 header, or None
+        headings: The outline, a list of Heading in document order
+        word_count: Number of words outside code blocks
+        links: URLs of the links, as written in the markdown, in order
+        images: URLs of the images, as written in the markdown, in order
+    """
+
+    def __init__(self, index_terms=False):
+        self.node = None
+        self.title = None
+        self.headings = []
+        self.word_count = 0
+        self.links = []
+        self.images = []
+        self._ids = set()
+        self._terms = Counter() if index_terms else None
+
+    def add_heading(self, level, text, raw_text):
+        """
+        Record a heading and return its anchor id.
+
+        Ids are unique within the document: a repeated slug gets "-1", "-2",
+        ... appended, as on GitHub.
+
+        Args:
+            level: The heading level
+            text: The heading's plain text (inline markdown removed)
+            raw_text: The heading text as written in the markdown (the
+                title keeps it, as extract_title does)
+        """
+        if level == 1 and self.title is None:
+            self.title = raw_text
+
+        base = slugify(text) or "section"
+        anchor = base
+        suffix = 0
+        while anchor in self._ids:
+            suffix += 1
+            anchor = f"{base}-{suffix}"
+        self._ids.add(anchor)
+        self.headings.append(Heading(level, text, anchor))
+        return anchor
+
+    @property
+    def indexes_terms(self):
+        """
+        Whether the document counts search terms (see terms).
+        """
+        return self._terms is not None
+
+    def metadata(self):
+        """
+        The word count, links, images and (with index_terms) term counts
+        collected so far, as a JSON-serializable dict.
+
+        The block cache stores this for a single block next to its HTML, so
+        a cached block is added to a page with add_metadata instead of being
+        parsed again.
+        """
+        metadata = {"words": self.word_count, "links": self.links, "images": self.images}
+        if self._terms is not None:
+            metadata["terms"] = dict(self._terms)
+        return metadata
+
+    def add_metadata(self, metadata):
+        """
+        Add what metadata() returned for a block rendered elsewhere.
+        """
+        self.word_count += metadata["words"]
+        self.links.extend(metadata["links"])
+        self.images.extend(metadata["images"])
+        if self._terms is not None:
+            self._terms.update(metadata["terms"])
+
+    def add_text_nodes(self, text_nodes):
+        """
+        Count the words and collect the links and images of a run of inline
+        markdown, given as the TextNodes it was parsed into.
+        """
+        text = "".join([node.text for node in text_nodes])
+        self.word_count += len(text.split())
+        if self._terms is not None:
+            self._terms.update(TERM_PATTERN.findall(text.lower()))
+        for node in text_nodes:
+            if node.text_type == TextType.LINK:
+                self.links.append(node.url)
+            elif node.text_type == TextType.IMAGE:
+                self.images.append(node.url)
+
+    def terms(self):
+        """
+        The search terms of the document's text, lowercased.
+
+        Returns:
+            A dict mapping each term to its number of occurrences, or None if
+            the document was not created with index_terms
+        """
+        if self._terms is None:
+            return None
+        return dict(self._terms)
+
+    def toc_node(self, min_level=TOC_MIN_LEVEL, max_level=TOC_MAX_LEVEL):
+        """
+        Build the table of contents as nested lists of links to the headings.
+
+        Returns:
+            A <nav class="toc"> ParentNode, or None if no heading is in range
+        """
+        headings = [heading for heading in self.headings if min_level <= heading.level <= max_level]
+        if not headings:
+            return None
+
+        # Stack of (level, items of the open list)
+        root = []
+        stack = [(min_level, root)]
+        for heading in headings:
+            item = ParentNode("li", [LeafNode("a", heading.text, {"href": f"#{heading.id}"})])
+            level = max(heading.level, min_level)
+            while level < stack[-1][0] and len(stack) > 1:
+                stack.pop()
+            if level > stack[-1][0] and stack[-1][1]:
+                # Nest under the previous item of the enclosing list
+                nested = []
+                stack[-1][1][-1].children.append(ParentNode("ul", nested))
+                stack.append((level, nested))
+            stack[-1][1].append(item)
+        return ParentNode("nav", [ParentNode("ul", root)], {"class": "toc"})
+
+    def toc_html(self, min_level=TOC_MIN_LEVEL, max_level=TOC_MAX_LEVEL):
+        """
+        The table of contents as HTML, or "" if the document has no headings
+        in range.
+        """
+        node = self.toc_node(min_level, max_level)
+        return "" if node is None else node.to_html()
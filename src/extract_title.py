@@ -1,4 +1,9 @@
 import re
+import itertools
+from markdown_to_blocks import FENCE
+
+# An h1 header: a single # followed by a space and the title
+TITLE_PATTERN = re.compile(r"# (.+)")
 
 def extract_title(markdown):
     """
@@ -13,12 +18,42 @@ def extract_title(markdown):
     Raises:
         ValueError: If no h1 header is found
     """
-    # Look for a line that starts with a single # followed by a space
-    lines = markdown.split("\n")
+    return find_title(markdown.split("\n"))
+
+def find_title(lines, max_lines=None):
+    """
+    Extract the title from markdown lines, stopping at the first h1 header.
+    
+    Lines inside fenced code blocks are skipped, so a "# comment" in a code
+    sample is never taken for the title.
+    
+    Args:
+        lines: An iterable of markdown lines, e.g. an open file
+        max_lines: Give up after this many lines (default: no limit)
+        
+    Returns:
+        The title string (without the # and any leading/trailing whitespace)
+        
+    Raises:
+        ValueError: If no h1 header is found
+    """
+    if max_lines is not None:
+        lines = itertools.islice(lines, max_lines)
+    fenced = False
     for line in lines:
-        match = re.match(r"^# (.+)$", line.strip())
+        stripped = line.strip()
+        if fenced:
+            if stripped.endswith(FENCE):
+                fenced = False
+            continue
+        if stripped.startswith(FENCE):
+            # A fence closed on its own line (```code```) opens no block
+            fenced = len(stripped) < 2 * len(FENCE) or not stripped.endswith(FENCE)
+            continue
+        # Look for a line that starts with a single # followed by a space
+        match = TITLE_PATTERN.fullmatch(stripped)
         if match:
             return match.group(1).strip()
     
     # If we didn't find an h1 header, raise an exception
-    raise ValueError("No h1 header found in the markdown content")
\ No newline at end of file
+    raise ValueError("No h1 header found in the markdown content")
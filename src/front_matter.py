@@ -0,0 +1,109 @@
+import itertools
+
+# Opens and closes the front matter block on the first line of a file
+FRONT_MATTER_DELIMITER = "---"
+
+# Front matter longer than this is not looked for, so a file starting with a
+# stray "---" is never read to the end
+MAX_FRONT_MATTER_LINES = 64
+
+# Values read as booleans
+BOOLEAN_VALUES = {"true": True, "yes": True, "false": False, "no": False}
+
+
+def parse_front_matter(lines):
+    """
+    Read the front matter at the start of a markdown file.
+
+    Front matter is a block of "key: value" lines between two "---" lines,
+    the first of which must be the file's first line:
+
+        ---
+        title: Why Tom Bombadil Was a Mistake
+        date: 2024-05-01
+        tags: [tolkien, opinion]
+        draft: false
+        summary: An unpopular opinion.
+        ---
+
+    Lines are consumed only up to the closing delimiter, so passing an open
+    file reads just the header. Values are strings, except [a, b] lists,
+    true/false/yes/no, and quoted strings, which lose their quotes.
+
+    Args:
+        lines: An iterable of lines, e.g. an open file
+
+    Returns:
+        (metadata, line_count): the metadata dict and the number of lines the
+        block spans (delimiters included), or ({}, 0) if there is none
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None or first.rstrip() != FRONT_MATTER_DELIMITER:
+        return {}, 0
+
+    metadata = {}
+    for count, line in enumerate(itertools.islice(lines, MAX_FRONT_MATTER_LINES), 2):
+        line = line.rstrip("\r\n")
+        if line.rstrip() == FRONT_MATTER_DELIMITER:
+            return metadata, count
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        key, separator, value = line.partition(":")
+        if not separator:
+            # Not front matter after all: the file starts with a stray "---"
+            return {}, 0
+        metadata[key.strip().lower()] = parse_value(value.strip())
+    return {}, 0
+
+
+def parse_value(value):
+    """
+    Convert one front matter value from text.
+    """
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_value(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return BOOLEAN_VALUES.get(value.lower(), value)
+
+
+def split_front_matter(markdown):
+    """
+    Separate a markdown document into its front matter and its body.
+
+    Args:
+        markdown: A string containing markdown, with or without front matter
+
+    Returns:
+        (metadata, body)
+    """
+    if not markdown.startswith(FRONT_MATTER_DELIMITER):
+        return {}, markdown
+    lines = markdown.split("\n")
+    metadata, line_count = parse_front_matter(lines)
+    if not line_count:
+        return {}, markdown
+    return metadata, "\n".join(lines[line_count:])
+
+
+def read_front_matter(path):
+    """
+    Read a file's front matter without reading the rest of the file.
+
+    Returns:
+        (metadata, line_count) as parse_front_matter
+    """
+    with open(path, 'r') as f:
+        return parse_front_matter(f)
+
+
+def tag_list(value):
+    """
+    Normalize a tags value ("a, b" or [a, b]) to a list of strings.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(tag).strip() for tag in value if str(tag).strip()]
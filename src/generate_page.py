@@ -1,46 +1,147 @@
 import os
-from markdown_to_html import markdown_to_html_node
-from extract_title import extract_title
+import itertools
+from markdown_to_html import markdown_to_document, render_blocks, scan_outline
+from document import Document
+from markdown_to_blocks import scan_lines
+from extract_title import find_title
+from front_matter import parse_front_matter, split_front_matter
+from template import load_template
+from url_rewriter import url_rewriter
+from output_staging import atomic_write, atomic_writer
+from build_trace import span
+from block_cache import get_block_cache
+from markup import escape_text
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+# Markdown files at least this large are streamed through generate_page_streaming
+STREAMING_THRESHOLD = 4 * 1024 * 1024
+
+def generate_page(from_path, template_path, dest_path, basepath="/", index_terms=False):
     """
     Generate an HTML page from a markdown file using a template.
     
+    Files of STREAMING_THRESHOLD bytes or more are rendered by
+    generate_page_streaming instead, so huge pages never sit in memory whole.
+    
     Args:
         from_path: Path to the markdown file
         template_path: Path to the HTML template file
         dest_path: Path where the generated HTML file should be saved
-        basepath: Base URL path for the site (default: "/")
+        basepath: Base URL path for the site, or a UrlRewriter (default: "/")
+        index_terms: Also count the page's search terms (Document.terms)
+        
+    Returns:
+        The page's Document (see markdown_to_document)
     """
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    
-    # Read the markdown file
-    with open(from_path, 'r') as f:
-        markdown_content = f.read()
+    if os.path.getsize(from_path) >= STREAMING_THRESHOLD:
+        return generate_page_streaming(from_path, template_path, dest_path, basepath, index_terms)
     
-    # Read the template file
-    with open(template_path, 'r') as f:
-        template_content = f.read()
-    
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
     
-    # Extract the title
-    title = extract_title(markdown_content)
+    with span("page", source=from_path, dest=dest_path):
+        # Read the markdown file
+        with span("read"):
+            with open(from_path, 'r') as f:
+                markdown_content = f.read()
+        
+        # Front matter (title, date, tags, ...) is not part of the content
+        metadata, markdown_content = split_front_matter(markdown_content)
+        
+        # Load the compiled template (shared by all pages, recompiled only when
+        # the template file changes); its own URLs were rewritten when compiled
+        rewriter = url_rewriter(basepath)
+        template = load_template(template_path, rewriter)
+        
+        # Convert markdown to HTML, resolving link and image URLs as the tree is
+        # built and reusing the HTML of blocks rendered before; the title and
+        # outline are collected in the same walk
+        with span("parse"):
+            document = markdown_to_document(markdown_content, rewriter, get_block_cache(), index_terms)
+        with span("serialize"):
+            html_content = document.node.to_html()
+        
+        # A title in the front matter wins over the h1 header
+        title = metadata.get("title") or document.title
+        if title is None:
+            raise ValueError("No h1 header found in the markdown content")
+        
+        # Fill the placeholders in the template
+        with span("template"):
+            values = {"Title": escape_text(str(title)), "Content": html_content}
+            if "Toc" in template.slot_names:
+                values["Toc"] = document.toc_html()
+            full_html = template.render(**values)
+        
+        # Ensure the destination directory exists
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        
+        # Write to the destination file (replaced, never modified in place, so
+        # hardlinked copies in other output generations stay intact)
+        with span("write"):
+            atomic_write(dest_path, full_html)
     
-    # Replace placeholders in the template
-    full_html = template_content.replace("{{ Title }}", title).replace("{{ Content }}", html_content)
+    print(f"Page generated successfully: {dest_path}")
+    return document
+
+def generate_page_streaming(from_path, template_path, dest_path, basepath="/", index_terms=False):
+    """
+    Generate an HTML page without holding the document in memory.
     
-    # Update URLs with basepath
-    full_html = full_html.replace('href="/', f'href="{basepath}')
-    full_html = full_html.replace('src="/', f'src="{basepath}')
+    The markdown is read line by line; each block is rendered as soon as it
+    is complete and its HTML is written straight into the template's content
+    slot, so memory use is bounded by the largest single block. The title is
+    found by a first pass that stops at the h1 header (or, if the template
+    has a {{ Toc }} slot, reads the whole outline).
     
-    # Ensure the destination directory exists
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    Args:
+        from_path: Path to the markdown file
+        template_path: Path to the HTML template file
+        dest_path: Path where the generated HTML file should be saved
+        basepath: Base URL path for the site, or a UrlRewriter (default: "/")
+        index_terms: Also count the page's search terms (Document.terms)
+        
+    Returns:
+        The page's Document, without its HTML tree (node is None)
+    """
+    print(f"Streaming page from {from_path} to {dest_path} using {template_path}")
     
-    # Write to the destination file
-    with open(dest_path, 'w') as f:
-        f.write(full_html)
+    with span("page", source=from_path, dest=dest_path, streamed=True):
+        rewriter = url_rewriter(basepath)
+        template = load_template(template_path, rewriter)
+        
+        toc = None
+        with span("title"):
+            with open(from_path, 'r') as f:
+                metadata, header_lines = parse_front_matter(f)
+                title = metadata.get("title")
+                f.seek(0)
+                lines = itertools.islice(f, header_lines, None)
+                if "Toc" in template.slot_names:
+                    outline = scan_outline(scan_lines(line.rstrip("\n") for line in lines))
+                    title, toc = title or outline.title, outline.toc_html()
+                elif title is None:
+                    title = find_title(lines)
+            if title is None:
+                raise ValueError("No h1 header found in the markdown content")
+        
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        
+        with span("render"):
+            with open(from_path, 'r') as source, atomic_writer(dest_path) as out:
+                lines = (line.rstrip("\n") for line in itertools.islice(source, header_lines, None))
+                document = Document(index_terms)
+                blocks = render_blocks(scan_lines(lines), rewriter, get_block_cache(), document)
+                values = {"Title": escape_text(str(title)), "Content": _wrap_content(blocks)}
+                if toc is not None:
+                    values["Toc"] = toc
+                template.stream(out.write, **values)
     
-    print(f"Page generated successfully: {dest_path}")
\ No newline at end of file
+    print(f"Page generated successfully: {dest_path}")
+    return document
+
+def _wrap_content(blocks_html):
+    """
+    Yield the page content exactly as markdown_to_document(...).node.to_html() would.
+    """
+    yield "<div>"
+    yield from blocks_html
+    yield "</div>"
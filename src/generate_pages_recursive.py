@@ -1,80 +1,150 @@
 import os
-from generate_page import generate_page
+from page_executor import PageJob, run_page_jobs
+from front_matter import read_front_matter
+from build_trace import span
+from site_routes import create_output_dirs, plan_routes
+from metadata_index import MetadataIndex, build_metadata_index
+from listing_pages import LISTING_PAGE_SIZE, generate_listing_pages
+from site_feeds import generate_site_feeds
+from search_index import SearchIndex
+from link_checker import check_links, link_targets
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", *, manifest=None,
+                             explain=False, executor=None, drafts=False, page_size=LISTING_PAGE_SIZE,
+                             site_url=None, search_store=None, check_site_links=False):
     """
-    Recursively crawl through the content directory and generate HTML pages
-    for all markdown files, preserving directory structure.
+    Crawl through the content directory and generate HTML pages for all
+    markdown files, preserving directory structure.
+    
+    The walk first plans every page job, then renders them through the
+    given executor so pages can be generated in parallel. The section, tag
+    and archive listing pages are generated last, from the metadata index
+    built during the walk, followed by the sitemap and feed when the site's
+    URL is known, and the search index when it is enabled. Internal links
+    are checked last, against everything the build recorded in the manifest.
     
     Args:
         dir_path_content: Path to the content directory
         template_path: Path to the HTML template file
         dest_dir_path: Path to the destination (public) directory
         basepath: Base URL path for the site (default: "/")
+        manifest: Optional BuildManifest used to skip unchanged pages
+        explain: Print why each page was (or was not) regenerated
+        executor: Executor from page_executor.create_executor (default: serial)
+        drafts: Also generate pages marked "draft: true" in their front matter
+        page_size: Entries per listing page (0 = no listing pages)
+        site_url: The site's origin, e.g. "https://user.github.io"; needed
+            for the absolute URLs of sitemap.xml and feed.xml
+        search_store: Path of the search index store (see SearchIndex);
+            None builds no search index
+        check_site_links: Check the internal links and images of every page
+            (needs the manifest)
+        
+    Returns:
+        The list of link_checker.BrokenLink found, empty unless
+        check_site_links is set
     """
-    print(f"Processing content directory: {dir_path_content}")
-    
-    # Create the destination directory if it doesn't exist
-    if not os.path.exists(dest_dir_path):
-        os.makedirs(dest_dir_path)
+    with span("collect"):
+        print(f"Processing content directory: {dir_path_content}")
+        routes, index = collect_routes(dir_path_content, dest_dir_path, drafts)
+        print(f"Collected {len(routes)} pages")
+        jobs = [PageJob(route.source, template_path, route.dest, basepath) for route in routes]
+    search_index = SearchIndex(search_store) if search_store else None
+    with span("render pages"):
+        run_page_jobs(jobs, executor, manifest, explain, search_index)
+    if page_size:
+        with span("listing pages"):
+            generate_listing_pages(index, routes, template_path, dest_dir_path, basepath, manifest, explain,
+                                   page_size)
+    if site_url:
+        with span("feeds"):
+            generate_site_feeds(index, dest_dir_path, site_url, basepath, manifest, explain)
+    if search_index is not None:
+        with span("search index"):
+            search_index.write(index, dest_dir_path, basepath, manifest, explain)
+    if not check_site_links:
+        return []
+    if manifest is None:
+        raise ValueError("Checking links needs the build manifest")
+    with span("check links"):
+        return check_links(routes, link_targets(manifest), manifest)
+
+def collect_routes(dir_path_content, dest_dir_path, drafts=False):
+    """
+    Plan the site's routes and read the metadata of every page.
     
-    # Special case: check if we need to manually create HTML files for specific links
-    # that the tests are expecting
-    if dir_path_content == "content":
-        blog_links = ["glorfindel", "tom", "majesty"]
-        for link in blog_links:
-            blog_dir = os.path.join(dir_path_content, "blog", link)
-            if os.path.exists(blog_dir) and os.path.isdir(blog_dir):
-                # Find the index.md file
-                index_path = os.path.join(blog_dir, "index.md")
-                if os.path.exists(index_path):
-                    # Create the destination directory
-                    dest_blog_dir = os.path.join(dest_dir_path, "blog", link)
-                    if not os.path.exists(dest_blog_dir):
-                        os.makedirs(dest_blog_dir)
-                    
-                    # Generate the HTML file
-                    dest_path = os.path.join(dest_blog_dir, "index.html")
-                    print(f"Special case - Generating blog page: {index_path} -> {dest_path}")
-                    generate_page(index_path, template_path, dest_path, basepath)
+    Draft pages are left out using the metadata index, which reads only the
+    front matter of each file. All output directories are created here,
+    before any page is rendered.
     
-    # Process each file and directory in the content directory
-    for item in os.listdir(dir_path_content):
-        source_path = os.path.join(dir_path_content, item)
-        
-        # Skip hidden files
-        if item.startswith('.'):
-            continue
+    Args:
+        dir_path_content: Path to the content directory
+        dest_dir_path: Path to the destination (public) directory
+        drafts: Keep draft pages
         
-        # If it's a directory, process it recursively
-        if os.path.isdir(source_path):
-            # Create the corresponding destination directory
-            relative_path = os.path.relpath(source_path, 'content')
-            nested_dest_dir = os.path.join(dest_dir_path, relative_path)
-            
-            # Recursively process the subdirectory
-            generate_pages_recursive(source_path, template_path, nested_dest_dir, basepath)
+    Returns:
+        (routes, index): the routes to build, in URL order, and the
+        MetadataIndex of those pages
+    """
+    routes = plan_routes(dir_path_content, dest_dir_path)
+    index = build_metadata_index(routes)
+    if not drafts:
+        routes = [route for route in routes if not index.by_source[route.source].draft]
+        skipped = len(index.pages) - len(routes)
+        if skipped:
+            print(f"Skipping {skipped} draft pages")
+            index = MetadataIndex(index.published())
+    create_output_dirs(routes)
+    return routes, index
+
+def current_routes(dir_path_content, dest_dir_path, manifest, drafts=False, search_store=None):
+    """
+    Check, without writing anything, whether a build would leave the output
+    exactly as the previous build recorded it.
+    
+    That is the case when the generator, template and base path are the
+    same, no page was added, removed or edited, no draft was published, and
+    every generated file the previous build recorded (listing pages, feed,
+    sitemap, search files) is still there: those only depend on the pages
+    and on build options, which the caller compares.
+    
+    Args:
+        dir_path_content: Path to the content directory
+        dest_dir_path: Path to the live output directory
+        manifest: The BuildManifest, with dest_dir_path as its output directory
+        drafts: Drafts are built
+        search_store: Path of the search index store, if pages are indexed
         
-        # If it's a markdown file
-        elif item.endswith('.md'):
-            # Get the relative path from content directory for proper URL structure
-            rel_dir_path = os.path.relpath(dir_path_content, 'content')
-            
-            if item == 'index.md':
-                # For index.md files, create index.html in the same directory
-                html_path = os.path.join(dest_dir_path, 'index.html')
-                print(f"Generating index: {source_path} -> {html_path}")
-                generate_page(source_path, template_path, html_path, basepath)
-            else:
-                # For files like "contact.md" in the root directory
-                base_name = os.path.splitext(item)[0]
-                
-                if rel_dir_path == '.':
-                    # If in the root content dir, create a folder with the base name
-                    dest_subdir = os.path.join(dest_dir_path, base_name)
-                    if not os.path.exists(dest_subdir):
-                        os.makedirs(dest_subdir)
-                    
-                    html_path = os.path.join(dest_subdir, 'index.html')
-                    print(f"Generating page: {source_path} -> {html_path}")
-                    generate_page(source_path, template_path, html_path, basepath)
\ No newline at end of file
+    Returns:
+        The routes of the site in URL order if there is nothing to build,
+        else None
+    """
+    previous = manifest.previous
+    if (previous.get("generator"), previous.get("template"), previous.get("basepath")) != (
+            manifest.generator, manifest.template_hash, manifest.basepath):
+        return None
+    search_index = None
+    if search_store:
+        if not os.path.exists(search_store):
+            return None
+        search_index = SearchIndex(search_store)
+    
+    routes = []
+    for route in plan_routes(dir_path_content, dest_dir_path):
+        if manifest.rebuild_reason(route.source, route.dest) is None:
+            if search_index is not None and not search_index.is_current(route.source,
+                                                                       manifest.source_hash(route.source)):
+                return None
+            routes.append(route)
+        elif drafts or read_front_matter(route.source)[0].get("draft") is not True:
+            # A new, changed or published page
+            return None
+    
+    pages = [key for key, entry in previous["pages"].items() if "hash" in entry]
+    if len(pages) != len(routes):
+        # Pages were removed
+        return None
+    generated = [key for key, entry in previous["pages"].items() if "hash" not in entry]
+    if not all(os.path.exists(os.path.join(dest_dir_path, key)) for key in generated):
+        return None
+    return routes
@@ -0,0 +1,220 @@
+import os
+import re
+from block_cache import BlockCache
+from build_manifest import BUILD_DIR
+from markup import Markup, escape_text
+
+# Bump when the lexers or the markup they produce change; cached output of
+# other versions is then never used
+HIGHLIGHTER_VERSION = "1"
+
+DEFAULT_HIGHLIGHT_DIR = os.path.join(BUILD_DIR, "highlight")
+
+# Lexers by language name and alias
+LEXERS = {}
+
+# The active highlight cache, or None when highlighted code is not cached
+_cache = None
+
+
+class Lexer:
+    """
+    A regex lexer turning source code into highlighted HTML.
+
+    The rules are combined into one alternation that is matched left to
+    right; text no rule matches is written as it is. Token classes follow
+    Pygments' short names (k keyword, s string, c comment, m number, ...),
+    so existing Pygments stylesheets apply.
+
+    Args:
+        name: The language name, e.g. "python"
+        rules: (token_class, pattern) pairs, tried in order at each position;
+            a token_class of None consumes the text without highlighting it
+            (e.g. plain identifiers). Patterns must not contain capturing groups.
+        aliases: Other fence names for the language, e.g. ("py",)
+    """
+
+    def __init__(self, name, rules, aliases=()):
+        self.name = name
+        self.aliases = tuple(aliases)
+        self.classes = [None] + [token_class for token_class, _ in rules]
+        self.pattern = re.compile("|".join(f"({pattern})" for _, pattern in rules), re.MULTILINE)
+        self._key = repr((name, tuple(self.classes), self.pattern.pattern))
+
+    def key(self):
+        """
+        A string identifying the lexer's rules, for cache keys.
+
+        Lexers registered at runtime are not covered by HIGHLIGHTER_VERSION,
+        so cached output is keyed by the rules that produced it.
+        """
+        return self._key
+
+    def highlight(self, code):
+        """
+        Return the code as HTML, tokens wrapped in <span class="...">.
+        """
+        pieces = []
+        append = pieces.append
+        classes = self.classes
+        position = 0
+        for match in self.pattern.finditer(code):
+            token_class = classes[match.lastindex]
+            if token_class is None:
+                continue
+            start = match.start()
+            if start > position:
+                append(escape_text(code[position:start]))
+            append(f'<span class="{token_class}">{escape_text(match.group())}</span>')
+            position = match.end()
+        append(escape_text(code[position:]))
+        return "".join(pieces)
+
+
+def register_lexer(lexer):
+    """
+    Make a lexer available under its name and aliases.
+    """
+    for name in (lexer.name, *lexer.aliases):
+        LEXERS[name.lower()] = lexer
+
+
+def get_lexer(language):
+    """
+    Return the lexer for a fence language, or None if there is none.
+    """
+    if not language:
+        return None
+    return LEXERS.get(language.lower())
+
+
+def highlight_code(code, language):
+    """
+    Highlight a code sample, using the highlight cache when it is enabled.
+
+    Args:
+        code: The code as written in the fenced block
+        language: The fence's language specifier, e.g. "python"
+
+    Returns:
+        The highlighted HTML as Markup, or None if no lexer knows the language
+    """
+    lexer = get_lexer(language)
+    if lexer is None:
+        return None
+    cache = _cache
+    if cache is None:
+        return Markup(lexer.highlight(code))
+
+    key = cache.key(code, lexer.key())
+    html = cache.get(key)
+    if html is None:
+        html = lexer.highlight(code)
+        cache.put(key, html)
+    return Markup(html)
+
+
+class HighlightCache(BlockCache):
+    """
+    Stores highlighted code, keyed by (lexer rules, code, HIGHLIGHTER_VERSION).
+
+    Unlike the block cache, entries do not depend on the rest of the
+    generator's code, so they survive changes to it: highlighting is the
+    most expensive per-block work and code samples rarely change.
+
+    Args:
+        directory: Optional on-disk store, e.g. ".build/highlight"
+    """
+
+    def __init__(self, directory=None):
+        super().__init__(directory=directory, version=HIGHLIGHTER_VERSION)
+
+    def summary(self):
+        return super().summary().replace("Block cache", "Highlight cache", 1)
+
+
+def enable_highlight_cache(directory=None):
+    """
+    Start caching highlighted code in this process.
+
+    With a directory, entries stored by other highlighter versions are
+    deleted first.
+
+    Returns:
+        The active HighlightCache
+    """
+    global _cache
+    _cache = HighlightCache(directory)
+    _cache.prune()
+    return _cache
+
+
+def disable_highlight_cache():
+    """
+    Stop caching highlighted code.
+    """
+    global _cache
+    _cache = None
+
+
+def get_highlight_cache():
+    """
+    Return the active HighlightCache, or None when it is off.
+    """
+    return _cache
+
+
+# Strings with backslash escapes, on one line
+_DOUBLE_QUOTED = r'"(?:\\.|[^"\\\n])*"'
+_SINGLE_QUOTED = r"'(?:\\.|[^'\\\n])*'"
+
+
+def _words(*words):
+    return r"\b(?:" + "|".join(words) + r")\b"
+
+
+_NUMBER = r"\b(?:0[xXoObB][0-9a-fA-F_]+|\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?)\b"
+
+register_lexer(Lexer("python", [
+    ("c", r"#[^\n]*"),
+    ("s", r"[rRbBuUfF]{0,2}(?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|"
+          + _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED + ")"),
+    ("nd", r"@[\w.]+"),
+    ("k", _words("False", "None", "True", "and", "as", "assert", "async", "await", "break",
+                 "class", "continue", "def", "del", "elif", "else", "except", "finally", "for",
+                 "from", "global", "if", "import", "in", "is", "lambda", "match", "nonlocal",
+                 "not", "or", "pass", "raise", "return", "try", "while", "with", "yield")),
+    ("nb", _words("abs", "all", "any", "bool", "dict", "enumerate", "float", "int", "isinstance",
+                  "len", "list", "max", "min", "open", "print", "range", "repr", "self", "set",
+                  "sorted", "str", "sum", "super", "tuple", "type", "zip")),
+    ("m", _NUMBER),
+    (None, r"[A-Za-z_]\w*"),
+], aliases=("py", "python3")))
+
+register_lexer(Lexer("javascript", [
+    ("c", r"//[^\n]*|/\*[\s\S]*?\*/"),
+    ("s", _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED + r"|`(?:\\.|[^`\\])*`"),
+    ("k", _words("async", "await", "break", "case", "catch", "class", "const", "continue",
+                 "default", "delete", "do", "else", "export", "extends", "false", "finally",
+                 "for", "function", "if", "import", "in", "instanceof", "let", "new", "null",
+                 "of", "return", "static", "super", "switch", "this", "throw", "true", "try",
+                 "typeof", "undefined", "var", "void", "while", "yield")),
+    ("m", _NUMBER),
+    (None, r"[A-Za-z_$][\w$]*"),
+], aliases=("js", "typescript", "ts")))
+
+register_lexer(Lexer("bash", [
+    ("c", r"(?<![\w$])#[^\n]*"),
+    ("s", r'"(?:\\.|[^"\\])*"|\'[^\']*\''),
+    ("nv", r"\$(?:\{[^}\n]*\}|\w+|[@*#?$!])"),
+    ("k", _words("case", "do", "done", "elif", "else", "esac", "export", "fi", "for",
+                 "function", "if", "in", "local", "return", "then", "until", "while")),
+    (None, r"[A-Za-z_][\w-]*"),
+], aliases=("sh", "shell", "zsh", "console")))
+
+register_lexer(Lexer("json", [
+    ("nt", _DOUBLE_QUOTED + r"(?=\s*:)"),
+    ("s", _DOUBLE_QUOTED),
+    ("kc", _words("true", "false", "null")),
+    ("m", r"-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b"),
+]))
@@ -1,6 +1,191 @@
+import sys
+from functools import lru_cache
+from markup import Markup, escape_attribute
+
+# Number of elements opened between two write() calls of the serializer
+WRITE_BATCH_SIZE = 4096
+
+# Number of distinct props mappings kept by shared_props
+SHARED_PROPS_CACHE_SIZE = 4096
+
+
+class FrozenProps(dict):
+    """
+    A read-only props dict that carries its own formatted attribute string.
+    
+    Built by shared_props; the serializer writes html directly instead of
+    formatting and escaping the values for every node.
+    """
+    __slots__ = ("html",)
+    
+    def __init__(self, items):
+        super().__init__(items)
+        self.html = "".join(f' {prop}="{escape_attribute(value)}"' for prop, value in self.items())
+        
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Shared props are read-only")
+    
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+
+@lru_cache(maxsize=SHARED_PROPS_CACHE_SIZE)
+def _shared_props(items):
+    return FrozenProps(items)
+
+
+def shared_props(**props):
+    """
+    Return a read-only props dict shared by every node with the same props.
+    
+    Links and images repeat the same few URLs (navigation, icons) across a
+    page and across pages; sharing one immutable dict for them saves a dict
+    per node, and its attributes are formatted and escaped only once.
+    
+    Args:
+        **props: Attribute names and values, e.g. href="/blog/"
+        
+    Returns:
+        A FrozenProps
+    """
+    return _shared_props(tuple(props.items()))
+
+
+def props_to_html(props):
+    """
+    Format a props mapping as HTML attributes, each preceded by a space.
+    
+    Values are escaped for the attribute context.
+    """
+    if props is None:
+        return ""
+    if props.__class__ is FrozenProps:
+        return props.html
+    
+    html_props = ""
+    for prop, value in props.items():
+        # Plain strings needing no escaping skip the call
+        if value.__class__ is not str or "&" in value or '"' in value:
+            value = escape_attribute(value)
+        html_props += f' {prop}="{value}"'
+        
+    return html_props
+
+
+def write_html(node, writer):
+    """
+    Serialize an HTMLNode tree into a writer without recursion.
+    
+    The tree is walked with an explicit stack, so wide nodes are never
+    rebuilt by repeated string concatenation and deep trees cannot hit the
+    recursion limit. Output is handed to writer.write() in batches.
+    
+    Args:
+        node: The root HTMLNode
+        writer: Any object with a write(str) method, e.g. a file or io.StringIO
+            (wrap a socket with socket.makefile("w"))
+    """
+    _serialize(node, writer.write, WRITE_BATCH_SIZE)
+
+
+def _serialize(node, write, batch_size=None):
+    """
+    Walk the tree with an explicit stack, passing joined output to write().
+    
+    The stack holds one (children iterator, closing tag) frame per open
+    element, so leaves are written straight from their parent's loop
+    without a frame of their own, and so are elements whose only child is
+    a text leaf. Leaf text was escaped when the LeafNode was created, so it
+    is written as it is, with no check at all; RawHTMLNode values are
+    trusted and written unchanged too.
+    
+    Args:
+        node: The root HTMLNode
+        write: Callable receiving chunks of HTML
+        batch_size: Elements opened per write() call, or None for a single call
+    """
+    pieces = []
+    append = pieces.append
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    countdown = batch_size or -1
+    children = iter((node,))
+    closing_tag = None
+    while True:
+        for item in children:
+            cls = item.__class__
+            # Inline the common node types; anything else uses _write_parts
+            if cls is LeafNode and item.value is not None:
+                value = item.value
+                tag = item.tag
+                if tag is None:
+                    append(value)
+                else:
+                    props = item.props
+                    if props:
+                        attributes = props.html if props.__class__ is FrozenProps else props_to_html(props)
+                        append(f"<{tag}{attributes}>{value}</{tag}>")
+                    else:
+                        append(f"<{tag}>{value}</{tag}>")
+                continue
+            
+            # Output is flushed as elements start, so a batch spans whole leaves
+            countdown -= 1
+            if countdown == 0:
+                write("".join(pieces))
+                pieces.clear()
+                countdown = batch_size
+            
+            if cls is ParentNode and item.tag is not None and item.children is not None:
+                tag = item.tag
+                props = item.props
+                if props:
+                    attributes = props.html if props.__class__ is FrozenProps else props_to_html(props)
+                    opening_tag = f"<{tag}{attributes}>"
+                else:
+                    opening_tag = f"<{tag}>"
+                nested_children = item.children
+                nested_closing_tag = f"</{tag}>"
+                
+                # An element holding a single text leaf (cells, list items,
+                # paragraphs) is written whole rather than given a frame
+                if len(nested_children) == 1:
+                    child = nested_children[0]
+                    if child.__class__ is LeafNode and child.tag is None and child.value is not None:
+                        append(f"{opening_tag}{child.value}{nested_closing_tag}")
+                        continue
+                append(opening_tag)
+            else:
+                nested = item._write_parts(pieces)
+                if nested is None:
+                    continue
+                nested_children, nested_closing_tag = nested
+            
+            # Descend; the rest of this list resumes once the element closes
+            push((children, closing_tag))
+            children = iter(nested_children)
+            closing_tag = nested_closing_tag
+            break
+        else:
+            if closing_tag is not None:
+                append(closing_tag)
+            if not stack:
+                break
+            children, closing_tag = pop()
+    
+    if pieces:
+        write("".join(pieces))
+
+
 class HTMLNode:
+    # Nodes are created by the million in big or parallel builds, so they
+    # carry no per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+    
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        # Tag names are interned so every node shares one string per tag
+        self.tag = tag if tag is None else sys.intern(tag)
         self.value = value
         self.children = children
         self.props = props
@@ -8,22 +193,46 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError("to_html method not implemented")
 
-    def props_to_html(self):
-        if self.props is None:
-            return ""
+    def write_html(self, writer):
+        """
+        Stream this node's HTML into a writer (see write_html).
+        """
+        write_html(self, writer)
+
+    def _write_parts(self, pieces):
+        """
+        Append this node's output to pieces for the streaming serializer.
         
-        html_props = ""
-        for prop, value in self.props.items():
-            html_props += f' {prop}="{value}"'
-            
-        return html_props
+        Subclasses with children append their opening tag and return a
+        (children, closing_tag) tuple; leaves return None. The default falls
+        back to to_html() so custom subclasses keep working.
+        """
+        pieces.append(self.to_html())
+        return None
+
+    def props_to_html(self):
+        return props_to_html(self.props)
         
     def __repr__(self):
         return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
 
 
 class LeafNode(HTMLNode):
+    """
+    An element with text content, or bare text when tag is None.
+    
+    The text is escaped once, here, so value always holds HTML-safe text
+    and serializing the leaf (as many times as it is written) costs no
+    escaping. Text that needed escaping is kept as Markup, so passing a
+    leaf's value to another LeafNode never escapes it twice; text without
+    & or < is safe as it is and stays a plain str. A value assigned after
+    creation must be escaped already (see markup.escape_text).
+    """
+    __slots__ = ()
+    
     def __init__(self, tag, value, props=None):
+        if value is not None and ("&" in value or "<" in value) and value.__class__ is not Markup:
+            value = Markup(value.replace("&", "&amp;").replace("<", "&lt;"))
         super().__init__(tag, value, None, props)
         
     def to_html(self):
@@ -37,18 +246,38 @@ class LeafNode(HTMLNode):
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
         
     def to_html(self):
+        parts = []
+        _serialize(self, parts.append)
+        return "".join(parts)
+
+    def _write_parts(self, pieces):
         if self.tag is None:
             raise ValueError("ParentNode must have a tag")
             
         if self.children is None:
             raise ValueError("ParentNode must have children")
             
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-            
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
\ No newline at end of file
+        pieces.append(f"<{self.tag}{self.props_to_html()}>")
+        return self.children, f"</{self.tag}>"
+
+
+class RawHTMLNode(HTMLNode):
+    """
+    A fragment of already rendered HTML, written out unchanged.
+    
+    Used for block output taken from the block cache. The HTML is trusted:
+    it is never escaped.
+    """
+    __slots__ = ()
+    
+    def __init__(self, html):
+        super().__init__(None, html)
+        
+    def to_html(self):
+        return self.value
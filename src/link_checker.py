@@ -0,0 +1,149 @@
+import os
+import re
+import posixpath
+from collections import namedtuple
+from urllib.parse import unquote
+from front_matter import parse_front_matter
+
+# An internal link or image that points at nothing the build produced
+#   source: Markdown file it is written in
+#   line: Line number in that file, from 1
+#   url: The URL as written
+BrokenLink = namedtuple("BrokenLink", ["source", "line", "url"])
+
+# "https:", "mailto:", ... : URLs with a scheme are not checked
+SCHEME_PATTERN = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*:")
+
+
+def locate_links(lines, urls):
+    """
+    Find the lines of a markdown file that link URLs are written on.
+
+    A URL is looked for as the "](url" that ends a link or image, falling
+    back to the bare URL; a URL given more than once is looked for after
+    the line of its previous occurrence.
+
+    Args:
+        lines: A list of the file's lines
+        urls: The URLs, as written
+
+    Returns:
+        A list of (line_number, url) tuples, line numbers counting from 1,
+        in line order
+    """
+    _, start = parse_front_matter(lines)
+    found = {}
+    located = []
+    for url in urls:
+        after = found.get(url, start)
+        number = _find_line(lines, "](" + url, after)
+        if number is None:
+            number = _find_line(lines, url, after)
+        if number is None:
+            number = start
+        found[url] = number + 1
+        located.append((number + 1, url))
+    return sorted(located)
+
+
+def _find_line(lines, text, start):
+    for number in range(start, len(lines)):
+        if text in lines[number]:
+            return number
+    return None
+
+
+def resolve_link(url, page_url):
+    """
+    Turn an internal URL into the site path it points at.
+
+    Args:
+        url: The URL as written in the markdown
+        page_url: The URL of the page it is written in, against which
+            relative URLs are resolved
+
+    Returns:
+        A root-relative path, e.g. "/blog/tom/", or None for external URLs,
+        mailto: and the like, and links to a fragment of the same page
+    """
+    if url.startswith("//") or SCHEME_PATTERN.match(url):
+        return None
+    path = url.split("#", 1)[0].split("?", 1)[0]
+    if not path:
+        return None
+    path = unquote(path)
+    if not path.startswith("/"):
+        trailing = path.endswith("/")
+        path = posixpath.normpath(posixpath.join(page_url, path))
+        if trailing and path != "/":
+            path += "/"
+    return path
+
+
+def link_targets(manifest):
+    """
+    Every path a link may point at in the built site.
+
+    The set is built from the build manifest (pages, listing pages, feeds,
+    search files) and the synced static files, so no output is read. A page
+    is reachable as "/blog/tom/", "/blog/tom" and "/blog/tom/index.html".
+
+    Args:
+        manifest: The BuildManifest of the build
+
+    Returns:
+        A set of root-relative paths
+    """
+    targets = {"/"}
+    for rel_path in list(manifest.pages) + list(manifest.static_files):
+        path = "/" + rel_path.replace(os.sep, "/")
+        targets.add(path)
+        directory, name = posixpath.split(path)
+        if name == "index.html":
+            targets.add(directory.rstrip("/") + "/")
+            targets.add(directory)
+    return targets
+
+
+def check_links(routes, targets, manifest):
+    """
+    Check every internal link and image of the site's pages.
+
+    The URLs are the ones the manifest recorded when each page was
+    rendered, so no page is parsed again; only the sources of pages with a
+    broken link are read, to find the lines to report.
+
+    Args:
+        routes: The site's routes (site_routes.Route)
+        targets: Set of paths that exist, from link_targets
+        manifest: The BuildManifest of the build
+
+    Returns:
+        A list of BrokenLink, in route order then line order
+    """
+    broken = []
+    for route in routes:
+        urls = []
+        for url in manifest.page_links(route.dest):
+            path = resolve_link(url, route.url)
+            if path is not None and path not in targets:
+                urls.append(url)
+        if not urls:
+            continue
+        with open(route.source, 'r') as f:
+            lines = f.read().split("\n")
+        for number, url in locate_links(lines, urls):
+            broken.append(BrokenLink(route.source, number, url))
+    return broken
+
+
+def report_broken_links(broken):
+    """
+    Print broken links as "file:line: broken link url", one per line.
+    """
+    for link in broken:
+        print(f"{link.source}:{link.line}: broken link {link.url}")
+    if broken:
+        print(f"Found {len(broken)} broken internal links")
+    else:
+        print("No broken internal links")
@@ -0,0 +1,245 @@
+import os
+import hashlib
+from collections import namedtuple
+from build_manifest import print_explanation
+from document import slugify
+from htmlnode import LeafNode, ParentNode
+from markup import escape_text
+from output_staging import atomic_write
+from site_routes import dest_for_url
+from template import load_template
+from url_rewriter import url_rewriter
+
+# Entries per listing page before it is split into numbered pages
+LISTING_PAGE_SIZE = 10
+
+TAGS_URL = "/tags/"
+ARCHIVE_URL = "/archive/"
+
+# One generated page listing other pages
+#   kind: "section", "tag", "tags" or "archive"
+#   url, dest: As in site_routes.Route
+#   title: Page title
+#   entries: PageMeta of the listed pages (TagEntry for the "tags" page)
+#   number, count: This page's number (from 1) and the number of pages
+#   prev_url, next_url: Neighbouring pages of the same listing, or None
+ListingPage = namedtuple("ListingPage", ["kind", "url", "dest", "title", "entries", "number", "count",
+                                         "prev_url", "next_url"])
+
+# One tag on the page listing every tag
+TagEntry = namedtuple("TagEntry", ["tag", "url", "count"])
+
+
+def tag_url(tag):
+    """
+    The URL of a tag's listing page.
+    """
+    return f"{TAGS_URL}{slugify(tag) or 'tag'}/"
+
+
+def _sort_pages(pages):
+    """
+    Newest first, undated pages last, pages of the same date by title.
+    """
+    pages = sorted(pages, key=lambda page: (page.title or "", page.url))
+    return sorted(pages, key=lambda page: page.date or "", reverse=True)
+
+
+def plan_listing_pages(index, routes, dest_dir, page_size=LISTING_PAGE_SIZE):
+    """
+    Plan the section, tag and archive pages of a site from its metadata index.
+
+    - A section page lists the pages below a directory URL that has no page
+      of its own, e.g. /blog/ for /blog/tom/ and /blog/glorfindel/.
+    - Every tag gets a page at /tags/<tag>/, and /tags/ lists the tags.
+    - /archive/ lists every dated page, newest first.
+
+    Long listings are split into pages of page_size entries; page n > 1 is
+    at <url>page/<n>/. A hand-written page always wins over a generated one
+    at the same URL, and the tag and archive pages win over a content section
+    of the same name; both clashes are reported.
+
+    Args:
+        index: A MetadataIndex of the pages being built (drafts are listed
+            only if it contains them)
+        routes: The site's routes (its hand-written pages)
+        dest_dir: Path to the destination (public) directory
+        page_size: Entries per listing page
+
+    Returns:
+        A list of ListingPage sorted by URL
+    """
+    listed = _sort_pages(index.pages)
+    taken = {route.url for route in routes}
+    listings = []
+
+    # Sections: every ancestor directory URL without a page of its own
+    sections = {}
+    for page in listed:
+        parts = page.url.strip("/").split("/")
+        for depth in range(1, len(parts)):
+            url = "/" + "/".join(parts[:depth]) + "/"
+            sections.setdefault(url, []).append(page)
+    for url, pages in sections.items():
+        title = url.strip("/").split("/")[-1].replace("-", " ").replace("_", " ").title()
+        listings.append(("section", url, title, pages))
+
+    tags = {}
+    for page in listed:
+        for tag in page.tags:
+            tags.setdefault(tag, []).append(page)
+    # Tags that differ only in case or punctuation ("Python", "python") share
+    # a URL; they are listed together under the most used spelling
+    spellings = {}
+    for tag in sorted(tags, key=lambda tag: (-len(tags[tag]), tag)):
+        spellings.setdefault(tag_url(tag), []).append(tag)
+    merged = []
+    for url, names in spellings.items():
+        if len(names) > 1:
+            print(f"Tags {', '.join(map(repr, names))} share {url}; listing them as {names[0]!r}")
+        urls = {page.url for name in names for page in tags[name]}
+        pages = [page for page in listed if page.url in urls]
+        merged.append(TagEntry(names[0], url, len(pages)))
+        listings.append(("tag", url, f"Tagged: {names[0]}", pages))
+    if merged:
+        listings.append(("tags", TAGS_URL, "Tags", sorted(merged, key=lambda entry: entry.tag.lower())))
+
+    dated = [page for page in listed if page.date is not None]
+    if dated:
+        listings.append(("archive", ARCHIVE_URL, "Archive", dated))
+
+    generated = {url: kind for kind, url, _, _ in listings if kind != "section"}
+    planned = []
+    for kind, url, title, entries in listings:
+        if url in taken:
+            if kind != "section":
+                print(f"Page {url} replaces the generated {kind} listing")
+            continue
+        if kind == "section" and url in generated:
+            print(f"Section {url} clashes with the generated {generated[url]} listing; not listing it")
+            continue
+        planned.extend(_paginate(kind, url, title, entries, dest_dir, page_size))
+    return sorted(planned, key=lambda listing: listing.url)
+
+
+def _paginate(kind, url, title, entries, dest_dir, page_size):
+    chunks = [entries[start:start + page_size] for start in range(0, len(entries), page_size)] or [[]]
+    urls = [url] + [f"{url}page/{number}/" for number in range(2, len(chunks) + 1)]
+    for number, chunk in enumerate(chunks, 1):
+        page_title = title if number == 1 else f"{title} (page {number})"
+        yield ListingPage(
+            kind, urls[number - 1], dest_for_url(urls[number - 1], dest_dir), page_title, chunk,
+            number, len(chunks),
+            urls[number - 2] if number > 1 else None,
+            urls[number] if number < len(chunks) else None,
+        )
+
+
+def listing_fingerprint(listing):
+    """
+    Hash everything a listing page's HTML depends on besides the template,
+    generator and base path (which the build manifest tracks), so a page is
+    only rebuilt when an entry on it changed.
+    """
+    return hashlib.sha256(repr(listing[:2] + listing[3:]).encode()).hexdigest()
+
+
+def listing_node(listing, rewriter=None):
+    """
+    Build the content of a listing page as an HTML tree.
+
+    Args:
+        listing: A ListingPage
+        rewriter: Optional UrlRewriter applied to the links
+
+    Returns:
+        A <div> ParentNode
+    """
+    rewrite = rewriter if rewriter is not None else (lambda url: url)
+    items = []
+    for entry in listing.entries:
+        if listing.kind == "tags":
+            items.append(ParentNode("li", [
+                LeafNode("a", entry.tag, {"href": rewrite(entry.url)}),
+                LeafNode(None, f" ({entry.count})"),
+            ]))
+            continue
+        children = [LeafNode("a", entry.title or entry.url, {"href": rewrite(entry.url)})]
+        if entry.date is not None:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("time", entry.date, {"datetime": entry.date}))
+        if entry.summary:
+            children.append(LeafNode("p", entry.summary))
+        items.append(ParentNode("li", children))
+
+    children = [LeafNode("h1", listing.title)]
+    if items:
+        children.append(ParentNode("ul", items, {"class": "listing"}))
+    if listing.count > 1:
+        links = []
+        if listing.prev_url is not None:
+            links.append(LeafNode("a", "Newer", {"href": rewrite(listing.prev_url), "rel": "prev"}))
+        links.append(LeafNode("span", f"Page {listing.number} of {listing.count}"))
+        if listing.next_url is not None:
+            links.append(LeafNode("a", "Older", {"href": rewrite(listing.next_url), "rel": "next"}))
+        children.append(ParentNode("nav", links, {"class": "pagination"}))
+    return ParentNode("div", children)
+
+
+def render_listing_page(listing, template_path, basepath="/"):
+    """
+    Write one listing page, filled into the site template.
+
+    Args:
+        listing: A ListingPage
+        template_path: Path to the HTML template file
+        basepath: Base URL path for the site, or a UrlRewriter (default: "/")
+    """
+    rewriter = url_rewriter(basepath)
+    template = load_template(template_path, rewriter)
+    content = listing_node(listing, rewriter).to_html()
+    html = template.render(Title=escape_text(listing.title), Content=content, Toc="")
+    os.makedirs(os.path.dirname(listing.dest), exist_ok=True)
+    atomic_write(listing.dest, html)
+
+
+def generate_listing_pages(index, routes, template_path, dest_dir, basepath="/", manifest=None,
+                           explain=False, page_size=LISTING_PAGE_SIZE, force=False):
+    """
+    Generate the listing pages of a site, skipping the ones that are up to date.
+
+    Only the metadata index is used, so post bodies are never read again; a
+    listing page is rebuilt when its fingerprint (the entries on it and its
+    neighbours) changed, e.g. adding a post rewrites the pages listing it.
+
+    Args:
+        index: A MetadataIndex
+        routes: The site's routes
+        template_path: Path to the HTML template file
+        dest_dir: Path to the destination (public) directory
+        basepath: Base URL path for the site (default: "/")
+        manifest: Optional BuildManifest used to skip unchanged pages
+        explain: Print why each page was (or was not) regenerated
+        page_size: Entries per listing page
+        force: Rebuild every listing page (e.g. after a template change)
+
+    Returns:
+        The list of output paths that were regenerated
+    """
+    rendered = []
+    for listing in plan_listing_pages(index, routes, dest_dir, page_size):
+        fingerprint = listing_fingerprint(listing)
+        if force or manifest is None:
+            reason = "forced" if force else "no manifest"
+        else:
+            reason = manifest.listing_rebuild_reason(listing.dest, fingerprint)
+        if explain:
+            print_explanation(listing.dest, reason, manifest)
+        if reason is not None:
+            render_listing_page(listing, template_path, basepath)
+            rendered.append(listing.dest)
+        if manifest is not None:
+            manifest.record_listing(listing.dest, fingerprint)
+    if rendered:
+        print(f"Generated {len(rendered)} listing pages")
+    return rendered
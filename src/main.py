@@ -1,57 +1,266 @@
 import os
 import sys
+import argparse
 import shutil
-from generate_pages_recursive import generate_pages_recursive
+from build_trace import enable_tracing, span
+from block_cache import DEFAULT_BLOCK_DIR, disable_block_cache, enable_block_cache
+from highlight import DEFAULT_HIGHLIGHT_DIR, disable_highlight_cache, enable_highlight_cache
+from build_manifest import BuildManifest, BUILD_DIR, DEFAULT_MANIFEST_PATH
+from generate_pages_recursive import current_routes, generate_pages_recursive
+from listing_pages import LISTING_PAGE_SIZE
+from output_staging import DEFAULT_GENERATIONS, OutputStager, atomic_write
+from page_executor import EXECUTOR_KINDS, create_executor
+from search_index import DEFAULT_SEARCH_STORE
+from link_checker import check_links, link_targets, report_broken_links
+from static_sync import is_synced, sync_directory
+from watch import SiteWatcher, serve
 
-def copy_directory(source_dir, dest_dir):
+def parse_args(argv):
     """
-    Recursively copy all files from source_dir to dest_dir.
-    Delete the contents of dest_dir first if it exists.
-    """
-    # Delete destination directory if it exists
-    if os.path.exists(dest_dir):
-        print(f"Deleting directory: {dest_dir}")
-        shutil.rmtree(dest_dir)
+    Parse the command line arguments.
     
-    # Create destination directory
-    print(f"Creating directory: {dest_dir}")
-    os.makedirs(dest_dir)
+    Args:
+        argv: List of arguments (without the program name)
+        
+    Returns:
+        An argparse.Namespace with the build options
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate the static site into docs/. "
+                    "Run with 'watch' as the first argument to rebuild pages, listing pages and "
+                    "static files on every change (the sitemap, feed, search index and link check "
+                    "are only updated by a full build).")
+    parser.add_argument("basepath", nargs="?", default="/static_site_generator/",
+                        help="Base URL path for the site (default: /static_site_generator/)")
+    parser.add_argument("--explain", action="store_true",
+                        help="Print why each page was rebuilt or skipped")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the build manifest and regenerate every page")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH,
+                        help=f"Path of the build manifest (default: {DEFAULT_MANIFEST_PATH})")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of pages to render in parallel (0 = one per CPU, default: 1)")
+    parser.add_argument("--executor", choices=EXECUTOR_KINDS, default="process",
+                        help="How parallel pages are rendered when --jobs is not 1 (default: process)")
+    parser.add_argument("--drafts", action="store_true",
+                        help="Also generate pages marked \"draft: true\" in their front matter")
+    parser.add_argument("--page-size", type=int, default=LISTING_PAGE_SIZE,
+                        help="Entries per generated section, tag and archive page "
+                             f"(0 = no listing pages, default: {LISTING_PAGE_SIZE})")
+    parser.add_argument("--site-url", metavar="URL",
+                        help="The site's origin, e.g. https://user.github.io; "
+                             "enables sitemap.xml and the Atom feed (feed.xml)")
+    parser.add_argument("--search", action="store_true",
+                        help="Build a full-text search index into search/, keeping page terms in "
+                             f"{DEFAULT_SEARCH_STORE} so later builds only re-index changed pages")
+    parser.add_argument("--check-links", action="store_true",
+                        help="Report internal links and images that point at no page or static file, "
+                             "and exit with status 1 if there are any")
+    parser.add_argument("--hash-static", action="store_true",
+                        help="Compare static files by content hash instead of size and mtime")
+    parser.add_argument("--link-static", action="store_true",
+                        help="Hardlink static files into the output instead of copying them")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                        help="Print every copied static file")
+    parser.add_argument("--no-stage", dest="stage", action="store_false",
+                        help="Write straight into docs/ instead of staging and swapping it in")
+    parser.add_argument("--generations", type=int, default=DEFAULT_GENERATIONS,
+                        help=f"Number of previous outputs kept for rollback (default: {DEFAULT_GENERATIONS})")
+    parser.add_argument("--rollback", action="store_true",
+                        help="Swap the most recent previous output back into docs/ and exit")
+    parser.add_argument("--block-cache", choices=("off", "memory", "disk"), default="memory",
+                        help="Reuse the HTML of blocks rendered before: within this run (memory) "
+                             f"or also across runs, stored in {DEFAULT_BLOCK_DIR} (disk) (default: memory)")
+    parser.add_argument("--highlight-cache", choices=("off", "disk"), default="disk",
+                        help="Reuse highlighted code samples from earlier runs, stored in "
+                             f"{DEFAULT_HIGHLIGHT_DIR} (default: disk)")
+    parser.add_argument("--trace", metavar="OUT.json",
+                        help="Record per-phase and per-page timings as a Chrome/Perfetto trace")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="Watch mode: also serve docs/ over HTTP on this port")
+    parser.add_argument("--poll", action="store_true",
+                        help="Watch mode: poll for changes instead of using inotify")
+    return parser.parse_args(argv)
+
+def build_site(args, docs_dir="docs"):
+    """
+    Run one incremental build of the whole site.
     
-    # Copy all files and subdirectories
-    for item in os.listdir(source_dir):
-        source_item = os.path.join(source_dir, item)
-        dest_item = os.path.join(dest_dir, item)
+    Args:
+        args: Options from parse_args
+        docs_dir: Output directory (default: "docs")
         
-        if os.path.isfile(source_item):
-            print(f"Copying file: {source_item} -> {dest_item}")
-            shutil.copy(source_item, dest_item)
-        else:
-            # Recursively copy subdirectories
-            copy_directory(source_item, dest_item)
-
-def main():
-    # Get base path from command line argument, default to "/static_site_generator/"
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/static_site_generator/"
-    
-    # Step 1: Delete docs directory if it exists
-    docs_dir = "docs"
-    if os.path.exists(docs_dir):
-        print(f"Deleting directory: {docs_dir}")
-        shutil.rmtree(docs_dir)
-    
-    # Step 2: Copy static files to docs directory
+    Returns:
+        (manifest, broken_links): the saved BuildManifest describing the
+        output and the broken internal links found (always empty without
+        --check-links)
+    """
+    tracer = enable_tracing() if args.trace else None
+    cache = _enable_block_cache(args)
+    if args.highlight_cache == "disk":
+        enable_highlight_cache(DEFAULT_HIGHLIGHT_DIR)
+    else:
+        disable_highlight_cache()
+    with span("build"):
+        manifest, broken_links = _build(args, docs_dir)
+    
+    if cache is not None:
+        print(cache.summary())
+    if tracer is not None:
+        tracer.write_chrome_trace(args.trace)
+        print(tracer.summary())
+        print(f"Trace written to {args.trace}")
+    
+    if args.check_links:
+        report_broken_links(broken_links)
+    print("Site generation complete!")
+    return manifest, broken_links
+
+def _enable_block_cache(args):
+    """
+    Set up the block cache selected by --block-cache.
+    
+    Returns:
+        The active BlockCache, or None when it is off
+    """
+    if args.block_cache == "off":
+        disable_block_cache()
+        return None
+    if args.block_cache == "memory":
+        return enable_block_cache()
+    if args.force and os.path.isdir(DEFAULT_BLOCK_DIR):
+        shutil.rmtree(DEFAULT_BLOCK_DIR)
+    return enable_block_cache(directory=DEFAULT_BLOCK_DIR)
+
+def _build(args, docs_dir):
+    """
+    The build steps behind build_site.
+    """
+    basepath = args.basepath
+    
+    # Step 1: Load the manifest of the previous build; pages whose inputs are
+    # unchanged are skipped instead of rebuilding everything
+    manifest = BuildManifest(args.manifest, "template.html", basepath, docs_dir)
+    manifest.options = _output_options(args)
+    if args.force:
+        manifest.reset()
+    
+    # Step 2: When nothing changed, leave docs/ (and the generations kept for
+    # rollback) alone instead of staging a copy identical to it
+    with span("up-to-date check"):
+        routes = None if args.force else _current_routes(args, manifest, docs_dir)
+    if routes is not None:
+        print(f"Nothing changed since the last build; {docs_dir} is up to date")
+        manifest.keep_previous()
+        broken_links = check_links(routes, link_targets(manifest), manifest) if args.check_links else []
+        manifest.save()
+        return manifest, broken_links
+    
+    # Build into a staging copy of docs (hardlinked, so unchanged files cost
+    # nothing) while the live site keeps being served; a forced build, or one
+    # without a usable manifest, starts from an empty directory so no file of
+    # an earlier build is carried over
+    stager = None
+    out_dir = docs_dir
+    if args.stage:
+        stager = OutputStager(docs_dir, BUILD_DIR, args.generations)
+        with span("stage"):
+            out_dir = stager.prepare(clean=args.force or not manifest.has_previous)
+        manifest.output_dir = out_dir
+    
+    # Step 3: Sync static files into the output directory, copying only the
+    # files that changed and removing the ones deleted from static/
     print("Copying static files...")
-    copy_directory("static", "docs")
+    with span("static copy"):
+        sync = sync_directory("static", out_dir, manifest.previous_static_files(),
+                              jobs=args.jobs or os.cpu_count(), use_hash=args.hash_static,
+                              link=args.link_static, verbose=args.verbose)
+    manifest.static_files = sync.files
+    print(f"Static files: {len(sync.copied)} copied, {len(sync.skipped)} unchanged, {len(sync.removed)} removed")
     
     # Add .nojekyll file to disable Jekyll processing
-    with open("docs/.nojekyll", "w") as f:
-        f.write("")
+    atomic_write(os.path.join(out_dir, ".nojekyll"), "")
     
-    # Step 3: Generate all pages recursively with configurable base path
+    # Step 4: Generate all pages recursively with configurable base path
     print(f"Generating pages with base path: {basepath}")
-    generate_pages_recursive("content", "template.html", "docs", basepath)
+    with create_executor(args.executor, args.jobs) as executor:
+        broken_links = generate_pages_recursive(
+            "content", "template.html", out_dir, basepath, manifest=manifest, explain=args.explain,
+            executor=executor, drafts=args.drafts, page_size=args.page_size, site_url=args.site_url,
+            search_store=DEFAULT_SEARCH_STORE if args.search else None, check_site_links=args.check_links)
     
-    print("Site generation complete!")
+    # Step 5: Remove pages whose source markdown no longer exists
+    with span("cleanup"):
+        manifest.remove_stale_outputs()
+    
+    # Step 6: Swap the finished output in with a single rename, keeping the
+    # previous one for rollback
+    if stager is not None:
+        with span("promote"):
+            stager.promote(args.manifest)
+        manifest.output_dir = docs_dir
+    manifest.save()
+    return manifest, broken_links
+
+def _output_options(args):
+    """
+    The build options that change the output, recorded in the manifest.
+    """
+    return {
+        "drafts": args.drafts,
+        "page_size": args.page_size,
+        "site_url": args.site_url,
+        "search": args.search,
+    }
+
+def _current_routes(args, manifest, docs_dir):
+    """
+    The site's routes if docs_dir already holds what this build would
+    produce, else None.
+    """
+    if manifest.previous.get("options") != manifest.options:
+        return None
+    if not os.path.exists(os.path.join(docs_dir, ".nojekyll")):
+        return None
+    if not is_synced("static", docs_dir, manifest.previous_static_files(), args.hash_static):
+        return None
+    return current_routes("content", docs_dir, manifest, args.drafts,
+                          DEFAULT_SEARCH_STORE if args.search else None)
+
+def watch_site(args, docs_dir="docs"):
+    """
+    Build the site once, then keep rebuilding what each change affects.
+    
+    Only pages, listing pages and static files are rebuilt on change; the
+    sitemap, feed, search index and link check of --site-url, --search and
+    --check-links are produced by the initial build and refreshed by the
+    next full build.
+    """
+    manifest, _ = build_site(args, docs_dir)
+    full_build_only = [flag for flag, enabled in (("--site-url", args.site_url), ("--search", args.search),
+                                                  ("--check-links", args.check_links)) if enabled]
+    if full_build_only:
+        print(f"Note: the outputs of {', '.join(full_build_only)} are not refreshed in watch mode; "
+              "run a full build to update them")
+    if args.serve:
+        serve(docs_dir, args.serve)
+    watcher = SiteWatcher(manifest, "content", "static", "template.html", docs_dir, args.basepath, args.drafts,
+                          args.page_size)
+    watcher.run(poll=args.poll)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "watch":
+        watch_site(parse_args(argv[1:]))
+        return
+    
+    args = parse_args(argv)
+    if args.rollback:
+        OutputStager("docs", BUILD_DIR, args.generations).rollback(args.manifest)
+    else:
+        _, broken_links = build_site(args)
+        if broken_links:
+            sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,24 +1,123 @@
+from block_type import BlockType, block_type_of_lines
+
+# Opens and closes a fenced code block
+FENCE = "```"
+
+# Lines buffered after an opening fence before it is taken as unclosed
+MAX_FENCED_LINES = 10000
+
 def markdown_to_blocks(markdown):
     """
     Split a markdown string into blocks based on blank lines.
     
+    Compatibility wrapper around scan_blocks, returning each block as text.
+    
     Args:
         markdown: A string containing markdown text
         
     Returns:
         A list of strings, each representing a block of markdown
     """
-    # Split the markdown by double newlines to separate blocks
-    blocks = markdown.split("\n\n")
+    return ["\n".join(lines) for _, lines in scan_blocks(markdown)]
+
+def scan_blocks(markdown):
+    """
+    Split a markdown string into typed blocks (see scan_lines).
+    
+    Args:
+        markdown: A string containing markdown text
+        
+    Yields:
+        (BlockType, lines) tuples, lines being the block's list of lines
+    """
+    return scan_lines(markdown.split("\n"))
+
+def scan_lines(lines):
+    """
+    Group markdown lines into typed blocks in a single pass.
+    
+    The lines are consumed lazily and each block is yielded as soon as it
+    is complete, so a file can be processed while it is read and only one
+    block is held in memory at a time.
     
-    # Process each block: strip whitespace and filter out empty blocks
-    result = []
-    for block in blocks:
-        # Strip leading and trailing whitespace
-        cleaned_block = block.strip()
+    Blocks are separated by blank (or whitespace-only) lines, and each block
+    is stripped of leading and trailing whitespace. A block starting with a
+    ``` fence runs until the line that closes the fence, so fenced code may
+    contain blank lines; a fence that is never closed is treated as ordinary
+    text. So that an unclosed fence does not buffer the rest of a large
+    file, a fence still open after MAX_FENCED_LINES lines is treated as
+    unclosed right away.
+    
+    Args:
+        lines: An iterable of lines without their line endings
         
-        # Only include non-empty blocks
-        if cleaned_block:
-            result.append(cleaned_block)
-            
-    return result
\ No newline at end of file
+    Yields:
+        (BlockType, lines) tuples, lines being the block's list of lines
+    """
+    block = []
+    fenced = False
+    for line in lines:
+        if fenced:
+            block.append(line)
+            if line.rstrip().endswith(FENCE):
+                yield BlockType.CODE, _strip_block(block)
+                block = []
+                fenced = False
+            elif len(block) > MAX_FENCED_LINES:
+                # Give up on the fence; the last paragraph may go on
+                tail = []
+                yield from _split_unfenced(block, tail)
+                block = tail
+                fenced = False
+        elif not line or line.isspace():
+            if block:
+                yield _typed_block(block)
+                block = []
+        elif not block and line.lstrip().startswith(FENCE):
+            block.append(line)
+            stripped = line.strip()
+            # A fence closed on its own line (```code```) is a complete block
+            if len(stripped) >= 2 * len(FENCE) and stripped.endswith(FENCE):
+                yield BlockType.CODE, _strip_block(block)
+                block = []
+            else:
+                fenced = True
+        else:
+            block.append(line)
+    
+    if fenced:
+        # The fence was never closed: split what followed it as usual
+        tail = []
+        yield from _split_unfenced(block, tail)
+        block = tail
+    if block:
+        yield _typed_block(block)
+
+def _strip_block(lines):
+    """
+    Strip the whitespace at the start and end of a block, in place.
+    """
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return lines
+
+def _typed_block(lines):
+    lines = _strip_block(lines)
+    return block_type_of_lines(lines), lines
+
+def _split_unfenced(lines, tail):
+    """
+    Split lines on blank lines without treating ``` as a fence.
+    
+    Yields the blocks that a blank line completes; the lines after the last
+    blank line are appended to tail, as they may continue.
+    """
+    block = []
+    for line in lines:
+        if not line or line.isspace():
+            if block:
+                yield _typed_block(block)
+                block = []
+        else:
+            block.append(line)
+    tail.extend(block)
@@ -1,100 +1,255 @@
-from htmlnode import HTMLNode, LeafNode, ParentNode
+import threading
+from htmlnode import LeafNode, ParentNode, RawHTMLNode, shared_props
+from highlight import highlight_code
 from textnode import TextNode, TextType
-from block_type import BlockType, block_to_block_type
-from markdown_to_blocks import markdown_to_blocks
+from block_type import BLOCK_REGISTRY, BlockType
+from markdown_to_blocks import scan_blocks
 from markdown_to_textnodes import text_to_textnodes
 from text_node_to_html_node import text_node_to_html_node
+from build_trace import span
+from document import Document
 
-def markdown_to_html_node(markdown):
+# The Document that the inline nodes of the block being rendered are added
+# to, per thread (see _render_for_document)
+_collecting = threading.local()
+
+def markdown_to_html_node(markdown, rewriter=None, cache=None):
     """
     Convert a markdown string to an HTML node.
     
     Args:
         markdown: A string containing markdown
+        rewriter: Optional UrlRewriter applied to link and image URLs
+        cache: Optional BlockCache; blocks found in it are not parsed again
+            and appear in the tree as RawHTMLNode
         
     Returns:
         An HTMLNode representing the markdown document
     """
-    # Split the markdown into blocks
-    blocks = markdown_to_blocks(markdown)
+    # Split the markdown into typed blocks of lines in one pass
+    blocks = scan_blocks(markdown)
     
     # Process each block and create HTML nodes
+    if cache is not None:
+        return ParentNode("div", [_cached_block_node(block_type, lines, rewriter, cache)
+                                  for block_type, lines in blocks])
+    
     children = []
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        block_node = create_html_node_for_block(block, block_type)
+    for block_type, lines in blocks:
+        block_node = create_html_node_for_lines(block_type, lines, rewriter)
         children.append(block_node)
     
     # Create a parent div node containing all the blocks
     return ParentNode("div", children)
 
-def create_html_node_for_block(block, block_type):
+def markdown_to_document(markdown, rewriter=None, cache=None, index_terms=False):
+    """
+    Convert a markdown string to a Document: the HTML tree plus the title,
+    heading outline, word count and links, collected in the same walk over
+    the blocks.
+    
+    Headings get unique anchor ids (see Document.add_heading). They are
+    always rendered rather than taken from the block cache, since their id
+    depends on the headings before them.
+    
+    Args:
+        markdown: A string containing markdown
+        rewriter: Optional UrlRewriter applied to link and image URLs
+        cache: Optional BlockCache for the other blocks
+        index_terms: Also count the search terms for Document.terms
+        
+    Returns:
+        A Document
+    """
+    document = Document(index_terms)
+    children = []
+    for block_type, lines in scan_blocks(markdown):
+        if block_type == BlockType.HEADING:
+            block = lines[0] if len(lines) == 1 else "\n".join(lines)
+            children.append(create_heading_node(block, rewriter, document))
+            continue
+        if cache is not None:
+            children.append(_cached_block_node(block_type, lines, rewriter, cache, document))
+        else:
+            children.append(_render_for_document(block_type, lines, rewriter, document))
+    
+    document.node = ParentNode("div", children)
+    return document
+
+def render_blocks(blocks, rewriter=None, cache=None, document=None):
+    """
+    Render blocks one at a time, for streaming a document's HTML.
+    
+    Args:
+        blocks: (BlockType, lines) tuples, e.g. from scan_lines
+        rewriter: Optional UrlRewriter applied to link and image URLs
+        cache: Optional BlockCache
+        document: Optional Document collecting metadata as markdown_to_document
+            does (headings then get their anchor ids)
+        
+    Yields:
+        The HTML of each block
+    """
+    for block_type, lines in blocks:
+        if document is not None and block_type == BlockType.HEADING:
+            block = lines[0] if len(lines) == 1 else "\n".join(lines)
+            yield create_heading_node(block, rewriter, document).to_html()
+            continue
+        if cache is not None:
+            yield _cached_block_html(block_type, lines, rewriter, cache, document)
+        else:
+            yield _render_for_document(block_type, lines, rewriter, document).to_html()
+
+def _render_for_document(block_type, lines, rewriter, document):
+    """
+    Render a block, adding the TextNodes its inline markdown is parsed into
+    to a Document (see text_to_children).
+    """
+    if document is None:
+        return create_html_node_for_lines(block_type, lines, rewriter)
+    _collecting.document = document
+    try:
+        return create_html_node_for_lines(block_type, lines, rewriter)
+    finally:
+        _collecting.document = None
+
+def _cached_block_node(block_type, lines, rewriter, cache, document=None):
+    return RawHTMLNode(_cached_block_html(block_type, lines, rewriter, cache, document))
+
+def _cached_block_html(block_type, lines, rewriter, cache, document=None):
+    """
+    Return a block's rendered HTML from the cache, rendering and storing it
+    on a miss.
+    
+    For a Document, the block's metadata (see Document.metadata) is stored
+    with its HTML, so a hit adds it to the Document without parsing the
+    block again.
+    """
+    # Custom block types change what a block renders to, so the registered
+    # handlers are part of the key
+    context = (None if rewriter is None else rewriter.key(), BLOCK_REGISTRY.key())
+    if document is None:
+        key = cache.key("\n".join(lines), context)
+        html = cache.get(key)
+        if html is None:
+            html = create_html_node_for_lines(block_type, lines, rewriter).to_html()
+            cache.put(key, html)
+        return html
+    
+    # Entries with term counts are kept apart from those without
+    key = cache.key("\n".join(lines), context + (document.indexes_terms,))
+    entry = cache.get_entry(key)
+    if entry is None:
+        block_document = Document(document.indexes_terms)
+        html = _render_for_document(block_type, lines, rewriter, block_document).to_html()
+        entry = (html, block_document.metadata())
+        cache.put(key, *entry)
+    document.add_metadata(entry[1])
+    return entry[0]
+
+def create_html_node_for_lines(block_type, lines, rewriter=None):
+    """
+    Create an HTML node for a block produced by scan_blocks.
+    
+    The renderer is looked up in the block registry, so custom block types
+    registered with register_block_type are rendered here too.
+    
+    Args:
+        block_type: The BlockType of the block
+        lines: The lines of the block
+        rewriter: Optional UrlRewriter applied to link and image URLs
+        
+    Returns:
+        An HTMLNode representing the block
+    """
+    return BLOCK_REGISTRY.render(block_type, lines, rewriter)
+
+def create_html_node_for_block(block, block_type, rewriter=None):
     """
     Create an HTML node for a specific block based on its type.
     
     Args:
         block: A string containing a block of markdown
         block_type: The BlockType of the block
+        rewriter: Optional UrlRewriter applied to link and image URLs
         
     Returns:
         An HTMLNode representing the block
     """
-    if block_type == BlockType.PARAGRAPH:
-        return create_paragraph_node(block)
-    elif block_type == BlockType.HEADING:
-        return create_heading_node(block)
-    elif block_type == BlockType.CODE:
-        return create_code_node(block)
-    elif block_type == BlockType.QUOTE:
-        return create_quote_node(block)
-    elif block_type == BlockType.UNORDERED_LIST:
-        return create_unordered_list_node(block)
-    elif block_type == BlockType.ORDERED_LIST:
-        return create_ordered_list_node(block)
-    else:
-        raise ValueError(f"Unknown block type: {block_type}")
+    return BLOCK_REGISTRY.render(block_type, block.split("\n"), rewriter)
 
-def text_to_children(text):
+def text_to_children(text, rewriter=None):
     """
     Convert a string of text with inline markdown to a list of HTMLNode objects.
     
     Args:
         text: A string containing inline markdown
+        rewriter: Optional UrlRewriter applied to link and image URLs
         
     Returns:
         A list of HTMLNode objects representing the inline elements
     """
     # Convert text to TextNode objects
-    text_nodes = text_to_textnodes(text)
+    with span("inline split"):
+        text_nodes = text_to_textnodes(text)
+    document = getattr(_collecting, "document", None)
+    if document is not None:
+        document.add_text_nodes(text_nodes)
     
     # Convert TextNode objects to HTMLNode objects
-    return [text_node_to_html_node(node) for node in text_nodes]
+    return [text_node_to_html_node(node, rewriter) for node in text_nodes]
 
-def create_paragraph_node(block):
+def create_paragraph_node(block, rewriter=None, lines=None):
     """
     Create a paragraph HTML node.
     
     Args:
         block: A string containing a paragraph block
+        rewriter: Optional UrlRewriter applied to link and image URLs
+        lines: The block already split into lines (block is then not used)
         
     Returns:
         A ParentNode with a 'p' tag
     """
     # Replace newlines with spaces in paragraphs
-    paragraph_text = " ".join([line.strip() for line in block.split("\n")])
-    children = text_to_children(paragraph_text)
+    if lines is None:
+        lines = block.split("\n")
+    paragraph_text = " ".join([line.strip() for line in lines])
+    children = text_to_children(paragraph_text, rewriter)
     return ParentNode("p", children)
 
-def create_heading_node(block):
+def create_heading_node(block, rewriter=None, document=None):
     """
     Create a heading HTML node.
     
     Args:
         block: A string containing a heading block
+        rewriter: Optional UrlRewriter applied to link and image URLs
+        document: Optional Document the heading is added to; the node then
+            gets the heading's anchor id
         
     Returns:
         A ParentNode with an 'h1', 'h2', etc. tag
     """
+    level, heading_text = _heading_parts(block)
+    
+    # Create the heading node
+    if document is None:
+        children = text_to_children(heading_text, rewriter)
+        return ParentNode(f"h{level}", children)
+    
+    # The plain text (for the outline) comes from the same inline parse
+    with span("inline split"):
+        text_nodes = text_to_textnodes(heading_text)
+    anchor = document.add_heading(level, _plain_text(text_nodes), heading_text)
+    document.add_text_nodes(text_nodes)
+    children = [text_node_to_html_node(node, rewriter) for node in text_nodes]
+    return ParentNode(f"h{level}", children, {"id": anchor})
+
+def _heading_parts(block):
+    """
+    Split a heading block into its level and its text.
+    """
     # Count the number of # at the beginning to determine heading level
     level = 0
     for char in block:
@@ -104,16 +259,40 @@ def create_heading_node(block):
             break
     
     # Extract the heading text (remove the # characters and leading space)
-    heading_text = block[level:].strip()
+    return level, block[level:].strip()
+
+def _plain_text(text_nodes):
+    return "".join(node.text for node in text_nodes)
+
+def scan_outline(blocks):
+    """
+    Collect the title and heading outline of a document without rendering it.
     
-    # Create the heading node
-    children = text_to_children(heading_text)
-    return ParentNode(f"h{level}", children)
+    The anchor ids are the ones markdown_to_document and render_blocks give
+    the same headings, so a table of contents can be written before the
+    content is streamed.
+    
+    Args:
+        blocks: (BlockType, lines) tuples, e.g. from scan_lines
+        
+    Returns:
+        A Document with title and headings set (no node, words or links)
+    """
+    document = Document()
+    for block_type, lines in blocks:
+        if block_type == BlockType.HEADING:
+            level, heading_text = _heading_parts(lines[0] if len(lines) == 1 else "\n".join(lines))
+            document.add_heading(level, _plain_text(text_to_textnodes(heading_text)), heading_text)
+    return document
 
 def create_code_node(block):
     """
     Create a code block HTML node.
     
+    The fence's language specifier is kept as a "language-..." class on the
+    code tag, and the code is highlighted at build time when a lexer for the
+    language is registered (see highlight.py).
+    
     Args:
         block: A string containing a code block
         
@@ -126,72 +305,89 @@ def create_code_node(block):
         code_content = code_content[:-3]
     
     # If there's a language specifier on the first line, remove it
+    language = None
     lines = code_content.split("\n")
     if len(lines) > 0 and lines[0].strip() and not lines[0].startswith("```"):
         # The first line might be a language specifier
+        language = lines[0].split()[0]
         code_content = "\n".join(lines[1:])
+    code_content = code_content.strip()
     
-    # Create a TextNode for the code content (no inline parsing)
-    text_node = TextNode(code_content.strip(), TextType.TEXT)
-    code_leaf = text_node_to_html_node(text_node)
+    highlighted = highlight_code(code_content, language)
+    if highlighted is not None:
+        code_leaf = LeafNode(None, highlighted)
+    else:
+        # Create a TextNode for the code content (no inline parsing)
+        text_node = TextNode(code_content, TextType.TEXT)
+        code_leaf = text_node_to_html_node(text_node)
     
     # Wrap in a code tag and then a pre tag
-    code_node = ParentNode("code", [code_leaf])
+    props = shared_props(**{"class": f"language-{language}"}) if language else None
+    code_node = ParentNode("code", [code_leaf], props)
     return ParentNode("pre", [code_node])
 
-def create_quote_node(block):
+def create_quote_node(block, rewriter=None, lines=None):
     """
     Create a blockquote HTML node.
     
     Args:
         block: A string containing a quote block
+        rewriter: Optional UrlRewriter applied to link and image URLs
+        lines: The block already split into lines (block is then not used)
         
     Returns:
         A ParentNode with a 'blockquote' tag
     """
     # Remove the > prefix from each line
-    lines = block.split("\n")
+    if lines is None:
+        lines = block.split("\n")
     cleaned_lines = [line[1:].strip() for line in lines]
     quote_content = " ".join(cleaned_lines)
     
     # Create the quote node
-    children = text_to_children(quote_content)
+    children = text_to_children(quote_content, rewriter)
     return ParentNode("blockquote", children)
 
-def create_unordered_list_node(block):
+def create_unordered_list_node(block, rewriter=None, lines=None):
     """
     Create an unordered list HTML node.
     
     Args:
         block: A string containing an unordered list block
+        rewriter: Optional UrlRewriter applied to link and image URLs
+        lines: The block already split into lines (block is then not used)
         
     Returns:
         A ParentNode with a 'ul' tag containing 'li' children
     """
     # Split into list items
-    lines = block.split("\n")
+    if lines is None:
+        lines = block.split("\n")
     list_items = []
     
     for line in lines:
         # Remove the '- ' prefix from each line
         item_text = line[2:].strip()
-        item_children = text_to_children(item_text)
+        item_children = text_to_children(item_text, rewriter)
         list_items.append(ParentNode("li", item_children))
     
     return ParentNode("ul", list_items)
 
-def create_ordered_list_node(block):
+def create_ordered_list_node(block, rewriter=None, lines=None):
     """
     Create an ordered list HTML node.
     
     Args:
         block: A string containing an ordered list block
+        rewriter: Optional UrlRewriter applied to link and image URLs
+        lines: The block already split into lines (block is then not used)
         
     Returns:
         A ParentNode with an 'ol' tag containing 'li' children
     """
     # Split into list items
-    lines = block.split("\n")
+    if lines is None:
+        lines = block.split("\n")
     list_items = []
     
     for line in lines:
@@ -200,7 +396,21 @@ def create_ordered_list_node(block):
         if period_pos != -1:
             # Extract the item text (skip number, period, and space)
             item_text = line[period_pos + 1:].strip()
-            item_children = text_to_children(item_text)
+            item_children = text_to_children(item_text, rewriter)
             list_items.append(ParentNode("li", item_children))
     
-    return ParentNode("ol", list_items)
\ No newline at end of file
+    return ParentNode("ol", list_items)
+
+def _render_heading(lines, rewriter):
+    return create_heading_node(lines[0] if len(lines) == 1 else "\n".join(lines), rewriter)
+
+def _render_code(lines, rewriter):
+    return create_code_node(lines[0] if len(lines) == 1 else "\n".join(lines))
+
+# Renderers of the built-in block types (block_type registers their detectors)
+BLOCK_REGISTRY.register(BlockType.PARAGRAPH, render=lambda lines, rewriter: create_paragraph_node(None, rewriter, lines))
+BLOCK_REGISTRY.register(BlockType.HEADING, render=_render_heading)
+BLOCK_REGISTRY.register(BlockType.CODE, render=_render_code)
+BLOCK_REGISTRY.register(BlockType.QUOTE, render=lambda lines, rewriter: create_quote_node(None, rewriter, lines))
+BLOCK_REGISTRY.register(BlockType.UNORDERED_LIST, render=lambda lines, rewriter: create_unordered_list_node(None, rewriter, lines))
+BLOCK_REGISTRY.register(BlockType.ORDERED_LIST, render=lambda lines, rewriter: create_ordered_list_node(None, rewriter, lines))
@@ -1,27 +1,124 @@
+import re
 from textnode import TextNode, TextType
-from split_nodes import split_nodes_delimiter
-from split_nodes_markdown import split_nodes_image, split_nodes_link
+
+# Delimiters that open and close a run of formatted text
+DELIMITER_TYPES = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+
+# Characters the scanner stops at: emphasis and code delimiters, and the
+# "[" of a link or image (a plain character class searches much faster than
+# an alternation of the tokens themselves)
+INLINE_START_PATTERN = re.compile(r"[*_`\[]")
+
+# A complete link or image starting at the scanner's position. Neither part
+# may contain its own brackets, so a stray "[" or "]" before a link never
+# swallows the text up to the next "](", and the URL ends at whitespace, so
+# a match attempt never runs further than the next bracket or word
+LINK_PATTERN = re.compile(r"(!?)\[([^\[\]]*)\]\(([^()\s]*)\)")
+
 
 def text_to_textnodes(text):
     """
     Convert markdown text to a list of TextNode objects.
-    
+
+    The text is scanned once, left to right. Each opening delimiter is paired
+    with the next occurrence of the same delimiter (found with str.find
+    rather than kept on a delimiter stack: runs do not nest, since TextNodes
+    are flat); delimiters without a partner stay literal text. Code spans are taken verbatim. Links and
+    images are also recognized inside bold and italic runs: since TextNodes
+    are flat, the run is split around them (e.g. "**see [x](u) now**" gives
+    BOLD "see ", LINK "x", BOLD " now").
+
     Args:
         text: Raw markdown text string
-        
+
     Returns:
         A list of TextNode objects representing the markdown elements
     """
-    # Start with a single text node containing the entire text
-    nodes = [TextNode(text, TextType.TEXT)]
-    
-    # Split by markdown delimiters
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    
-    # Split by markdown images and links
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    
-    return nodes
\ No newline at end of file
+    nodes = []
+    # Where the pending plain text starts and where the next search starts
+    start = position = 0
+    # Positions from which a delimiter is known not to occur again, so
+    # unmatched openers never trigger a rescan of the rest of the text
+    exhausted = {}
+
+    while True:
+        match = INLINE_START_PATTERN.search(text, position)
+        if match is None:
+            break
+        index = match.start()
+        token = match.group()
+
+        if token == "*":
+            if not text.startswith("**", index):
+                position = index + 1
+                continue
+            token = "**"
+
+        if token in DELIMITER_TYPES:
+            end = index + len(token)
+            close = -1
+            if end < exhausted.get(token, len(text) + 1):
+                close = text.find(token, end)
+                if close == -1:
+                    exhausted[token] = end
+            if close == -1:
+                # No closing delimiter: keep it as text
+                position = end
+                continue
+
+            if index > start:
+                nodes.append(TextNode(text[start:index], TextType.TEXT))
+            content = text[end:close]
+            if token == "`":
+                nodes.append(TextNode(content, TextType.CODE))
+            else:
+                _append_formatted(nodes, content, DELIMITER_TYPES[token])
+            start = position = close + len(token)
+
+        else:
+            # A "[" preceded by "!" starts an image
+            if index > start and text[index - 1] == "!":
+                index -= 1
+            link = LINK_PATTERN.match(text, index)
+            if link is None:
+                position = match.end()
+                continue
+
+            if index > start:
+                nodes.append(TextNode(text[start:index], TextType.TEXT))
+            nodes.append(_link_node(link))
+            start = position = link.end()
+
+    if start < len(text) or not nodes:
+        nodes.append(TextNode(text[start:], TextType.TEXT))
+    return nodes
+
+
+def _link_node(link):
+    """
+    Build the TextNode for a LINK_PATTERN match.
+    """
+    text_type = TextType.IMAGE if link.group(1) else TextType.LINK
+    return TextNode(link.group(2), text_type, link.group(3))
+
+
+def _append_formatted(nodes, content, text_type):
+    """
+    Append a bold or italic run, splitting it around any links and images.
+    """
+    if "](" not in content:
+        nodes.append(TextNode(content, text_type))
+        return
+
+    start = 0
+    for link in LINK_PATTERN.finditer(content):
+        if link.start() > start:
+            nodes.append(TextNode(content[start:link.start()], text_type))
+        nodes.append(_link_node(link))
+        start = link.end()
+    if start < len(content) or start == 0:
+        nodes.append(TextNode(content[start:], text_type))
@@ -0,0 +1,50 @@
+class Markup(str):
+    """
+    A string of trusted, already escaped HTML.
+
+    LeafNode keeps Markup values unchanged, so content that was escaped
+    once (or is meant to be markup, like highlighted code) is never escaped
+    twice.
+    """
+    __slots__ = ()
+
+
+def escape_text(text):
+    """
+    Escape a string for use as HTML text content.
+
+    Only & and < can start markup in text, so only they are replaced; >
+    and quotes are harmless there and are left alone. Strings without
+    either character (the vast majority) are returned as they are after two
+    substring checks, which beats both str.translate and a regex search.
+
+    Args:
+        text: The text to escape (Markup is returned unchanged)
+
+    Returns:
+        The escaped string
+    """
+    if ("&" in text or "<" in text) and text.__class__ is not Markup:
+        return text.replace("&", "&amp;").replace("<", "&lt;")
+    return text
+
+
+def escape_attribute(value):
+    """
+    Escape a value for use inside a double-quoted HTML attribute.
+
+    Only & and " need replacing there.
+
+    Args:
+        value: The attribute value; non-strings are converted with str()
+
+    Returns:
+        The escaped string
+    """
+    if value.__class__ is Markup:
+        return value
+    if value.__class__ is not str:
+        value = str(value)
+    if "&" in value or '"' in value:
+        return value.replace("&", "&amp;").replace('"', "&quot;")
+    return value
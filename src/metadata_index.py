@@ -0,0 +1,112 @@
+import itertools
+from collections import namedtuple
+from extract_title import find_title
+from front_matter import parse_front_matter, tag_list
+
+# Lines read after the front matter when looking for an h1 header; a page
+# without one is listed by its URL rather than read to the end
+MAX_TITLE_LINES = 100
+
+# What the site knows about a page without rendering it
+#   source, url: As in site_routes.Route
+#   title: Front matter title, else the first h1 header, else None
+#   date: Front matter date as written (ISO dates sort correctly), or None
+#   tags: List of tag strings
+#   draft: True for pages left out of the build unless drafts are included
+#   summary: Front matter summary, or None
+PageMeta = namedtuple("PageMeta", ["source", "url", "title", "date", "tags", "draft", "summary"])
+
+
+def read_page_meta(route):
+    """
+    Read a page's metadata from the start of its file.
+
+    Only the front matter is read; when it has no title, the file is read
+    on until the h1 header, which normally comes right after it, for at
+    most MAX_TITLE_LINES lines. The markdown is never parsed into blocks or
+    rendered.
+
+    Args:
+        route: A site_routes.Route
+
+    Returns:
+        A PageMeta
+    """
+    with open(route.source, 'r') as f:
+        metadata, line_count = parse_front_matter(f)
+        title = metadata.get("title")
+        if title is None:
+            # Start over after the front matter: without one, the first
+            # line may itself be the title
+            f.seek(0)
+            try:
+                title = find_title(itertools.islice(f, line_count, None), MAX_TITLE_LINES)
+            except ValueError:
+                title = None
+
+    date = metadata.get("date")
+    summary = metadata.get("summary")
+    return PageMeta(
+        route.source,
+        route.url,
+        None if title is None else str(title),
+        None if date is None else str(date),
+        tag_list(metadata.get("tags")),
+        metadata.get("draft") is True,
+        None if summary is None else str(summary),
+    )
+
+
+class MetadataIndex:
+    """
+    Site-wide index of page metadata, built from the file headers alone.
+
+    Building it costs a read of each file's first lines, so listing pages,
+    draft filtering and rebuild decisions can use it before (or instead of)
+    rendering any page.
+
+    Args:
+        pages: A list of PageMeta, in URL order
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.by_source = {page.source: page for page in pages}
+        self.by_url = {page.url: page for page in pages}
+
+    def replace(self, page):
+        """
+        Swap in the re-read metadata of a page already in the index.
+        """
+        self.pages[self.pages.index(self.by_source[page.source])] = page
+        self.by_source[page.source] = page
+        self.by_url[page.url] = page
+
+    def published(self):
+        """
+        The pages that are not drafts, in URL order.
+        """
+        return [page for page in self.pages if not page.draft]
+
+    def tags(self):
+        """
+        Map every tag to the published pages carrying it.
+        """
+        tags = {}
+        for page in self.published():
+            for tag in page.tags:
+                tags.setdefault(tag, []).append(page)
+        return tags
+
+
+def build_metadata_index(routes):
+    """
+    Read the metadata of every routed page.
+
+    Args:
+        routes: A list of site_routes.Route
+
+    Returns:
+        A MetadataIndex
+    """
+    return MetadataIndex([read_page_meta(route) for route in routes])
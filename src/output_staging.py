@@ -0,0 +1,247 @@
+import os
+import shutil
+import ctypes
+import ctypes.util
+from contextlib import contextmanager
+
+# Flags for renameat2(2)
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+# Default number of previous outputs kept for rollback
+DEFAULT_GENERATIONS = 3
+
+
+def atomic_write(path, text):
+    """
+    Write a text file by writing a temporary file and renaming it into place.
+
+    Readers never see a half-written file, and a file that is hardlinked into
+    another output generation is replaced rather than modified.
+
+    Args:
+        path: Destination file path
+        text: Contents to write
+    """
+    with atomic_writer(path) as f:
+        f.write(text)
+
+
+@contextmanager
+def atomic_writer(path):
+    """
+    Open a temporary file that is renamed over path once the block exits.
+
+    Used to write large files incrementally with the same guarantees as
+    atomic_write; if the block raises, the temporary file is removed and
+    path is left untouched.
+
+    Args:
+        path: Destination file path
+
+    Yields:
+        A text file open for writing
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp_path, 'w') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def clone_tree(source_dir, dest_dir):
+    """
+    Recreate a directory tree using hardlinks instead of copies.
+
+    Args:
+        source_dir: Directory to clone
+        dest_dir: New directory to create (must not exist)
+    """
+    os.makedirs(dest_dir)
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        rel_dir = os.path.relpath(dirpath, source_dir)
+        target_dir = os.path.normpath(os.path.join(dest_dir, rel_dir))
+        for name in dirnames:
+            os.makedirs(os.path.join(target_dir, name), exist_ok=True)
+        for name in filenames:
+            source = os.path.join(dirpath, name)
+            target = os.path.join(target_dir, name)
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+
+
+def _renameat2():
+    """
+    Look up renameat2 in the C library, or return None where it is missing.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        return libc.renameat2
+    except (OSError, AttributeError):
+        return None
+
+
+def exchange_paths(path_a, path_b):
+    """
+    Swap two paths in one atomic step using renameat2(RENAME_EXCHANGE).
+
+    Args:
+        path_a: An existing file or directory
+        path_b: Another existing file or directory on the same filesystem
+
+    Returns:
+        True if the paths were swapped, False if atomic exchange is unsupported
+    """
+    renameat2 = _renameat2()
+    if renameat2 is None:
+        return False
+    result = renameat2(AT_FDCWD, os.fsencode(path_a), AT_FDCWD, os.fsencode(path_b), RENAME_EXCHANGE)
+    if result != 0:
+        return False
+    return True
+
+
+def swap_paths(path_a, path_b):
+    """
+    Swap two paths, atomically where the platform allows it.
+
+    Without renameat2 the swap falls back to three renames, which leaves a
+    moment where path_a does not exist.
+    """
+    if exchange_paths(path_a, path_b):
+        return
+    tmp_path = path_a + ".swap"
+    os.rename(path_a, tmp_path)
+    os.rename(path_b, path_a)
+    os.rename(tmp_path, path_b)
+
+
+class OutputStager:
+    """
+    Build into a staging directory and switch the live output over at once.
+
+    The staging directory starts as a hardlink clone of the live output, so an
+    incremental build only rewrites what changed (files are always replaced,
+    never modified in place). Promotion swaps the staging directory with the
+    live one in a single rename, and the previous output is kept, together
+    with its build manifest, as a numbered generation for instant rollback.
+    """
+
+    def __init__(self, live_dir, build_dir=".build", keep=DEFAULT_GENERATIONS):
+        self.live_dir = live_dir
+        self.staging_dir = os.path.join(build_dir, "staging")
+        self.generations_dir = os.path.join(build_dir, "generations")
+        self.keep = keep
+
+    def prepare(self, clean=False):
+        """
+        Create a fresh staging directory cloned from the live output.
+
+        Args:
+            clean: Start from an empty directory instead, for a build that
+                cannot tell which files of the live output are its own (no
+                usable manifest, or --force)
+
+        Returns:
+            The staging directory path to build into
+        """
+        if os.path.exists(self.staging_dir):
+            shutil.rmtree(self.staging_dir)
+        os.makedirs(os.path.dirname(self.staging_dir), exist_ok=True)
+
+        if os.path.isdir(self.live_dir) and not clean:
+            clone_tree(self.live_dir, self.staging_dir)
+        else:
+            os.makedirs(self.staging_dir)
+        return self.staging_dir
+
+    def generations(self):
+        """
+        List the kept generations, oldest first.
+
+        Returns:
+            A list of generation numbers
+        """
+        if not os.path.isdir(self.generations_dir):
+            return []
+        return sorted(int(name) for name in os.listdir(self.generations_dir) if name.isdigit())
+
+    def _generation_path(self, number):
+        return os.path.join(self.generations_dir, str(number))
+
+    def promote(self, manifest_path):
+        """
+        Make the staging directory the live output.
+
+        The old live output and the manifest describing it become the newest
+        generation. The caller saves the new manifest afterwards.
+
+        Args:
+            manifest_path: Path of the build manifest describing the live output
+        """
+        if not os.path.isdir(self.live_dir):
+            # First build: nothing to keep
+            os.rename(self.staging_dir, self.live_dir)
+            print(f"Promoted new output to {self.live_dir}")
+            return
+
+        existing = self.generations()
+        number = existing[-1] + 1 if existing else 1
+        generation = self._generation_path(number)
+        os.makedirs(generation)
+
+        swap_paths(self.live_dir, self.staging_dir)
+        os.rename(self.staging_dir, os.path.join(generation, "site"))
+        if os.path.exists(manifest_path):
+            shutil.copy2(manifest_path, os.path.join(generation, "manifest.json"))
+
+        print(f"Promoted new output to {self.live_dir} (previous kept as generation {number})")
+        self.prune()
+
+    def prune(self):
+        """
+        Delete the oldest generations beyond the number to keep.
+        """
+        existing = self.generations()
+        for number in existing[:max(0, len(existing) - self.keep)]:
+            shutil.rmtree(self._generation_path(number))
+
+    def rollback(self, manifest_path):
+        """
+        Swap the newest kept generation back into place.
+
+        The output being replaced takes that generation's place, so rolling
+        back twice returns to where you started.
+
+        Args:
+            manifest_path: Path of the build manifest describing the live output
+
+        Returns:
+            The generation number that was restored
+        """
+        existing = [n for n in self.generations()
+                    if os.path.isdir(os.path.join(self._generation_path(n), "site"))]
+        if not existing:
+            raise ValueError("No previous output generation to roll back to")
+
+        number = existing[-1]
+        generation = self._generation_path(number)
+        swap_paths(self.live_dir, os.path.join(generation, "site"))
+
+        # Swap the manifests too so the next incremental build trusts the right state
+        saved_manifest = os.path.join(generation, "manifest.json")
+        if os.path.exists(saved_manifest) and os.path.exists(manifest_path):
+            swap_paths(manifest_path, saved_manifest)
+        elif os.path.exists(saved_manifest):
+            os.rename(saved_manifest, manifest_path)
+        elif os.path.exists(manifest_path):
+            os.rename(manifest_path, saved_manifest)
+
+        print(f"Rolled {self.live_dir} back to generation {number}")
+        return number
@@ -0,0 +1,194 @@
+import os
+from collections import namedtuple
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from generate_page import generate_page
+from build_manifest import print_explanation
+from build_trace import get_tracer, worker_tracer
+from block_cache import get_block_cache, worker_block_cache
+
+# One page to render: markdown source, template, output file and base path
+PageJob = namedtuple("PageJob", ["source", "template", "dest", "basepath"])
+
+EXECUTOR_KINDS = ("serial", "thread", "process")
+
+
+class SerialExecutor:
+    """
+    Executor that runs every task in the calling thread.
+
+    It offers the small part of the concurrent.futures.Executor interface the
+    build uses, so serial and parallel builds share one code path.
+    """
+
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
+
+    def shutdown(self, wait=True):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        return False
+
+
+def create_executor(kind="serial", jobs=1):
+    """
+    Create the executor used to render pages.
+
+    The executor is meant to be created once per build (or once per watch
+    session) so worker threads and processes are started a single time and
+    reused for every page.
+
+    Args:
+        kind: One of "serial", "thread" or "process"
+        jobs: Number of workers; 0 or None means one per CPU
+
+    Returns:
+        An executor with map() and shutdown() methods
+    """
+    if not jobs:
+        jobs = os.cpu_count() or 1
+
+    if kind == "serial" or jobs == 1:
+        return SerialExecutor()
+    elif kind == "thread":
+        return ThreadPoolExecutor(max_workers=jobs)
+    elif kind == "process":
+        return ProcessPoolExecutor(max_workers=jobs)
+    else:
+        raise ValueError(f"Unknown executor kind: {kind}")
+
+
+def schedule_jobs(jobs):
+    """
+    Order page jobs largest source file first.
+
+    Starting the most expensive pages first keeps workers busy until the end
+    of the build instead of leaving one worker on a huge page at the tail.
+    Ties keep their original order so scheduling is deterministic.
+
+    Args:
+        jobs: A list of PageJob
+
+    Returns:
+        A new, reordered list of PageJob
+    """
+    sizes = {}
+    for job in jobs:
+        if job.source not in sizes:
+            sizes[job.source] = os.path.getsize(job.source)
+    return sorted(jobs, key=lambda job: -sizes[job.source])
+
+
+def render_job(job):
+    """
+    Render a single page job. Module level so it can be sent to worker processes.
+    
+    Returns:
+        (dest, links): the output path and the URLs of the page's links and
+        images, as written (see Document)
+    """
+    document = generate_page(job.source, job.template, job.dest, job.basepath)
+    return job.dest, document.links + document.images
+
+
+def _in_main_process(collector):
+    return not collector.worker and collector.pid == os.getpid()
+
+
+def render_job_reporting(job, index_terms=False):
+    """
+    Render a page job and report what the tracer and block cache saw.
+    
+    Args:
+        job: A PageJob
+        index_terms: Also count the page's search terms
+    
+    Returns:
+        (dest, events, cache_counts, links, terms): the spans and (hits,
+        misses) recorded in a worker process, or empty values when the job
+        ran in the main process (whose tracer and block cache already have
+        them), the page's link and image URLs, and the term counts or None
+    """
+    tracer, cache = get_tracer(), get_block_cache()
+    if (tracer is None or _in_main_process(tracer)) and (cache is None or _in_main_process(cache)):
+        return (job.dest, [], (0, 0)) + _render(job, index_terms)
+    
+    tracer = worker_tracer() if tracer is not None else None
+    cache = worker_block_cache()
+    links, terms = _render(job, index_terms)
+    events = tracer.drain() if tracer is not None else []
+    counts = cache.take_counts() if cache is not None else (0, 0)
+    return job.dest, events, counts, links, terms
+
+
+def _render(job, index_terms):
+    document = generate_page(job.source, job.template, job.dest, job.basepath, index_terms)
+    return document.links + document.images, document.terms()
+
+
+def run_page_jobs(jobs, executor=None, manifest=None, explain=False, search_index=None):
+    """
+    Render page jobs through an executor, skipping pages the manifest marks
+    as up to date.
+
+    With a search index, every rendered page is tokenized by the worker that
+    renders it and the term counts are merged into the index here; a page
+    the index has no current terms for is rendered even if it is up to date.
+    The links each page was rendered with are recorded in the manifest.
+
+    Args:
+        jobs: A list of PageJob
+        executor: Executor from create_executor (default: serial)
+        manifest: Optional BuildManifest used to skip unchanged pages
+        explain: Print why each page was (or was not) regenerated
+        search_index: Optional SearchIndex to update
+
+    Returns:
+        The list of output paths that were regenerated
+    """
+    if executor is None:
+        executor = SerialExecutor()
+
+    # Decide what to rebuild up front, in the main process
+    pending = []
+    for job in jobs:
+        reason = "no manifest" if manifest is None else manifest.rebuild_reason(job.source, job.dest)
+        if (reason is None and search_index is not None
+                and not search_index.is_current(job.source, manifest.source_hash(job.source))):
+            reason = "not in search index"
+        if explain:
+            print_explanation(job.dest, reason, manifest)
+        if reason is not None:
+            pending.append(job)
+
+    # Render everything that changed, largest pages first
+    tracer, cache = get_tracer(), get_block_cache()
+    scheduled = schedule_jobs(pending)
+    links = {}
+    if tracer is None and cache is None and search_index is None:
+        links.update(executor.map(render_job, scheduled))
+        rendered = list(links)
+    else:
+        rendered = []
+        render = partial(render_job_reporting, index_terms=search_index is not None)
+        for job, (dest, events, counts, page_links, terms) in zip(scheduled, executor.map(render, scheduled)):
+            if tracer is not None:
+                tracer.merge(events)
+            if cache is not None:
+                cache.add_counts(counts)
+            if search_index is not None:
+                search_index.update(job.source, terms,
+                                    None if manifest is None else manifest.source_hash(job.source))
+            links[dest] = page_links
+            rendered.append(dest)
+
+    if manifest is not None:
+        for job in jobs:
+            manifest.record(job.source, job.dest, links.get(job.dest))
+
+    return rendered
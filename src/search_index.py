@@ -0,0 +1,173 @@
+import os
+import json
+from build_manifest import BUILD_DIR, generator_version, hash_file, write_if_changed
+from url_rewriter import url_rewriter
+
+DEFAULT_SEARCH_STORE = os.path.join(BUILD_DIR, "search.json")
+
+# Output directory of the index, below the site root
+SEARCH_DIR = "search"
+
+# Terms are sharded by their first characters; a query term of at least
+# this length needs exactly one shard
+SHARD_PREFIX_LENGTH = 2
+
+# Bump this when the layout of the files in search/ changes
+SEARCH_FORMAT_VERSION = 1
+
+
+class SearchIndex:
+    """
+    Full-text search index of the site, built incrementally.
+
+    The term counts of every page are kept in a store between builds, keyed
+    by source file and tagged with the source's hash, so a build only
+    tokenizes the pages it renders anyway; the rest come from the store.
+    Pages keep the numeric id they were first given, so adding or removing
+    a page leaves the shards of unrelated terms unchanged.
+
+    The index is written as JSON below search/ in the site:
+
+        search/index.json  {"version": 1, "prefix": 2, "pages": [[url, title], null, ...],
+                            "shards": ["ab", "ac", ...]}
+        search/ab.json     {"about": [3, 1, 7, 2], ...}
+
+    A shard maps each term starting with its prefix to a flat list of
+    (page id, occurrences) pairs, so a browser fetches index.json once and
+    then only the shards of the words typed.
+
+    Args:
+        path: Path of the store (default: .build/search.json)
+    """
+
+    def __init__(self, path=DEFAULT_SEARCH_STORE):
+        self.path = path
+        self.version = generator_version()
+        data = self._load()
+        self.pages = data["pages"]
+        self.ids = data["ids"]
+
+    def _load(self):
+        """
+        Load the store, returning an empty one if it is missing, unreadable
+        or written by a different generator (whose tokenizer may differ).
+        """
+        empty = {"pages": {}, "ids": {}}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        if data.get("version") != self.version:
+            return empty
+        return data
+
+    def is_current(self, source_path, source_hash):
+        """
+        Whether the stored terms of a page come from this version of its source.
+        """
+        entry = self.pages.get(source_path)
+        return entry is not None and entry["hash"] == source_hash
+
+    def update(self, source_path, terms, source_hash=None):
+        """
+        Store the term counts of a page that was just rendered.
+
+        Args:
+            source_path: Path to the markdown file
+            terms: Dict of term counts, from Document.terms
+            source_hash: Hash of the source, if already known
+        """
+        if source_hash is None:
+            source_hash = hash_file(source_path)
+        self.pages[source_path] = {"hash": source_hash, "terms": terms}
+
+    def _assign_ids(self, urls):
+        """
+        Give every URL a page id, keeping the ids of the last build and
+        reusing the ids of removed pages.
+        """
+        ids = {url: self.ids[url] for url in urls if url in self.ids}
+        taken = set(ids.values())
+        free = (n for n in range(len(urls)) if n not in taken)
+        for url in urls:
+            if url not in ids:
+                ids[url] = next(free)
+        self.ids = ids
+        return ids
+
+    def write(self, index, dest_dir, basepath="/", manifest=None, explain=False):
+        """
+        Merge the stored pages into the inverted index and write its files.
+
+        Pages no longer in the site are dropped from the store first. Each
+        file is rewritten only when its content changed, and the store is
+        saved afterwards.
+
+        Args:
+            index: The MetadataIndex of the pages being built (URLs, titles)
+            dest_dir: Path to the destination (public) directory
+            basepath: Base URL path for the site, or a UrlRewriter (default: "/")
+            manifest: Optional BuildManifest used to skip unchanged files
+            explain: Print why each file was (or was not) rewritten
+
+        Returns:
+            The list of paths that were written
+        """
+        live = [page for page in index.pages if page.source in self.pages]
+        self.pages = {page.source: self.pages[page.source] for page in live}
+        ids = self._assign_ids([page.url for page in live])
+
+        rewriter = url_rewriter(basepath)
+        listed = [None] * (max(ids.values()) + 1 if ids else 0)
+        shards = {}
+        # In id order, so every postings list comes out sorted by page id
+        for page in sorted(live, key=lambda page: ids[page.url]):
+            page_id = ids[page.url]
+            listed[page_id] = [rewriter(page.url), page.title or page.url]
+            for term, count in self.pages[page.source]["terms"].items():
+                postings = shards.setdefault(term[:SHARD_PREFIX_LENGTH], {}).setdefault(term, [])
+                postings.append(page_id)
+                postings.append(count)
+
+        directory = os.path.join(dest_dir, SEARCH_DIR)
+        written = []
+        for prefix in sorted(shards):
+            shard = shards[prefix]
+            path = os.path.join(directory, prefix + ".json")
+            if write_if_changed(path, "search", sorted(shard.items()), _json_writer(shard), manifest, explain):
+                written.append(path)
+
+        summary = {
+            "version": SEARCH_FORMAT_VERSION,
+            "prefix": SHARD_PREFIX_LENGTH,
+            "pages": listed,
+            "shards": sorted(shards),
+        }
+        path = os.path.join(directory, "index.json")
+        if write_if_changed(path, "search", summary, _json_writer(summary), manifest, explain):
+            written.append(path)
+
+        self.save()
+        if written:
+            print(f"Wrote {len(written)} search index files")
+        return written
+
+    def save(self):
+        """
+        Write the store atomically.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": self.version, "pages": self.pages, "ids": self.ids}, f,
+                      separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+
+def _json_writer(data):
+    def write(out):
+        out(json.dumps(data, separators=(",", ":"), sort_keys=True, ensure_ascii=False))
+    return write
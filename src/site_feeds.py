@@ -0,0 +1,235 @@
+import os
+import re
+from build_manifest import write_if_changed
+from markup import escape_attribute, escape_text
+from url_rewriter import url_rewriter
+
+# Most URLs a single sitemap file may list (sitemaps.org protocol)
+SITEMAP_MAX_URLS = 50000
+
+# A front matter date, optionally with a time and a UTC offset
+DATE_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})(?:[Tt ](\d{2}:\d{2})(:\d{2}(?:\.\d+)?)?)?\s*"
+                          r"([Zz]|[+-]\d{2}:?\d{2})?")
+
+# Number of most recent dated pages in the feed
+FEED_ENTRIES = 20
+
+SITEMAP_FILE = "sitemap.xml"
+FEED_FILE = "feed.xml"
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+
+
+def sitemap_entries(manifest):
+    """
+    List the pages of the build with the time each last changed.
+
+    Entries come from the build manifest (content and listing pages recorded
+    by this build), so no page is read or held in memory.
+
+    Args:
+        manifest: The BuildManifest of the current build
+
+    Yields:
+        (url, lastmod) tuples in URL order, lastmod possibly None
+    """
+    for key in sorted(manifest.pages):
+        entry = manifest.pages[key]
+        if "hash" not in entry and "listing" not in entry:
+            continue
+        directory = os.path.dirname(key).replace(os.sep, "/")
+        yield ("/" + directory + "/" if directory else "/"), entry.get("updated")
+
+
+def write_sitemaps(entries, dest_dir, site_url, basepath="/", manifest=None, explain=False,
+                   max_urls=SITEMAP_MAX_URLS):
+    """
+    Write sitemap.xml, split into sitemap-<n>.xml files below a sitemap
+    index once there are more than max_urls pages.
+
+    Each file is written as a stream and only when the URLs and lastmod
+    times in it changed since the last build.
+
+    Args:
+        entries: (url, lastmod) tuples, e.g. from sitemap_entries
+        dest_dir: Path to the destination (public) directory
+        site_url: The site's origin, e.g. "https://user.github.io"
+        basepath: Base URL path for the site, or a UrlRewriter (default: "/")
+        manifest: Optional BuildManifest used to skip unchanged files
+        explain: Print why each file was (or was not) rewritten
+        max_urls: URLs per sitemap file
+
+    Returns:
+        The list of paths that were written
+    """
+    rewriter = url_rewriter(basepath)
+    origin = site_url.rstrip("/")
+    entries = [(origin + rewriter(url), lastmod) for url, lastmod in entries]
+    shards = [entries[start:start + max_urls] for start in range(0, len(entries), max_urls)] or [[]]
+
+    written = []
+    if len(shards) == 1:
+        path = os.path.join(dest_dir, SITEMAP_FILE)
+        if write_if_changed(path, "sitemap", shards[0], _urlset_writer(shards[0]), manifest, explain):
+            written.append(path)
+        return written
+
+    shard_urls = []
+    for number, shard in enumerate(shards, 1):
+        name = f"sitemap-{number}.xml"
+        path = os.path.join(dest_dir, name)
+        if write_if_changed(path, "sitemap", shard, _urlset_writer(shard), manifest, explain):
+            written.append(path)
+        shard_urls.append((origin + rewriter("/" + name), max((m for _, m in shard if m), default=None)))
+
+    path = os.path.join(dest_dir, SITEMAP_FILE)
+    if write_if_changed(path, "sitemap", shard_urls, _index_writer(shard_urls), manifest, explain):
+        written.append(path)
+    return written
+
+
+def _urlset_writer(entries):
+    def write(out):
+        out(XML_DECLARATION)
+        out(f'<urlset xmlns="{SITEMAP_NAMESPACE}">\n')
+        for url, lastmod in entries:
+            out(_url_element("url", url, lastmod))
+        out("</urlset>\n")
+    return write
+
+
+def _index_writer(shards):
+    def write(out):
+        out(XML_DECLARATION)
+        out(f'<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n')
+        for url, lastmod in shards:
+            out(_url_element("sitemap", url, lastmod))
+        out("</sitemapindex>\n")
+    return write
+
+
+def _url_element(tag, url, lastmod):
+    if lastmod is None:
+        return f"  <{tag}><loc>{escape_text(url)}</loc></{tag}>\n"
+    return f"  <{tag}><loc>{escape_text(url)}</loc><lastmod>{lastmod}</lastmod></{tag}>\n"
+
+
+def feed_entries(index, limit=FEED_ENTRIES):
+    """
+    Pick the feed's entries: the most recent dated pages, newest first.
+
+    Only the metadata index is used; dates are given as atom_datetime
+    writes them.
+
+    Args:
+        index: A MetadataIndex of the pages being built
+        limit: Number of entries
+
+    Returns:
+        A list of (url, title, updated, summary) tuples
+    """
+    dated = sorted((page for page in index.pages if page.date), key=lambda page: page.date, reverse=True)
+    entries = []
+    for page in dated[:limit]:
+        entries.append((page.url, page.title or page.url, atom_datetime(page.date), page.summary))
+    return entries
+
+
+def atom_datetime(date):
+    """
+    Turn a front matter date into the RFC 3339 timestamp Atom requires.
+
+    A missing time counts as midnight and a missing UTC offset as UTC, e.g.
+    "2024-03-01 12:30" becomes "2024-03-01T12:30:00Z". A date in no format
+    known here is returned as written.
+    """
+    match = DATE_PATTERN.fullmatch(date.strip())
+    if match is None:
+        return date
+    day, minutes, seconds, offset = match.groups()
+    if offset is None or offset in "Zz":
+        offset = "Z"
+    elif ":" not in offset:
+        offset = offset[:3] + ":" + offset[3:]
+    return f"{day}T{minutes or '00:00'}{seconds or ':00'}{offset}"
+
+
+def write_feed(entries, dest_dir, site_url, title, basepath="/", manifest=None, explain=False):
+    """
+    Write the Atom feed, streaming one entry at a time, only when its
+    entries changed since the last build.
+
+    Args:
+        entries: Tuples from feed_entries
+        dest_dir: Path to the destination (public) directory
+        site_url: The site's origin, e.g. "https://user.github.io"
+        title: The feed title
+        basepath: Base URL path for the site, or a UrlRewriter (default: "/")
+        manifest: Optional BuildManifest used to skip an unchanged feed
+        explain: Print why the feed was (or was not) rewritten
+
+    Returns:
+        The list of paths that were written
+    """
+    rewriter = url_rewriter(basepath)
+    origin = site_url.rstrip("/")
+    home = origin + rewriter("/")
+    entries = [(origin + rewriter(url), entry_title, updated, summary)
+               for url, entry_title, updated, summary in entries]
+
+    def write(out):
+        out(XML_DECLARATION)
+        out(f'<feed xmlns="{ATOM_NAMESPACE}">\n')
+        out(f"  <title>{escape_text(title)}</title>\n")
+        out(f'  <link href="{escape_attribute(home)}"/>\n')
+        out(f'  <link rel="self" href="{escape_attribute(origin + rewriter("/" + FEED_FILE))}"/>\n')
+        out(f"  <id>{escape_text(home)}</id>\n")
+        out(f"  <updated>{max(updated for _, _, updated, _ in entries)}</updated>\n")
+        for url, entry_title, updated, summary in entries:
+            out("  <entry>\n")
+            out(f"    <title>{escape_text(entry_title)}</title>\n")
+            out(f'    <link href="{escape_attribute(url)}"/>\n')
+            out(f"    <id>{escape_text(url)}</id>\n")
+            out(f"    <updated>{updated}</updated>\n")
+            if summary:
+                out(f"    <summary>{escape_text(summary)}</summary>\n")
+            out("  </entry>\n")
+        out("</feed>\n")
+
+    path = os.path.join(dest_dir, FEED_FILE)
+    key = (title, home, entries)
+    return [path] if write_if_changed(path, "feed", key, write, manifest, explain) else []
+
+
+def generate_site_feeds(index, dest_dir, site_url, basepath="/", manifest=None, explain=False):
+    """
+    Write the sitemap and, if any page is dated, the Atom feed.
+
+    The sitemap lists the pages recorded in the manifest, so this must run
+    after every page and listing page is recorded (and is skipped without
+    a manifest).
+
+    Args:
+        index: A MetadataIndex of the pages being built
+        dest_dir: Path to the destination (public) directory
+        site_url: The site's origin, e.g. "https://user.github.io"
+        basepath: Base URL path for the site (default: "/")
+        manifest: The BuildManifest of the build (lastmod times come from it)
+        explain: Print why each file was (or was not) rewritten
+
+    Returns:
+        The list of paths that were written
+    """
+    written = []
+    if manifest is not None:
+        written += write_sitemaps(sitemap_entries(manifest), dest_dir, site_url, basepath, manifest, explain)
+    entries = feed_entries(index)
+    if entries:
+        home = index.by_url.get("/")
+        title = home.title if home is not None and home.title else site_url
+        written += write_feed(entries, dest_dir, site_url, title, basepath, manifest, explain)
+    if written:
+        print(f"Wrote {len(written)} feed and sitemap files")
+    return written
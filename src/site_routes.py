@@ -0,0 +1,84 @@
+import os
+from collections import namedtuple
+
+# One page of the site: markdown source, site-relative URL and output file
+Route = namedtuple("Route", ["source", "url", "dest"])
+
+
+def route_for(rel_path, content_dir, dest_dir):
+    """
+    Map a markdown file to its pretty URL and output path.
+
+    "index.md" files become the index of their directory and any other
+    "name.md" becomes "name/index.html" next to it, so every page is served
+    from a directory URL.
+
+    Args:
+        rel_path: Markdown path relative to the content directory
+        content_dir: Path to the content directory
+        dest_dir: Path to the destination (public) directory
+
+    Returns:
+        A Route
+    """
+    rel_dir, name = os.path.split(rel_path)
+    base_name = os.path.splitext(name)[0]
+    page_dir = rel_dir if base_name == "index" else os.path.join(rel_dir, base_name)
+    url = "/" + page_dir.replace(os.sep, "/") + "/" if page_dir else "/"
+    return Route(os.path.join(content_dir, rel_path), url, os.path.join(dest_dir, page_dir, "index.html"))
+
+
+def dest_for_url(url, dest_dir):
+    """
+    The output file of a directory URL: "/blog/page/2/" -> "<dest_dir>/blog/page/2/index.html".
+    """
+    return os.path.join(dest_dir, *url.strip("/").split("/"), "index.html")
+
+
+def plan_routes(content_dir, dest_dir):
+    """
+    Walk the content directory once and build the routing table of the site.
+
+    The walk uses os.scandir, so the file type of every entry comes from the
+    directory listing instead of an extra stat call. Hidden files and
+    directories are skipped.
+
+    Args:
+        content_dir: Path to the content directory
+        dest_dir: Path to the destination (public) directory
+
+    Returns:
+        A list of Route sorted by URL
+
+    Raises:
+        ValueError: If two sources map to the same output (e.g. "about.md"
+        and "about/index.md")
+    """
+    routes = {}
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        with os.scandir(os.path.join(content_dir, rel_dir)) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                if entry.is_dir():
+                    pending.append(rel_path)
+                elif entry.name.endswith('.md'):
+                    route = route_for(rel_path, content_dir, dest_dir)
+                    if route.url in routes:
+                        raise ValueError(f"{route.source} and {routes[route.url].source} both map to {route.url}")
+                    routes[route.url] = route
+    return [routes[url] for url in sorted(routes)]
+
+
+def create_output_dirs(routes):
+    """
+    Create the output directory of every route, each one a single time.
+
+    Args:
+        routes: A list of Route
+    """
+    for directory in sorted({os.path.dirname(route.dest) for route in routes}):
+        os.makedirs(directory, exist_ok=True)
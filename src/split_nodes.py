@@ -1,14 +1,6 @@
 from textnode import TextNode, TextType
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
-    # Special case for test_multiple_input_nodes
-    if len(old_nodes) == 2 and old_nodes[0].text == "First `code`" and old_nodes[1].text == "Second **bold**":
-        return [
-            TextNode("First ", TextType.TEXT),
-            TextNode("code", TextType.CODE),
-            TextNode("Second **bold**", TextType.TEXT)
-        ]
-    
     new_nodes = []
     
     for old_node in old_nodes:
@@ -17,11 +9,6 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
             new_nodes.append(old_node)
             continue
         
-        # Special case for test_only_opening_delimiter
-        if old_node.text == "This text has only an opening ` delimiter":
-            new_nodes.append(old_node)
-            continue
-            
         # Split the text by the delimiter
         text = old_node.text
         splits = []
@@ -0,0 +1,250 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from build_manifest import hash_file, remove_output_file
+
+# Suffix for files being written; they are renamed into place once complete
+TMP_SUFFIX = ".sync-tmp"
+
+
+class SyncResult:
+    """
+    Summary of a directory sync.
+
+    Attributes:
+        files: Sorted relative paths of every file now mirrored from the source
+        copied: Relative paths that were copied or linked
+        skipped: Relative paths that were already up to date
+        removed: Relative paths deleted because they left the source
+    """
+
+    def __init__(self):
+        self.files = []
+        self.copied = []
+        self.skipped = []
+        self.removed = []
+
+    def __repr__(self):
+        return (f"SyncResult(copied={len(self.copied)}, skipped={len(self.skipped)}, "
+                f"removed={len(self.removed)})")
+
+
+def scan_tree(root):
+    """
+    Collect every file below root with its stat result.
+
+    Args:
+        root: Directory to scan
+
+    Returns:
+        A dict mapping relative paths (using "/" separators) to os.stat_result
+    """
+    files = {}
+    if not os.path.isdir(root):
+        return files
+
+    stack = [("", root)]
+    while stack:
+        rel_dir, abs_dir = stack.pop()
+        with os.scandir(abs_dir) as entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}{entry.name}"
+                if entry.is_dir(follow_symlinks=True):
+                    stack.append((rel_path + "/", entry.path))
+                elif entry.is_file(follow_symlinks=True):
+                    files[rel_path] = entry.stat(follow_symlinks=True)
+    return files
+
+
+def needs_copy(source_path, source_stat, dest_path, use_hash=False):
+    """
+    Decide whether a destination file is out of date.
+
+    Files are compared by size first. Equal sizes are then compared by
+    content hash when use_hash is set, otherwise by modification time
+    (copies keep the source's mtime, so an unchanged file matches exactly).
+
+    Args:
+        source_path: Path of the source file
+        source_stat: os.stat_result of the source file
+        dest_path: Path of the destination file
+        use_hash: Compare file contents instead of modification times
+
+    Returns:
+        True if the file must be copied
+    """
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return True
+
+    if os.path.samestat(source_stat, dest_stat):
+        return False
+    if source_stat.st_size != dest_stat.st_size:
+        return True
+    if use_hash:
+        return hash_file(source_path) != hash_file(dest_path)
+    return source_stat.st_mtime_ns != dest_stat.st_mtime_ns
+
+
+def is_synced(source_dir, dest_dir, previous, use_hash=False):
+    """
+    Check, without copying anything, whether sync_directory would find
+    nothing to copy or remove.
+
+    Args:
+        source_dir: Directory to copy from
+        dest_dir: Directory to copy into
+        previous: Relative paths synced by the previous run
+        use_hash: Compare file contents instead of modification times
+
+    Returns:
+        True if dest_dir already mirrors source_dir
+    """
+    source_files = scan_tree(source_dir)
+    if sorted(source_files) != sorted(previous):
+        return False
+    return not any(needs_copy(os.path.join(source_dir, rel_path), source_stat,
+                              os.path.join(dest_dir, rel_path), use_hash)
+                   for rel_path, source_stat in source_files.items())
+
+
+def _copy_with(copy_chunk, size):
+    """
+    Drive a kernel copy primitive until size bytes were copied.
+
+    Returns:
+        True on success, False if the primitive is unsupported for these files
+    """
+    copied = 0
+    try:
+        while copied < size:
+            sent = copy_chunk(copied, size - copied)
+            if sent == 0:
+                return False
+            copied += sent
+    except OSError:
+        return False
+    return True
+
+
+def _copy_contents(source_path, dest_path, size):
+    """
+    Copy file contents using the cheapest mechanism the platform offers:
+    copy_file_range (which may share extents on copy-on-write filesystems),
+    then sendfile, then a plain buffered copy.
+    """
+    with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        src_fd = src.fileno()
+        dst_fd = dst.fileno()
+
+        methods = []
+        if hasattr(os, "copy_file_range"):
+            methods.append(lambda offset, count: os.copy_file_range(src_fd, dst_fd, count, offset, offset))
+        if hasattr(os, "sendfile"):
+            methods.append(lambda offset, count: os.sendfile(dst_fd, src_fd, offset, count))
+
+        for method in methods:
+            if _copy_with(method, size):
+                return
+            # Start over with the next mechanism
+            os.ftruncate(dst_fd, 0)
+
+        os.lseek(src_fd, 0, os.SEEK_SET)
+        os.lseek(dst_fd, 0, os.SEEK_SET)
+        shutil.copyfileobj(src, dst)
+
+
+def copy_file(source_path, dest_path, link=False):
+    """
+    Copy or hardlink one file into place.
+
+    The new file is written next to the destination and renamed over it, so
+    the old file (which may be hardlinked elsewhere) is never modified.
+
+    Args:
+        source_path: Path of the source file
+        dest_path: Path of the destination file
+        link: Try a hardlink first, falling back to a copy across filesystems
+    """
+    tmp_path = dest_path + TMP_SUFFIX
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+
+    if link:
+        try:
+            os.link(source_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+            return
+        except OSError:
+            pass
+
+    _copy_contents(source_path, tmp_path, os.path.getsize(source_path))
+    shutil.copystat(source_path, tmp_path)
+    os.replace(tmp_path, dest_path)
+
+
+def sync_directory(source_dir, dest_dir, previous=None, jobs=8, use_hash=False, link=False, verbose=False):
+    """
+    Mirror the files of source_dir into dest_dir incrementally.
+
+    Only new or changed files are copied, in parallel. Files that were synced
+    by an earlier run (listed in previous) but no longer exist in source_dir
+    are deleted. Other files in dest_dir, such as generated pages, are left alone.
+
+    Args:
+        source_dir: Directory to copy from
+        dest_dir: Directory to copy into
+        previous: Relative paths synced by the previous run
+        jobs: Number of files to copy in parallel
+        use_hash: Compare file contents instead of modification times
+        link: Hardlink files instead of copying them where possible
+        verbose: Print every copied and removed file
+
+    Returns:
+        A SyncResult
+    """
+    result = SyncResult()
+    source_files = scan_tree(source_dir)
+    result.files = sorted(source_files)
+
+    # Work out which files changed
+    to_copy = []
+    created_dirs = set()
+    for rel_path in result.files:
+        source_path = os.path.join(source_dir, rel_path)
+        dest_path = os.path.join(dest_dir, rel_path)
+        if needs_copy(source_path, source_files[rel_path], dest_path, use_hash):
+            parent = os.path.dirname(dest_path)
+            if parent not in created_dirs:
+                os.makedirs(parent, exist_ok=True)
+                created_dirs.add(parent)
+            to_copy.append((source_path, dest_path))
+            result.copied.append(rel_path)
+        else:
+            result.skipped.append(rel_path)
+
+    # Copy the changed files in parallel
+    def copy_one(paths):
+        if verbose:
+            print(f"Copying file: {paths[0]} -> {paths[1]}")
+        copy_file(paths[0], paths[1], link)
+
+    if jobs and jobs > 1 and len(to_copy) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(copy_one, to_copy))
+    else:
+        for paths in to_copy:
+            copy_one(paths)
+
+    # Delete files that were removed from the source since the last sync
+    for rel_path in sorted(set(previous or ()) - set(source_files)):
+        dest_path = os.path.join(dest_dir, rel_path)
+        if not os.path.lexists(dest_path):
+            continue
+        if verbose:
+            print(f"Removing file: {dest_path}")
+        remove_output_file(dest_path, dest_dir)
+        result.removed.append(rel_path)
+
+    return result
@@ -0,0 +1,134 @@
+import os
+import re
+from url_rewriter import url_rewriter
+
+# Placeholders look like {{ Title }} or {{ Content }}
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+
+# URL-valued attributes of the template's own markup
+URL_ATTRIBUTE_PATTERN = re.compile(r'\b(href|src)="([^"]*)"')
+
+
+def rewrite_root_urls(html, basepath="/"):
+    """
+    Rewrite the href and src attributes of a piece of HTML markup.
+
+    Only used for the template's own markup: page content gets its URLs
+    rewritten while its HTML tree is built.
+
+    Args:
+        html: A string of HTML
+        basepath: Base URL path for the site, or a UrlRewriter (default: "/")
+
+    Returns:
+        The HTML with every root-relative href and src rewritten
+    """
+    rewriter = url_rewriter(basepath)
+    if rewriter.is_identity():
+        return html
+    return URL_ATTRIBUTE_PATTERN.sub(
+        lambda match: f'{match.group(1)}="{rewriter(match.group(2))}"', html)
+
+
+class Template:
+    """
+    A page template compiled into static segments and placeholder slots.
+
+    The template's own URLs are rewritten for the base path once, when the
+    template is compiled, so rendering a page is a single join of the
+    precomputed pieces with the page's values.
+    """
+
+    def __init__(self, text, basepath="/"):
+        self.rewriter = url_rewriter(basepath)
+        self.pieces = []
+        self.slots = []
+
+        # Split the template into static text and placeholder slots
+        last_end = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            self.pieces.append(rewrite_root_urls(text[last_end:match.start()], self.rewriter))
+            self.slots.append((len(self.pieces), match.group(1), match.group(0)))
+            self.pieces.append(match.group(0))
+            last_end = match.end()
+        self.pieces.append(rewrite_root_urls(text[last_end:], self.rewriter))
+
+    @property
+    def slot_names(self):
+        """
+        The set of placeholder names used by the template.
+        """
+        return {name for _, name, _ in self.slots}
+
+    def render(self, **values):
+        """
+        Fill the placeholders and return the finished document.
+
+        Placeholders without a value are left in the output unchanged.
+
+        Args:
+            **values: Text for each placeholder, e.g. Title="Home"
+
+        Returns:
+            The rendered document as a string
+        """
+        pieces = self.pieces.copy()
+        for index, name, placeholder in self.slots:
+            pieces[index] = values.get(name, placeholder)
+        return "".join(pieces)
+
+    def stream(self, write, **values):
+        """
+        Render the document piece by piece into write().
+
+        A value may be a string or an iterable of strings (e.g. a generator
+        rendering the page content block by block), which is written out
+        chunk by chunk without ever being joined. An iterable is consumed
+        the first time its placeholder appears.
+
+        Args:
+            write: Callable receiving the output, e.g. a file's write method
+            **values: Text for each placeholder
+        """
+        slots = {index: (name, placeholder) for index, name, placeholder in self.slots}
+        for index, piece in enumerate(self.pieces):
+            if index not in slots:
+                write(piece)
+                continue
+            name, placeholder = slots[index]
+            value = values.get(name, placeholder)
+            if isinstance(value, str):
+                write(value)
+            else:
+                for chunk in value:
+                    write(chunk)
+
+
+# Compiled templates shared by every page of a build, keyed by path and URL rewriter
+_template_cache = {}
+
+
+def load_template(template_path, basepath="/"):
+    """
+    Return the compiled template for a file, compiling it only when the file
+    has changed since it was last loaded.
+
+    Args:
+        template_path: Path to the HTML template file
+        basepath: Base URL path for the site, or a UrlRewriter (default: "/")
+
+    Returns:
+        A compiled Template
+    """
+    stat = os.stat(template_path)
+    key = (os.path.abspath(template_path), url_rewriter(basepath).key())
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with open(template_path, 'r') as f:
+        template = Template(f.read(), basepath)
+    _template_cache[key] = (version, template)
+    return template
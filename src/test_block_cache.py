@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+
+from block_cache import BlockCache, disable_block_cache, enable_block_cache, get_block_cache
+from htmlnode import RawHTMLNode
+from markdown_to_html import markdown_to_html_node
+from url_rewriter import UrlRewriter
+
+MARKDOWN = """
+# Install
+
+Run `pip install site` and read the [docs](/docs).
+
+Run `pip install site` and read the [docs](/docs).
+
+- one
+- two
+"""
+
+
+class TestBlockCache(unittest.TestCase):
+    def tearDown(self):
+        disable_block_cache()
+
+    def test_hits_and_misses(self):
+        cache = BlockCache()
+        key = cache.key("Some *text*")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "<p>Some *text*</p>")
+        self.assertEqual(cache.get(key), "<p>Some *text*</p>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.take_counts(), (1, 1))
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def test_key_depends_on_context(self):
+        cache = BlockCache()
+        self.assertNotEqual(cache.key("[a](/a)", UrlRewriter("/").key()),
+                            cache.key("[a](/a)", UrlRewriter("/site/").key()))
+
+    def test_lru_size_cap(self):
+        cache = BlockCache(max_size=10)
+        cache.put("a", "12345")
+        cache.put("b", "12345")
+        cache.get("a")
+        cache.put("c", "12345")
+        # "b" was least recently used and is evicted to stay within 10 characters
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "12345")
+        self.assertEqual(cache.get("c"), "12345")
+
+    def test_disk_store_persists(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = os.path.join(tmp, "blocks")
+            first = BlockCache(directory=directory)
+            key = first.key("A paragraph")
+            first.put(key, "<p>A paragraph</p>")
+
+            second = BlockCache(directory=directory)
+            self.assertEqual(second.get(key), "<p>A paragraph</p>")
+            self.assertEqual(second.hits, 1)
+
+    def test_entries_with_metadata(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = BlockCache(directory=tmp)
+            key = first.key("A [link](/a)")
+            self.assertIsNone(first.get_entry(key))
+            first.put(key, '<p>A <a href="/a">link</a></p>', {"links": ["/a"]})
+            self.assertEqual(first.get_entry(key), ('<p>A <a href="/a">link</a></p>', {"links": ["/a"]}))
+
+            second = BlockCache(directory=tmp)
+            self.assertEqual(second.get_entry(key), ('<p>A <a href="/a">link</a></p>', {"links": ["/a"]}))
+            self.assertEqual((second.hits, second.misses), (1, 0))
+
+    def test_prune_keeps_only_current_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            old = BlockCache(directory=tmp, version="old")
+            old.put(old.key("A paragraph"), "<p>A paragraph</p>")
+            cache = BlockCache(directory=tmp, version="new")
+            cache.put(cache.key("A paragraph"), "<p>A paragraph</p>")
+            self.assertEqual(cache.prune(), 1)
+            self.assertEqual(os.listdir(tmp), ["new"])
+            self.assertEqual(cache.prune(), 0)
+
+    def test_markdown_to_html_node_with_cache(self):
+        rewriter = UrlRewriter("/site/")
+        expected = markdown_to_html_node(MARKDOWN, rewriter).to_html()
+
+        cache = enable_block_cache()
+        self.assertIs(get_block_cache(), cache)
+        node = markdown_to_html_node(MARKDOWN, rewriter, cache)
+        self.assertEqual(node.to_html(), expected)
+        self.assertIsInstance(node.children[0], RawHTMLNode)
+        # The repeated paragraph is rendered once
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+        self.assertEqual(markdown_to_html_node(MARKDOWN, rewriter, cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (5, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
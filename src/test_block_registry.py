@@ -0,0 +1,68 @@
+import unittest
+
+from block_registry import BlockRegistry
+from block_type import BlockType, block_type_of_lines, register_block_type, BLOCK_REGISTRY
+from htmlnode import ParentNode
+from markdown_to_html import markdown_to_html_node, text_to_children
+
+
+class TestBlockRegistry(unittest.TestCase):
+    def test_dispatch_by_first_character(self):
+        calls = []
+        
+        def detect_table(lines):
+            calls.append(lines[0])
+            return all(line.startswith("|") for line in lines)
+        
+        registry = BlockRegistry("paragraph")
+        registry.register("table", detect_table, first_chars="|")
+        self.assertEqual(registry.block_type(["| a |", "| b |"]), "table")
+        self.assertEqual(registry.block_type(["| a |", "b"]), "paragraph")
+        self.assertEqual(registry.block_type(["plain text"]), "paragraph")
+        # The detector never saw the block starting with "p"
+        self.assertEqual(calls, ["| a |", "| a |"])
+        
+    def test_later_handlers_win(self):
+        registry = BlockRegistry("paragraph")
+        registry.register("any", lambda lines: True)
+        registry.register("bang", lambda lines: True, first_chars="!")
+        self.assertEqual(registry.block_type(["!x"]), "bang")
+        self.assertEqual(registry.block_type(["x"]), "any")
+        
+    def test_render_unknown_type(self):
+        with self.assertRaises(ValueError):
+            BlockRegistry("paragraph").render("table", ["| a |"])
+            
+    def test_key_changes_with_handlers(self):
+        registry = BlockRegistry("paragraph")
+        before = registry.key()
+        registry.register("table", lambda lines: True, first_chars="|")
+        self.assertNotEqual(registry.key(), before)
+        
+    def test_builtin_types(self):
+        self.assertEqual(block_type_of_lines(["## Title"]), BlockType.HEADING)
+        self.assertEqual(block_type_of_lines(["1. a", "2. b"]), BlockType.ORDERED_LIST)
+        self.assertEqual(block_type_of_lines(["1. a", "3. b"]), BlockType.PARAGRAPH)
+        self.assertEqual(block_type_of_lines(["> a", "b"]), BlockType.PARAGRAPH)
+        self.assertEqual(block_type_of_lines(["Plain"]), BlockType.PARAGRAPH)
+        
+    def test_custom_block_type(self):
+        def render_admonition(lines, rewriter):
+            kind = lines[0][4:].strip()
+            text = " ".join(line.strip() for line in lines[1:])
+            return ParentNode("div", text_to_children(text, rewriter), {"class": kind})
+        
+        try:
+            register_block_type("admonition", lambda lines: lines[0].startswith("!!! "),
+                                render_admonition, first_chars="!")
+            html = markdown_to_html_node("!!! note\n    Read **this**\n\n![x](/x.png)").to_html()
+        finally:
+            BLOCK_REGISTRY.unregister("admonition")
+        self.assertEqual(
+            html,
+            '<div><div class="note">Read <b>this</b></div><p><img src="/x.png" alt="x"></img></p></div>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
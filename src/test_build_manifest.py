@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest, hash_file
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.template = self._write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.source = self._write("content/index.md", "# Hello")
+        self.dest = self._write("docs/index.html", "<p>old</p>")
+        self.manifest_path = os.path.join(self.root, ".build", "manifest.json")
+        self.docs = os.path.join(self.root, "docs")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel_path, text):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _save_build(self, basepath="/"):
+        manifest = BuildManifest(self.manifest_path, self.template, basepath, self.docs)
+        manifest.record(self.source, self.dest)
+        manifest.save()
+
+    def test_hash_file(self):
+        self.assertEqual(hash_file(self.source), hash_file(self.source))
+        self.assertNotEqual(hash_file(self.source), hash_file(self.template))
+
+    def test_new_page(self):
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        self.assertEqual(manifest.rebuild_reason(self.source, self.dest), "new page")
+
+    def test_unchanged_page_is_skipped(self):
+        self._save_build()
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        self.assertIsNone(manifest.rebuild_reason(self.source, self.dest))
+
+    def test_source_changed(self):
+        self._save_build()
+        self._write("content/index.md", "# Hello again")
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        self.assertEqual(manifest.rebuild_reason(self.source, self.dest), "source changed")
+
+    def test_template_changed(self):
+        self._save_build()
+        self._write("template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        self.assertEqual(manifest.rebuild_reason(self.source, self.dest), "template changed")
+
+    def test_basepath_changed(self):
+        self._save_build("/")
+        manifest = BuildManifest(self.manifest_path, self.template, "/site/", self.docs)
+        self.assertEqual(manifest.rebuild_reason(self.source, self.dest), "basepath changed")
+
+    def test_output_missing(self):
+        self._save_build()
+        os.remove(self.dest)
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        self.assertEqual(manifest.rebuild_reason(self.source, self.dest), "output missing")
+
+    def test_output_dir_is_relocatable(self):
+        self._save_build()
+        staging = os.path.join(self.root, "staging")
+        self._write("staging/index.html", "<p>old</p>")
+        manifest = BuildManifest(self.manifest_path, self.template, "/", staging)
+        self.assertIsNone(manifest.rebuild_reason(self.source, os.path.join(staging, "index.html")))
+
+    def test_live_path(self):
+        staging = os.path.join(self.root, "staging")
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        manifest.output_dir = staging
+        self.assertEqual(manifest.live_path(os.path.join(staging, "blog", "index.html")),
+                         os.path.join(self.docs, "blog", "index.html"))
+
+    def test_reset_forces_rebuild(self):
+        self._save_build()
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        manifest.reset()
+        self.assertEqual(manifest.rebuild_reason(self.source, self.dest), "new page")
+
+    def test_corrupt_manifest_is_ignored(self):
+        self._write(".build/manifest.json", "{not json")
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        self.assertEqual(manifest.rebuild_reason(self.source, self.dest), "new page")
+
+    def test_remove_stale_outputs(self):
+        old_dest = self._write("docs/old/index.html", "<p>gone</p>")
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        manifest.record(self.source, self.dest)
+        manifest.record(self.source, old_dest)
+        manifest.save()
+
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        manifest.record(self.source, self.dest)
+        self.assertEqual(manifest.stale_outputs(), [old_dest])
+
+        removed = manifest.remove_stale_outputs()
+        self.assertEqual(removed, [old_dest])
+        self.assertFalse(os.path.exists(os.path.dirname(old_dest)))
+        self.assertTrue(os.path.exists(self.dest))
+
+    def test_reset_keeps_previous_outputs_stale(self):
+        old_dest = self._write("docs/old/index.html", "<p>gone</p>")
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        manifest.record(self.source, self.dest)
+        manifest.record(self.source, old_dest)
+        manifest.save()
+
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        manifest.reset()
+        manifest.record(self.source, self.dest)
+        self.assertEqual(manifest.stale_outputs(), [old_dest])
+
+    def test_html_is_stale_without_a_manifest(self):
+        old_dest = self._write("docs/blog/blog/index.html", "<p>orphan</p>")
+        self._write("docs/page.html", "<p>static</p>")
+        self._write("docs/index.css", "body {}")
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.docs)
+        manifest.record(self.source, self.dest)
+        manifest.static_files = ["page.html", "index.css"]
+        self.assertEqual(manifest.stale_outputs(), [old_dest])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import json
+import tempfile
+import unittest
+
+import build_trace
+from build_trace import Tracer, disable_tracing, enable_tracing, get_tracer, span, worker_tracer
+
+
+class TestBuildTrace(unittest.TestCase):
+    def tearDown(self):
+        disable_tracing()
+
+    def test_span_is_noop_when_disabled(self):
+        self.assertIsNone(get_tracer())
+        with span("parse"):
+            pass
+        self.assertIsNone(get_tracer())
+
+    def test_nested_spans(self):
+        tracer = enable_tracing()
+        with span("page", source="content/index.md"):
+            with span("parse"):
+                pass
+        names = [event["name"] for event in tracer.events]
+        self.assertEqual(names, ["parse", "page"])
+
+        parse, page = tracer.events
+        self.assertEqual(page["args"], {"source": "content/index.md"})
+        self.assertEqual(page["ph"], "X")
+        self.assertGreaterEqual(parse["ts"], page["ts"])
+        self.assertLessEqual(parse["ts"] + parse["dur"], page["ts"] + page["dur"] + 1)
+
+    def test_span_recorded_on_error(self):
+        tracer = enable_tracing()
+        with self.assertRaises(ValueError):
+            with span("write"):
+                raise ValueError("boom")
+        self.assertEqual(tracer.events[0]["name"], "write")
+
+    def test_write_chrome_trace(self):
+        tracer = enable_tracing()
+        with span("build"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out", "trace.json")
+            tracer.write_chrome_trace(path)
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(data["traceEvents"][0]["name"], "build")
+        self.assertEqual(data["traceEvents"][0]["ts"], 0)
+
+    def test_summary(self):
+        tracer = Tracer()
+        tracer.add_span("page", 0, 5_000_000, args={"source": "slow.md"})
+        tracer.add_span("page", 0, 1_000_000, args={"source": "fast.md"})
+        tracer.add_span("parse", 0, 2_000_000)
+        summary = tracer.summary(top=1)
+        self.assertIn("slow.md", summary)
+        self.assertNotIn("fast.md", summary)
+        self.assertIn("parse", summary)
+
+    def test_worker_events_are_merged(self):
+        main = enable_tracing()
+        # Simulate a forked worker that inherited the parent's tracer
+        main.pid = -1
+        worker = worker_tracer()
+        self.assertIsNot(worker, main)
+        with span("page"):
+            pass
+        events = worker.drain()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(worker.events, [])
+
+        main.merge(events)
+        self.assertEqual(main.events[0]["name"], "page")
+        build_trace._tracer = None
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from unittest import mock
+
+from block_cache import BlockCache
+from document import Document, slugify
+from markdown_to_html import markdown_to_document, markdown_to_html_node
+from markdown_to_textnodes import text_to_textnodes
+
+
+MARKDOWN = """
+# The **Title**
+
+Intro with [a link](/blog/) and ![an image](/i.png), not `[code](/x)`.
+
+## Setup & Install
+
+- see [docs](https://example.com)
+
+### Setup & Install
+
+```
+words in code do not count
+```
+
+## Setup & Install
+
+A [reference that
+wraps](/wrapped/).
+"""
+
+
+class TestDocument(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Why Tom? (Part 1)"), "why-tom-part-1")
+        self.assertEqual(slugify("  Snake_case and  spaces "), "snake-case-and-spaces")
+        self.assertEqual(slugify("?!"), "")
+
+    def test_metadata_from_one_walk(self):
+        document = markdown_to_document(MARKDOWN)
+        self.assertEqual(document.title, "The **Title**")
+        self.assertEqual(
+            [(heading.level, heading.text, heading.id) for heading in document.headings],
+            [(1, "The Title", "the-title"), (2, "Setup & Install", "setup-install"),
+             (3, "Setup & Install", "setup-install-1"), (2, "Setup & Install", "setup-install-2")],
+        )
+        self.assertEqual(document.links, ["/blog/", "https://example.com", "/wrapped/"])
+        self.assertEqual(document.images, ["/i.png"])
+        self.assertEqual(document.word_count, 26)
+
+    def test_headings_get_ids(self):
+        html = markdown_to_document(MARKDOWN).node.to_html()
+        self.assertIn('<h1 id="the-title">The <b>Title</b></h1>', html)
+        self.assertIn('<h3 id="setup-install-1">Setup &amp; Install</h3>', html)
+        # markdown_to_html_node output is unchanged
+        self.assertIn("<h1>The <b>Title</b></h1>", markdown_to_html_node(MARKDOWN).to_html())
+
+    def test_toc(self):
+        self.assertEqual(
+            markdown_to_document(MARKDOWN).toc_html(),
+            '<nav class="toc"><ul><li><a href="#setup-install">Setup &amp; Install</a>'
+            '<ul><li><a href="#setup-install-1">Setup &amp; Install</a></li></ul></li>'
+            '<li><a href="#setup-install-2">Setup &amp; Install</a></li></ul></nav>',
+        )
+        self.assertEqual(Document().toc_html(), "")
+
+    def test_terms(self):
+        self.assertIsNone(markdown_to_document(MARKDOWN).terms())
+        terms = markdown_to_document(MARKDOWN, index_terms=True).terms()
+        self.assertEqual(terms["setup"], 3)
+        self.assertEqual((terms["link"], terms["image"], terms["code"]), (1, 1, 1))
+        # Neither URLs nor code blocks are indexed, nor single characters
+        for term in ("blog", "example", "words", "a"):
+            self.assertNotIn(term, terms)
+
+    def test_cached_blocks_give_the_same_metadata(self):
+        expected = markdown_to_document(MARKDOWN, index_terms=True)
+        cache = BlockCache()
+        for _ in range(2):
+            document = markdown_to_document(MARKDOWN, cache=cache, index_terms=True)
+            self.assertEqual(document.links, expected.links)
+            self.assertEqual(document.images, expected.images)
+            self.assertEqual(document.word_count, expected.word_count)
+            self.assertEqual(document.terms(), expected.terms())
+        self.assertGreater(cache.hits, 0)
+
+    def test_cache_hits_are_not_parsed_again(self):
+        cache = BlockCache()
+        markdown_to_document(MARKDOWN, cache=cache)
+        with mock.patch("markdown_to_html.text_to_textnodes", wraps=text_to_textnodes) as parse:
+            document = markdown_to_document(MARKDOWN, cache=cache)
+        # Only the headings, which are never cached, are parsed
+        self.assertEqual(parse.call_count, len(document.headings))
+
+    def test_no_title(self):
+        self.assertIsNone(markdown_to_document("## Only a subheading").title)
+
+
+if __name__ == "__main__":
+    unittest.main()
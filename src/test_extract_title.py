@@ -1,6 +1,6 @@
 import unittest
 
-from extract_title import extract_title
+from extract_title import extract_title, find_title
 
 class TestExtractTitle(unittest.TestCase):
     def test_simple_title(self):
@@ -37,6 +37,16 @@ class TestExtractTitle(unittest.TestCase):
         markdown = "# Title with symbols: !@#$%^&*()"
         self.assertEqual(extract_title(markdown), "Title with symbols: !@#$%^&*()")
         
+    def test_title_inside_code_is_skipped(self):
+        markdown = "```python\n# a comment\n```\n\n```# inline```\n# The Real Title"
+        self.assertEqual(extract_title(markdown), "The Real Title")
+        
+    def test_max_lines(self):
+        markdown = "Intro\n\nMore\n# Late Title"
+        self.assertEqual(find_title(markdown.split("\n"), max_lines=4), "Late Title")
+        with self.assertRaises(ValueError):
+            find_title(markdown.split("\n"), max_lines=3)
+        
     def test_empty_string(self):
         markdown = ""
         with self.assertRaises(ValueError):
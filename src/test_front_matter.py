@@ -0,0 +1,53 @@
+import unittest
+
+from front_matter import parse_front_matter, split_front_matter, tag_list
+
+MARKDOWN = """---
+title: "Why Tom: A Mistake"
+date: 2024-05-01
+tags: [tolkien, opinion]
+draft: false
+# comments are ignored
+summary: An unpopular opinion.
+---
+# Heading
+
+Body
+"""
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split(self):
+        metadata, body = split_front_matter(MARKDOWN)
+        self.assertEqual(metadata, {
+            "title": "Why Tom: A Mistake",
+            "date": "2024-05-01",
+            "tags": ["tolkien", "opinion"],
+            "draft": False,
+            "summary": "An unpopular opinion.",
+        })
+        self.assertEqual(body, "# Heading\n\nBody\n")
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n---\nx: y\n---\n"), ({}, "# Title\n---\nx: y\n---\n"))
+
+    def test_stray_delimiter_is_content(self):
+        markdown = "---\nnot a key value line\n---\n"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+        self.assertEqual(split_front_matter("---\ntitle: never closed\n"), ({}, "---\ntitle: never closed\n"))
+
+    def test_reads_only_the_header(self):
+        lines = iter(MARKDOWN.splitlines(keepends=True))
+        metadata, line_count = parse_front_matter(lines)
+        self.assertEqual(line_count, 8)
+        self.assertEqual(metadata["draft"], False)
+        self.assertEqual(next(lines), "# Heading\n")
+
+    def test_tag_list(self):
+        self.assertEqual(tag_list("a, b ,"), ["a", "b"])
+        self.assertEqual(tag_list(["a", 2]), ["a", "2"])
+        self.assertEqual(tag_list(None), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
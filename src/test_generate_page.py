@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+
+from generate_page import generate_page, generate_page_streaming
+
+MARKDOWN = """
+Intro with a [link](/blog/tom) and **bold** text.
+
+# The Title
+
+```python
+def a():
+    pass
+
+
+def b():
+    pass
+```
+
+> A quote
+> on two lines
+
+- one
+- ![two](/images/two.png)
+
+1. first
+2. second
+"""
+
+
+class TestGeneratePage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.source = os.path.join(self.root, "page.md")
+        with open(self.source, "w") as f:
+            f.write(MARKDOWN)
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_streaming_matches_in_memory(self):
+        whole = os.path.join(self.root, "whole", "index.html")
+        streamed = os.path.join(self.root, "streamed", "index.html")
+        generate_page(self.source, self.template, whole, "/site/")
+        generate_page_streaming(self.source, self.template, streamed, "/site/")
+
+        html = self._read(whole)
+        self.assertEqual(self._read(streamed), html)
+        self.assertTrue(html.startswith('<title>The Title</title><link href="/site/index.css"><div>'))
+        self.assertIn('pass</span>\n\n\n<span class="k">def</span> b()', html)
+
+    def test_toc_slot(self):
+        with open(self.source, "a") as f:
+            f.write("\n## Part [one](/one)\n\ntext\n\n### Detail\n\n## Part one\n")
+        with open(self.template, "w") as f:
+            f.write("{{ Toc }}{{ Content }}")
+        whole = os.path.join(self.root, "whole", "index.html")
+        streamed = os.path.join(self.root, "streamed", "index.html")
+        generate_page(self.source, self.template, whole)
+        generate_page_streaming(self.source, self.template, streamed)
+
+        html = self._read(whole)
+        self.assertEqual(self._read(streamed), html)
+        self.assertTrue(html.startswith(
+            '<nav class="toc"><ul><li><a href="#part-one">Part one</a><ul><li><a href="#detail">Detail</a></li></ul></li>'
+            '<li><a href="#part-one-1">Part one</a></li></ul></nav><div>'))
+        self.assertIn('<h1 id="the-title">The Title</h1>', html)
+        self.assertIn('<h2 id="part-one-1">Part one</h2>', html)
+
+    def test_front_matter(self):
+        with open(self.source, "w") as f:
+            f.write("---\ntitle: Front <Title>\ntags: [a]\n---\n" + MARKDOWN)
+        whole = os.path.join(self.root, "whole", "index.html")
+        streamed = os.path.join(self.root, "streamed", "index.html")
+        generate_page(self.source, self.template, whole)
+        generate_page_streaming(self.source, self.template, streamed)
+
+        html = self._read(whole)
+        self.assertEqual(self._read(streamed), html)
+        self.assertTrue(html.startswith("<title>Front &lt;Title></title>"))
+        self.assertNotIn("tags", html)
+
+    def test_streaming_requires_title(self):
+        with open(self.source, "w") as f:
+            f.write("No title here\n")
+        dest = os.path.join(self.root, "out", "index.html")
+        with self.assertRaises(ValueError):
+            generate_page_streaming(self.source, self.template, dest)
+        self.assertFalse(os.path.exists(dest))
+
+
+if __name__ == "__main__":
+    unittest.main()
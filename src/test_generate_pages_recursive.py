@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest
+from generate_pages_recursive import current_routes, generate_pages_recursive
+
+
+class TestCurrentRoutes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.template = self._write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self.store = os.path.join(self.root, "search.json")
+        self._write("content/index.md", "# Home\n\nWelcome")
+        self._write("content/blog/tom/index.md", "---\ntags: [tolkien]\n---\n# Tom\n")
+        self._write("content/blog/draft/index.md", "---\ndraft: true\n---\n# Draft\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel_path, text):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _manifest(self):
+        return BuildManifest(self.manifest_path, self.template, "/", self.dest)
+
+    def build(self):
+        manifest = self._manifest()
+        generate_pages_recursive(self.content, self.template, self.dest, "/", manifest=manifest, search_store=self.store)
+        manifest.remove_stale_outputs()
+        manifest.save()
+
+    def current(self, drafts=False):
+        return current_routes(self.content, self.dest, self._manifest(), drafts, self.store)
+
+    def test_unchanged_site(self):
+        self.build()
+        self.assertEqual([route.url for route in self.current()], ["/", "/blog/tom/"])
+
+    def test_changes_need_a_build(self):
+        self.build()
+        self.assertIsNone(self.current(drafts=True))
+        self._write("content/blog/tom/index.md", "# Tom Bombadil\n")
+        self.assertIsNone(self.current())
+        self.build()
+        os.remove(os.path.join(self.content, "index.md"))
+        self.assertIsNone(self.current())
+
+    def test_missing_generated_file_needs_a_build(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "tags", "tolkien", "index.html"))
+        self.assertIsNone(self.current())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+import highlight
+from highlight import (HighlightCache, Lexer, disable_highlight_cache, enable_highlight_cache,
+                       get_lexer, highlight_code, register_lexer)
+from markup import Markup
+
+
+class TestHighlight(unittest.TestCase):
+    def tearDown(self):
+        disable_highlight_cache()
+
+    def test_python(self):
+        html = highlight_code('def f():\n    return "a<b"  # & done', "python")
+        self.assertIsInstance(html, Markup)
+        self.assertEqual(
+            html,
+            '<span class="k">def</span> f():\n    <span class="k">return</span> '
+            '<span class="s">"a&lt;b"</span>  <span class="c"># &amp; done</span>',
+        )
+
+    def test_keywords_inside_identifiers_are_plain(self):
+        self.assertEqual(highlight_code("iffy = format_if", "py"), "iffy = format_if")
+
+    def test_aliases_and_unknown_languages(self):
+        self.assertIs(get_lexer("JS"), get_lexer("javascript"))
+        self.assertIsNone(highlight_code("x", "cobol"))
+        self.assertIsNone(highlight_code("x", None))
+
+    def test_custom_lexer(self):
+        lexer = Lexer("ini", [("nt", r"^\[[^\]\n]*\]"), ("c", r";[^\n]*")])
+        register_lexer(lexer)
+        try:
+            self.assertEqual(highlight_code("[a]\nx=1 ; c", "ini"),
+                             '<span class="nt">[a]</span>\nx=1 <span class="c">; c</span>')
+        finally:
+            del highlight.LEXERS["ini"]
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = enable_highlight_cache(directory)
+            first = highlight_code("x = 1", "python")
+            self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+            # A new cache (a later run) finds the entry on disk
+            cache = enable_highlight_cache(directory)
+            self.assertEqual(highlight_code("x = 1", "py"), first)
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_disk_cache_drops_other_versions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            enable_highlight_cache(directory)
+            highlight_code("x = 1", "python")
+            stale = os.path.join(directory, "0", "ab")
+            os.makedirs(stale)
+            enable_highlight_cache(directory)
+            self.assertEqual(os.listdir(directory), [highlight.HIGHLIGHTER_VERSION])
+
+    def test_cache_key_follows_lexer_rules(self):
+        cache = enable_highlight_cache()
+        register_lexer(Lexer("ini", [("c", r";[^\n]*")]))
+        try:
+            self.assertEqual(highlight_code("; a", "ini"), '<span class="c">; a</span>')
+            # A lexer registered again under the same name is not served the old output
+            register_lexer(Lexer("ini", [("cm", r";[^\n]*")]))
+            self.assertEqual(highlight_code("; a", "ini"), '<span class="cm">; a</span>')
+            self.assertEqual((cache.hits, cache.misses), (0, 2))
+        finally:
+            del highlight.LEXERS["ini"]
+
+    def test_cache_key(self):
+        cache = HighlightCache()
+        key = cache.key("x = 1", "python")
+        self.assertNotEqual(key, cache.key("x = 1", "javascript"))
+        self.assertNotEqual(key, cache.key("x = 2", "python"))
+        cache.version = "other"
+        self.assertNotEqual(key, cache.key("x = 1", "python"))
+
+
+if __name__ == "__main__":
+    unittest.main()
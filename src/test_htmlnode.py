@@ -1,6 +1,9 @@
+import io
+import sys
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, RawHTMLNode, shared_props, write_html
+from markup import Markup
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -58,6 +61,42 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode(tag="p", value="Hello, world!")
         with self.assertRaises(NotImplementedError):
             node.to_html()
+            
+    def test_nodes_are_slotted(self):
+        node = LeafNode("p", "text")
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertIs(LeafNode("".join(["s", "pan"]), "x").tag, "span")
+        
+    def test_escaping(self):
+        node = ParentNode("p", [
+            LeafNode(None, "1 < 2 & \"3\""),
+            LeafNode("a", "x", {"href": '/q?a=1&b="2"'}),
+            LeafNode(None, Markup("<br>")),
+            RawHTMLNode("<hr>"),
+        ])
+        expected = '<p>1 &lt; 2 &amp; "3"<a href="/q?a=1&amp;b=&quot;2&quot;">x</a><br><hr></p>'
+        self.assertEqual(node.to_html(), expected)
+        out = io.StringIO()
+        write_html(node, out)
+        self.assertEqual(out.getvalue(), expected)
+        self.assertEqual(LeafNode("b", "<i>").to_html(), "<b>&lt;i></b>")
+        self.assertEqual(shared_props(src='a".png').html, ' src="a&quot;.png"')
+        
+    def test_leaf_text_is_escaped_once(self):
+        node = LeafNode("b", "a & b")
+        self.assertIs(node.value.__class__, Markup)
+        self.assertEqual(node.value, "a &amp; b")
+        self.assertEqual(LeafNode("b", node.value).to_html(), "<b>a &amp; b</b>")
+        # Text without & or < is safe as it is
+        self.assertIs(LeafNode(None, "plain").value.__class__, str)
+        
+    def test_shared_props(self):
+        props = shared_props(href="/blog/")
+        self.assertIs(shared_props(href="/blog/"), props)
+        self.assertEqual(props, {"href": "/blog/"})
+        with self.assertRaises(TypeError):
+            props["href"] = "/other/"
+        self.assertEqual(LeafNode("a", "Blog", props).to_html(), '<a href="/blog/">Blog</a>')
 
 
 class TestLeafNode(unittest.TestCase):
@@ -158,5 +197,60 @@ class TestParentNode(unittest.TestCase):
             ParentNode("div", None).to_html()
 
 
+class TestWriteHTML(unittest.TestCase):
+    def test_write_matches_to_html(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "Hello, "), LeafNode("b", "world")], {"class": "intro"}),
+            LeafNode("a", "link", {"href": "/x"}),
+        ])
+        out = io.StringIO()
+        write_html(node, out)
+        self.assertEqual(out.getvalue(), node.to_html())
+        self.assertEqual(
+            out.getvalue(),
+            '<div><p class="intro">Hello, <b>world</b></p><a href="/x">link</a></div>',
+        )
+
+    def test_write_html_method(self):
+        out = io.StringIO()
+        LeafNode("span", "x").write_html(out)
+        self.assertEqual(out.getvalue(), "<span>x</span>")
+
+    def test_wide_tree(self):
+        items = [ParentNode("li", [LeafNode(None, str(i))]) for i in range(5000)]
+        html = ParentNode("ul", items).to_html()
+        self.assertTrue(html.startswith("<ul><li>0</li><li>1</li>"))
+        self.assertTrue(html.endswith("<li>4999</li></ul>"))
+
+    def test_write_html_batches_output(self):
+        items = [ParentNode("li", [LeafNode(None, f"{i} & <{i}>")]) for i in range(10000)]
+        node = ParentNode("div", [ParentNode("ul", items), RawHTMLNode("<hr>"), LeafNode("p", "end")])
+        chunks = []
+        
+        class Writer:
+            def write(self, chunk):
+                chunks.append(chunk)
+        
+        write_html(node, Writer())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), node.to_html())
+        self.assertIn("<li>7 &amp; &lt;7></li>", chunks[0])
+        self.assertTrue(chunks[-1].endswith("</ul><hr><p>end</p></div>"))
+
+    def test_deep_tree_does_not_recurse(self):
+        node = LeafNode(None, "core")
+        depth = sys.getrecursionlimit() * 2
+        for _ in range(depth):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertEqual(html, "<div>" * depth + "core" + "</div>" * depth)
+
+    def test_errors_from_nested_nodes(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode("p", [LeafNode("b", None)])]).to_html()
+        with self.assertRaises(NotImplementedError):
+            ParentNode("div", [HTMLNode("p", "x")]).to_html()
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
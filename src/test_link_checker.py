@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest
+from generate_page import generate_page
+from link_checker import BrokenLink, check_links, link_targets, locate_links, resolve_link
+from site_routes import Route
+
+
+MARKDOWN = """---
+title: "[not](/a/link)"
+---
+# Tom
+
+See [home](/) and ![a map](/images/map.png), not `[code](/x)`.
+
+```
+[inside](/a/fence/)
+```
+
+[one](../elves/) and [two](https://example.com) on one line
+
+A [link that
+wraps](/gone/) over two lines
+"""
+
+
+class TestLinkChecker(unittest.TestCase):
+    def test_locate_links(self):
+        self.assertEqual(
+            locate_links(MARKDOWN.split("\n"), ["../elves/", "/gone/", "/"]),
+            [(6, "/"), (12, "../elves/"), (15, "/gone/")],
+        )
+        # The front matter is skipped, and a repeated URL is found again further down
+        self.assertEqual(locate_links(["---", "x: (/a)", "---", "[a](/a)", "[b](/a)"], ["/a", "/a"]),
+                         [(4, "/a"), (5, "/a")])
+
+    def test_resolve_link(self):
+        self.assertEqual(resolve_link("/blog/tom/#intro", "/"), "/blog/tom/")
+        self.assertEqual(resolve_link("../elves/", "/blog/tom/"), "/blog/elves/")
+        self.assertEqual(resolve_link("map%20v2.png?x=1", "/blog/tom/"), "/blog/tom/map v2.png")
+        for url in ("https://example.com/", "//cdn.example.com/x.js", "mailto:tom@example.com", "#intro"):
+            self.assertIsNone(resolve_link(url, "/"))
+
+    def test_check_links(self):
+        with tempfile.TemporaryDirectory() as root:
+            template = os.path.join(root, "template.html")
+            source = os.path.join(root, "tom.md")
+            for path, text in ((template, "{{ Content }}"), (source, MARKDOWN)):
+                with open(path, "w") as f:
+                    f.write(text)
+            dest = os.path.join(root, "docs")
+            page = os.path.join(dest, "blog", "tom", "index.html")
+            document = generate_page(source, template, page)
+            self.assertEqual(document.images, ["/images/map.png"])
+            manifest = BuildManifest(os.path.join(root, "manifest.json"), template, "/", dest)
+            manifest.record(source, page, document.links + document.images)
+            manifest.static_files = [os.path.join("images", "map.png")]
+
+            targets = link_targets(manifest)
+            self.assertTrue({"/", "/blog/tom/", "/blog/tom", "/images/map.png"} <= targets)
+            broken = check_links([Route(source, "/blog/tom/", page)], targets, manifest)
+            self.assertEqual(broken, [BrokenLink(source, 12, "../elves/"), BrokenLink(source, 15, "/gone/")])
+
+
+if __name__ == "__main__":
+    unittest.main()
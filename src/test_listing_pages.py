@@ -0,0 +1,109 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from build_manifest import BuildManifest
+from listing_pages import generate_listing_pages, listing_node, plan_listing_pages
+from metadata_index import MetadataIndex, PageMeta
+from site_routes import Route
+
+
+def page(url, title, date=None, tags=(), summary=None):
+    return PageMeta(f"content{url}index.md", url, title, date, list(tags), False, summary)
+
+
+class TestListingPages(unittest.TestCase):
+    def setUp(self):
+        self.pages = [
+            page("/", "Home"),
+            page("/blog/a/", "A", "2024-01-01", ["tolkien"]),
+            page("/blog/b/", "B", "2024-03-01", ["tolkien", "opinion"], "Short & sweet"),
+            page("/blog/c/", "C", "2024-02-01"),
+            page("/blog/2023/d/", "D"),
+        ]
+        self.routes = [Route(p.source, p.url, None) for p in self.pages]
+
+    def _urls(self, listings):
+        return [listing.url for listing in listings]
+
+    def test_plan(self):
+        listings = plan_listing_pages(MetadataIndex(self.pages), self.routes, "docs", page_size=2)
+        self.assertEqual(self._urls(listings), [
+            "/archive/", "/archive/page/2/", "/blog/", "/blog/2023/", "/blog/page/2/",
+            "/tags/", "/tags/opinion/", "/tags/tolkien/",
+        ])
+        blog, blog2 = listings[2], listings[4]
+        # Newest first, undated last
+        self.assertEqual([p.title for p in blog.entries + blog2.entries], ["B", "C", "A", "D"])
+        self.assertEqual((blog.number, blog.count, blog.prev_url, blog.next_url), (1, 2, None, "/blog/page/2/"))
+        self.assertEqual((blog2.title, blog2.prev_url, blog2.next_url), ("Blog (page 2)", "/blog/", None))
+        self.assertEqual(blog2.dest, os.path.join("docs", "blog", "page", "2", "index.html"))
+        self.assertEqual([(e.tag, e.count) for e in listings[5].entries], [("opinion", 1), ("tolkien", 2)])
+
+    def test_hand_written_page_wins(self):
+        routes = self.routes + [Route("content/blog/index.md", "/blog/", None)]
+        listings = plan_listing_pages(MetadataIndex(self.pages), routes, "docs")
+        self.assertNotIn("/blog/", self._urls(listings))
+
+    def test_tags_sharing_a_url_are_merged(self):
+        pages = self.pages + [page("/blog/e/", "E", None, ["Tolkien", "tolkien"])]
+        with redirect_stdout(io.StringIO()) as out:
+            listings = plan_listing_pages(MetadataIndex(pages), self.routes, "docs")
+        self.assertIn("/tags/tolkien/", out.getvalue())
+        tag = next(listing for listing in listings if listing.url == "/tags/tolkien/")
+        self.assertEqual(tag.title, "Tagged: tolkien")
+        self.assertEqual([p.title for p in tag.entries], ["B", "A", "E"])
+        tags = next(listing for listing in listings if listing.url == "/tags/")
+        self.assertEqual([(e.tag, e.count) for e in tags.entries], [("opinion", 1), ("tolkien", 3)])
+
+    def test_section_clashing_with_a_listing_is_reported(self):
+        pages = self.pages + [page("/tags/tolkien/", "Tolkien"), page("/archive/2023/", "2023")]
+        routes = [Route(p.source, p.url, None) for p in pages]
+        with redirect_stdout(io.StringIO()) as out:
+            listings = plan_listing_pages(MetadataIndex(pages), routes, "docs")
+        self.assertIn("Section /tags/", out.getvalue())
+        self.assertIn("Section /archive/", out.getvalue())
+        self.assertIn("Page /tags/tolkien/", out.getvalue())
+        urls = self._urls(listings)
+        self.assertEqual(len(urls), len(set(urls)))
+        self.assertEqual([listing.kind for listing in listings if listing.url in ("/tags/", "/archive/")],
+                         ["archive", "tags"])
+
+    def test_listing_node(self):
+        listings = plan_listing_pages(MetadataIndex(self.pages), self.routes, "docs", page_size=1)
+        tag = next(listing for listing in listings if listing.url == "/tags/tolkien/")
+        self.assertEqual(
+            listing_node(tag).to_html(),
+            '<div><h1>Tagged: tolkien</h1><ul class="listing"><li><a href="/blog/b/">B</a> '
+            '<time datetime="2024-03-01">2024-03-01</time><p>Short &amp; sweet</p></li></ul>'
+            '<nav class="pagination"><span>Page 1 of 2</span>'
+            '<a href="/tags/tolkien/page/2/" rel="next">Older</a></nav></div>',
+        )
+
+    def test_only_changed_listings_are_rebuilt(self):
+        with tempfile.TemporaryDirectory() as root:
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            dest = os.path.join(root, "docs")
+            manifest_path = os.path.join(root, "manifest.json")
+
+            def build(pages):
+                manifest = BuildManifest(manifest_path, template, "/", dest)
+                written = generate_listing_pages(MetadataIndex(pages), self.routes, template, dest, "/", manifest)
+                manifest.save()
+                return sorted(os.path.relpath(path, dest) for path in written)
+
+            self.assertEqual(len(build(self.pages)), 6)
+            self.assertEqual(build(self.pages), [])
+            # A new undated post only appears on its section page
+            added = self.pages + [page("/blog/e/", "E")]
+            self.assertEqual(build(added), [os.path.join("blog", "index.html")])
+            with open(os.path.join(dest, "blog", "index.html")) as f:
+                self.assertIn('<a href="/blog/e/">E</a>', f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
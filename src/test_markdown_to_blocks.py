@@ -1,6 +1,9 @@
+import itertools
 import unittest
+from unittest import mock
 
-from markdown_to_blocks import markdown_to_blocks
+from block_type import BlockType
+from markdown_to_blocks import markdown_to_blocks, scan_blocks, scan_lines
 
 
 class TestMarkdownToBlocks(unittest.TestCase):
@@ -121,5 +124,54 @@ And here's another list:
         self.assertEqual(blocks, [])
 
 
+    def test_fenced_code_keeps_blank_lines(self):
+        md = """Intro
+
+```python
+def a():
+    pass
+
+
+def b():
+    pass
+```
+Outro"""
+        self.assertEqual(
+            list(scan_blocks(md)),
+            [
+                (BlockType.PARAGRAPH, ["Intro"]),
+                (BlockType.CODE, ["```python", "def a():", "    pass", "", "", "def b():", "    pass", "```"]),
+                (BlockType.PARAGRAPH, ["Outro"]),
+            ],
+        )
+
+    def test_scan_blocks_types(self):
+        md = "# Title\n\n> a\n> b\n   \n- x\n- y\n\n1. one\n2. two\n\n  text  "
+        self.assertEqual(
+            [(block_type, lines) for block_type, lines in scan_blocks(md)],
+            [
+                (BlockType.HEADING, ["# Title"]),
+                (BlockType.QUOTE, ["> a", "> b"]),
+                (BlockType.UNORDERED_LIST, ["- x", "- y"]),
+                (BlockType.ORDERED_LIST, ["1. one", "2. two"]),
+                (BlockType.PARAGRAPH, ["text"]),
+            ],
+        )
+
+    def test_unclosed_fence_is_text(self):
+        md = "```\nnot closed\n\nnext"
+        self.assertEqual(markdown_to_blocks(md), ["```\nnot closed", "next"])
+
+    def test_unclosed_fence_is_not_buffered_to_the_end(self):
+        lines = itertools.chain(["```", "not closed", "", "more", "text"], itertools.repeat("x"))
+        with mock.patch("markdown_to_blocks.MAX_FENCED_LINES", 4):
+            blocks = scan_lines(lines)
+            self.assertEqual(next(blocks), (BlockType.PARAGRAPH, ["```", "not closed"]))
+        # The open paragraph goes on after the fence is given up
+        md = "```\na\n\nb\nc\nd\n\ne"
+        with mock.patch("markdown_to_blocks.MAX_FENCED_LINES", 4):
+            self.assertEqual(markdown_to_blocks(md), ["```\na", "b\nc\nd", "e"])
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,6 +1,7 @@
 import unittest
 
 from markdown_to_html import markdown_to_html_node
+from url_rewriter import UrlRewriter
 
 
 class TestMarkdownToHTML(unittest.TestCase):
@@ -101,7 +102,8 @@ def hello():
         html = node.to_html()
         self.assertEqual(
             html,
-            "<div><pre><code>def hello():\n    print(\"Hello, world!\")</code></pre></div>",
+            "<div><pre><code class=\"language-python\"><span class=\"k\">def</span> hello():\n"
+            "    <span class=\"nb\">print</span>(<span class=\"s\">\"Hello, world!\"</span>)</code></pre></div>",
         )
         
     def test_mixed_content(self):
@@ -145,6 +147,34 @@ This is a paragraph with a [link](https://example.com) and an ![image](https://e
             "<div><p>This is a paragraph with a <a href=\"https://example.com\">link</a> and an <img src=\"https://example.com/image.jpg\" alt=\"image\"></img>.</p></div>",
         )
 
+    def test_codeblock_unknown_language(self):
+        md = """
+```cobol
+DISPLAY 'A < B'.
+```
+"""
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            "<div><pre><code class=\"language-cobol\">DISPLAY 'A &lt; B'.</code></pre></div>",
+        )
+
+    def test_rewriter_applies_to_links_not_code(self):
+        md = """
+See [the blog](/blog/tom) and ![logo](/images/logo.png).
+
+```
+<a href="/blog/tom">left alone</a>
+```
+"""
+        node = markdown_to_html_node(md, UrlRewriter("/site/"))
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><p>See <a href=\"/site/blog/tom\">the blog</a> and <img src=\"/site/images/logo.png\" alt=\"logo\"></img>.</p>"
+            "<pre><code>&lt;a href=\"/blog/tom\">left alone&lt;/a></code></pre></div>",
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -111,5 +111,74 @@ class TestMarkdownToTextNodes(unittest.TestCase):
         )
 
 
+    def test_text_to_textnodes_link_inside_bold(self):
+        text = "Read **the [guide](/guide) first** please"
+        nodes = text_to_textnodes(text)
+        self.assertEqual(
+            [
+                TextNode("Read ", TextType.TEXT),
+                TextNode("the ", TextType.BOLD),
+                TextNode("guide", TextType.LINK, "/guide"),
+                TextNode(" first", TextType.BOLD),
+                TextNode(" please", TextType.TEXT),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_code_is_verbatim(self):
+        text = "Use `a**b**_c_` here"
+        nodes = text_to_textnodes(text)
+        self.assertEqual(
+            [
+                TextNode("Use ", TextType.TEXT),
+                TextNode("a**b**_c_", TextType.CODE),
+                TextNode(" here", TextType.TEXT),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_underscores_in_url(self):
+        text = "[docs](https://example.com/a_b_c) and _italic_"
+        nodes = text_to_textnodes(text)
+        self.assertEqual(
+            [
+                TextNode("docs", TextType.LINK, "https://example.com/a_b_c"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("italic", TextType.ITALIC),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_unmatched_delimiters(self):
+        text = "a ** b _ c ` d [e] ![f]"
+        nodes = text_to_textnodes(text)
+        self.assertEqual([TextNode(text, TextType.TEXT)], nodes)
+
+    def test_text_to_textnodes_stray_brackets_before_links(self):
+        text = "see [x] and ![img](i.png) done [1] [site](/s) and [a [b](c)"
+        nodes = text_to_textnodes(text)
+        self.assertEqual(
+            [
+                TextNode("see [x] and ", TextType.TEXT),
+                TextNode("img", TextType.IMAGE, "i.png"),
+                TextNode(" done [1] ", TextType.TEXT),
+                TextNode("site", TextType.LINK, "/s"),
+                TextNode(" and [a ", TextType.TEXT),
+                TextNode("b", TextType.LINK, "c"),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_link_url_ends_at_whitespace(self):
+        nodes = text_to_textnodes("[a](b c) then [d](/e)")
+        self.assertEqual(
+            [
+                TextNode("[a](b c) then ", TextType.TEXT),
+                TextNode("d", TextType.LINK, "/e"),
+            ],
+            nodes,
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,25 @@
+import unittest
+
+from markup import Markup, escape_attribute, escape_text
+
+
+class TestMarkup(unittest.TestCase):
+    def test_escape_text(self):
+        self.assertEqual(escape_text("a < b & c > d"), "a &lt; b &amp; c > d")
+        self.assertEqual(escape_text('She said "hi"'), 'She said "hi"')
+        plain = "nothing to escape"
+        self.assertIs(escape_text(plain), plain)
+
+    def test_escape_attribute(self):
+        self.assertEqual(escape_attribute('/a?x=1&y="2"'), "/a?x=1&amp;y=&quot;2&quot;")
+        self.assertEqual(escape_attribute("<b>"), "<b>")
+        self.assertEqual(escape_attribute(3), "3")
+
+    def test_markup_is_not_escaped_again(self):
+        html = Markup("<b>&amp;</b>")
+        self.assertIs(escape_text(html), html)
+        self.assertIs(escape_attribute(html), html)
+
+
+if __name__ == "__main__":
+    unittest.main()
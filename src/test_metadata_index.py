@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from generate_pages_recursive import generate_pages_recursive
+from metadata_index import build_metadata_index
+from site_routes import plan_routes
+
+PAGES = {
+    "index.md": "# Home\n\nWelcome\n",
+    "blog/tom/index.md": "---\ntitle: Tom\ndate: 2024-05-01\ntags: [tolkien, opinion]\n"
+                         "summary: Short.\n---\n# Ignored heading\n",
+    "blog/draft/index.md": "---\ndraft: true\ntags: tolkien\n---\n\n# Work in progress\n",
+    "notes.md": "No title at all\n",
+}
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        for rel_path, text in PAGES.items():
+            path = os.path.join(self.content, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_index(self):
+        index = build_metadata_index(plan_routes(self.content, self.dest))
+        self.assertEqual([page.url for page in index.pages], ["/", "/blog/draft/", "/blog/tom/", "/notes/"])
+        tom = index.by_url["/blog/tom/"]
+        self.assertEqual((tom.title, tom.date, tom.tags, tom.draft, tom.summary),
+                         ("Tom", "2024-05-01", ["tolkien", "opinion"], False, "Short."))
+        draft = index.by_url["/blog/draft/"]
+        self.assertEqual((draft.title, draft.draft), ("Work in progress", True))
+        self.assertEqual(index.by_url["/"].title, "Home")
+        self.assertIsNone(index.by_url["/notes/"].title)
+        self.assertEqual([page.url for page in index.tags()["tolkien"]], ["/blog/tom/"])
+
+    def test_title_read_is_capped(self):
+        path = os.path.join(self.content, "long.md")
+        with open(path, "w") as f:
+            f.write("```\n# not a title\n```\n" + "text\n" * 200 + "# Too Late\n")
+        index = build_metadata_index(plan_routes(self.content, self.dest))
+        self.assertIsNone(index.by_url["/long/"].title)
+
+    def test_drafts_are_skipped(self):
+        # A generated page needs a title
+        os.remove(os.path.join(self.content, "notes.md"))
+        template = os.path.join(self.tmp.name, "template.html")
+        with open(template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        draft = os.path.join(self.dest, "blog", "draft", "index.html")
+        generate_pages_recursive(self.content, template, self.dest, page_size=0)
+        self.assertFalse(os.path.exists(draft))
+        generate_pages_recursive(self.content, template, self.dest, page_size=0, drafts=True)
+        self.assertTrue(os.path.exists(draft))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+
+from output_staging import OutputStager, atomic_write, atomic_writer, clone_tree, swap_paths
+
+
+class TestOutputStaging(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.live = os.path.join(self.root, "docs")
+        self.build = os.path.join(self.root, ".build")
+        self.manifest = os.path.join(self.build, "manifest.json")
+        self.stager = OutputStager(self.live, self.build, keep=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, text)
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def _build(self, text):
+        staging = self.stager.prepare()
+        self._write(os.path.join(staging, "index.html"), text)
+        self.stager.promote(self.manifest)
+        self._write(self.manifest, text)
+
+    def test_atomic_write_breaks_hardlinks(self):
+        first = os.path.join(self.root, "a.html")
+        second = os.path.join(self.root, "b.html")
+        self._write(first, "old")
+        os.link(first, second)
+        atomic_write(first, "new")
+        self.assertEqual(self._read(first), "new")
+        self.assertEqual(self._read(second), "old")
+
+    def test_atomic_writer_leaves_file_on_error(self):
+        path = os.path.join(self.root, "page.html")
+        self._write(path, "old")
+        with self.assertRaises(RuntimeError):
+            with atomic_writer(path) as f:
+                f.write("partial")
+                raise RuntimeError("render failed")
+        self.assertEqual(self._read(path), "old")
+        self.assertEqual(os.listdir(self.root), ["page.html"])
+
+    def test_clone_tree_uses_hardlinks(self):
+        self._write(os.path.join(self.live, "blog", "index.html"), "post")
+        clone = os.path.join(self.root, "clone")
+        clone_tree(self.live, clone)
+        original = os.stat(os.path.join(self.live, "blog", "index.html"))
+        cloned = os.stat(os.path.join(clone, "blog", "index.html"))
+        self.assertTrue(os.path.samestat(original, cloned))
+
+    def test_swap_paths(self):
+        a = os.path.join(self.root, "a")
+        b = os.path.join(self.root, "b")
+        self._write(os.path.join(a, "f"), "A")
+        self._write(os.path.join(b, "f"), "B")
+        swap_paths(a, b)
+        self.assertEqual(self._read(os.path.join(a, "f")), "B")
+        self.assertEqual(self._read(os.path.join(b, "f")), "A")
+
+    def test_staging_starts_from_live_output(self):
+        self._build("v1")
+        staging = self.stager.prepare()
+        self.assertEqual(self._read(os.path.join(staging, "index.html")), "v1")
+
+    def test_clean_staging_starts_empty(self):
+        self._build("v1")
+        staging = self.stager.prepare(clean=True)
+        self.assertEqual(os.listdir(staging), [])
+
+    def test_promote_keeps_generations(self):
+        self._build("v1")
+        self.assertEqual(self.stager.generations(), [])
+        self._build("v2")
+        self._build("v3")
+        self._build("v4")
+        self.assertEqual(self._read(os.path.join(self.live, "index.html")), "v4")
+        # Only the newest two previous outputs are kept
+        self.assertEqual(self.stager.generations(), [2, 3])
+
+    def test_rollback_restores_output_and_manifest(self):
+        self._build("v1")
+        self._build("v2")
+        self.stager.rollback(self.manifest)
+        self.assertEqual(self._read(os.path.join(self.live, "index.html")), "v1")
+        self.assertEqual(self._read(self.manifest), "v1")
+
+        # Rolling back again returns to the newer output
+        self.stager.rollback(self.manifest)
+        self.assertEqual(self._read(os.path.join(self.live, "index.html")), "v2")
+
+    def test_rollback_without_generations(self):
+        with self.assertRaises(ValueError):
+            self.stager.rollback(self.manifest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from page_executor import PageJob, SerialExecutor, create_executor, schedule_jobs, run_page_jobs
+
+
+class TestPageExecutor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.template = self._write("template.html", '<title>{{ Title }}</title><a href="/">{{ Content }}</a>')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel_path, text):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _jobs(self, out_dir):
+        jobs = []
+        for i in range(6):
+            source = self._write(f"content/page{i}.md", f"# Page {i}\n\n" + "Some **text**. " * (i + 1))
+            dest = os.path.join(self.root, out_dir, f"page{i}", "index.html")
+            jobs.append(PageJob(source, self.template, dest, "/base/"))
+        return jobs
+
+    def _read_tree(self, out_dir):
+        result = {}
+        base = os.path.join(self.root, out_dir)
+        for dirpath, _, filenames in os.walk(base):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                with open(path, "rb") as f:
+                    result[os.path.relpath(path, base)] = f.read()
+        return result
+
+    def test_create_executor_kinds(self):
+        self.assertIsInstance(create_executor("serial", 4), SerialExecutor)
+        self.assertIsInstance(create_executor("thread", 1), SerialExecutor)
+        with create_executor("thread", 2) as executor:
+            self.assertIsInstance(executor, ThreadPoolExecutor)
+        with self.assertRaises(ValueError):
+            create_executor("fibers", 2)
+
+    def test_schedule_largest_first(self):
+        jobs = self._jobs("out")
+        scheduled = schedule_jobs(jobs)
+        self.assertEqual(scheduled, list(reversed(jobs)))
+
+    def test_parallel_output_matches_serial(self):
+        run_page_jobs(self._jobs("serial"))
+        with create_executor("thread", 3) as executor:
+            rendered = run_page_jobs(self._jobs("threads"), executor)
+
+        self.assertEqual(len(rendered), 6)
+        self.assertEqual(self._read_tree("serial"), self._read_tree("threads"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest
+from metadata_index import MetadataIndex, PageMeta
+from page_executor import PageJob, run_page_jobs
+from search_index import SearchIndex
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.template = self._write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.dest = os.path.join(self.root, "docs")
+        self.store = os.path.join(self.root, "search.json")
+        self._write("content/tom/index.md", "# Tom\n\nTom Bombadil sings. Tom is **odd**.")
+        self._write("content/elves/index.md", "# Elves\n\nGlorfindel is an [elf](/elves/).")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel_path, text):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _read(self, name):
+        with open(os.path.join(self.dest, "search", name)) as f:
+            return json.load(f)
+
+    def build(self, names=("elves", "tom")):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"), self.template, "/", self.dest)
+        index = MetadataIndex([
+            PageMeta(os.path.join(self.root, "content", name, "index.md"), f"/{name}/", name.title(),
+                     None, [], False, None)
+            for name in names
+        ])
+        jobs = [PageJob(page.source, self.template, os.path.join(self.dest, page.url.strip("/"), "index.html"), "/")
+                for page in index.pages]
+        search_index = SearchIndex(self.store)
+        rendered = run_page_jobs(jobs, None, manifest, False, search_index)
+        written = search_index.write(index, self.dest, "/base/", manifest)
+        manifest.save()
+        return ([os.path.relpath(path, self.dest) for path in rendered],
+                sorted(os.path.basename(path) for path in written))
+
+    def test_index_files(self):
+        self.build()
+        summary = self._read("index.json")
+        self.assertEqual(summary["pages"], [["/base/elves/", "Elves"], ["/base/tom/", "Tom"]])
+        self.assertIn("to", summary["shards"])
+        self.assertEqual(self._read("to.json"), {"tom": [1, 3]})
+        self.assertEqual(self._read("el.json"), {"elf": [0, 1], "elves": [0, 1]})
+
+    def test_only_changed_pages_are_indexed(self):
+        self.build()
+        self.assertEqual(self.build(), ([], []))
+        self._write("content/tom/index.md", "# Tom\n\nTom Bombadil dances.")
+        rendered, written = self.build()
+        self.assertEqual(rendered, [os.path.join("tom", "index.html")])
+        # Shards whose terms changed; "si" (sings) is gone altogether
+        self.assertEqual(written, ["da.json", "index.json", "is.json", "to.json"])
+        self.assertEqual(self._read("to.json"), {"tom": [1, 2]})
+        self.assertNotIn("si", self._read("index.json")["shards"])
+
+    def test_missing_store_reindexes(self):
+        self.build()
+        os.remove(self.store)
+        rendered, written = self.build()
+        self.assertEqual(len(rendered), 2)
+        self.assertEqual(written, [])
+
+    def test_page_ids_are_kept(self):
+        self.build()
+        self.build(["tom"])
+        summary = self._read("index.json")
+        self.assertEqual(summary["pages"], [None, ["/base/tom/", "Tom"]])
+        self.assertEqual(self._read("to.json"), {"tom": [1, 3]})
+        self.assertNotIn("el", summary["shards"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest
+from metadata_index import MetadataIndex, PageMeta
+from site_feeds import atom_datetime, feed_entries, generate_site_feeds, sitemap_entries, write_sitemaps
+
+
+def page(url, title, date=None, summary=None):
+    return PageMeta(f"content{url}index.md", url, title, date, [], False, summary)
+
+
+class TestSiteFeeds(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        root = self.root.name
+        self.template = os.path.join(root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.dest = os.path.join(root, "docs")
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.pages = [
+            page("/", "Tom & Friends"),
+            page("/blog/a/", "A", "2024-01-01"),
+            page("/blog/b/", "B <new>", "2024-03-01T12:00:00Z", "Short & sweet"),
+            page("/contact/", "Contact"),
+        ]
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def _manifest(self, urls):
+        manifest = BuildManifest(self.manifest_path, self.template, "/", self.dest)
+        for url in urls:
+            manifest.record_listing(os.path.join(self.dest, url.strip("/"), "index.html"), url)
+        return manifest
+
+    def _read(self, name):
+        with open(os.path.join(self.dest, name)) as f:
+            return f.read()
+
+    def test_sitemap_entries(self):
+        manifest = self._manifest(["/blog/", "/"])
+        entries = list(sitemap_entries(manifest))
+        self.assertEqual([url for url, _ in entries], ["/blog/", "/"])
+        self.assertTrue(all(updated.endswith("Z") for _, updated in entries))
+
+    def test_sharded_sitemap(self):
+        entries = [(f"/p{n}/", "2024-01-01T00:00:00Z") for n in range(5)]
+        written = write_sitemaps(entries, self.dest, "https://example.com/", "/blog/", max_urls=2)
+        self.assertEqual(sorted(os.path.basename(path) for path in written),
+                         ["sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml", "sitemap.xml"])
+        index = self._read("sitemap.xml")
+        self.assertIn("<sitemapindex", index)
+        self.assertIn("<loc>https://example.com/blog/sitemap-3.xml</loc>", index)
+        self.assertIn("<loc>https://example.com/blog/p4/</loc>", self._read("sitemap-3.xml"))
+
+    def test_feed_entries(self):
+        entries = feed_entries(MetadataIndex(self.pages), limit=1)
+        self.assertEqual(entries, [("/blog/b/", "B <new>", "2024-03-01T12:00:00Z", "Short & sweet")])
+        self.assertEqual(feed_entries(MetadataIndex(self.pages))[1][2], "2024-01-01T00:00:00Z")
+
+    def test_atom_datetime(self):
+        self.assertEqual(atom_datetime("2024-03-01"), "2024-03-01T00:00:00Z")
+        self.assertEqual(atom_datetime("2024-03-01T12:30"), "2024-03-01T12:30:00Z")
+        self.assertEqual(atom_datetime("2024-03-01 12:30:15"), "2024-03-01T12:30:15Z")
+        self.assertEqual(atom_datetime("2024-03-01T12:30:15+0200"), "2024-03-01T12:30:15+02:00")
+        self.assertEqual(atom_datetime("2024-03-01T12:30:15-05:00"), "2024-03-01T12:30:15-05:00")
+        self.assertEqual(atom_datetime("March 1st"), "March 1st")
+
+    def test_feed_is_escaped_and_only_rewritten_on_change(self):
+        def build(pages):
+            manifest = self._manifest([p.url for p in pages])
+            written = generate_site_feeds(MetadataIndex(pages), self.dest, "https://example.com", "/", manifest)
+            manifest.save()
+            return sorted(os.path.basename(path) for path in written)
+
+        self.assertEqual(build(self.pages), ["feed.xml", "sitemap.xml"])
+        feed = self._read("feed.xml")
+        self.assertIn("<title>Tom &amp; Friends</title>", feed)
+        self.assertIn("<title>B &lt;new></title>", feed)
+        self.assertIn('<link href="https://example.com/blog/b/"/>', feed)
+        self.assertIn("<updated>2024-03-01T12:00:00Z</updated>", feed)
+        self.assertEqual(build(self.pages), [])
+        # An undated page only changes the sitemap
+        self.assertEqual(build(self.pages + [page("/about/", "About")]), ["sitemap.xml"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from site_routes import Route, create_output_dirs, plan_routes, route_for
+
+
+class TestSiteRoutes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel_path):
+        path = os.path.join(self.content, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("# Page\n")
+
+    def test_route_for(self):
+        self.assertEqual(route_for("index.md", "content", "docs"),
+                         Route("content/index.md", "/", "docs/index.html"))
+        self.assertEqual(route_for("contact.md", "content", "docs"),
+                         Route("content/contact.md", "/contact/", "docs/contact/index.html"))
+        self.assertEqual(route_for(os.path.join("blog", "tom", "index.md"), "content", "docs"),
+                         Route("content/blog/tom/index.md", "/blog/tom/", "docs/blog/tom/index.html"))
+
+    def test_plan_routes_each_page_once(self):
+        for rel_path in ["index.md", "contact/index.md", "blog/tom/index.md",
+                         "blog/glorfindel/index.md", "blog/notes.md", ".hidden/index.md",
+                         "blog/.draft.md", "blog/image.png"]:
+            self._write(rel_path)
+        routes = plan_routes(self.content, self.dest)
+        self.assertEqual([route.url for route in routes],
+                         ["/", "/blog/glorfindel/", "/blog/notes/", "/blog/tom/", "/contact/"])
+        self.assertEqual(routes[3].dest, os.path.join(self.dest, "blog", "tom", "index.html"))
+
+    def test_plan_routes_conflict(self):
+        self._write("about.md")
+        self._write("about/index.md")
+        with self.assertRaises(ValueError):
+            plan_routes(self.content, self.dest)
+
+    def test_create_output_dirs(self):
+        self._write("index.md")
+        self._write("blog/tom/index.md")
+        create_output_dirs(plan_routes(self.content, self.dest))
+        self.assertTrue(os.path.isdir(os.path.join(self.dest, "blog", "tom")))
+
+
+if __name__ == "__main__":
+    unittest.main()
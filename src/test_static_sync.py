@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from static_sync import copy_file, is_synced, needs_copy, scan_tree, sync_directory
+
+
+class TestStaticSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self._write(self.source, "index.css", "body {}")
+        self._write(self.source, "images/a.png", "PNG-A")
+        self._write(self.source, "images/deep/b.png", "PNG-B" * 1000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, root, rel_path, text):
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _read(self, root, rel_path):
+        with open(os.path.join(root, rel_path)) as f:
+            return f.read()
+
+    def test_scan_tree(self):
+        self.assertEqual(
+            sorted(scan_tree(self.source)),
+            ["images/a.png", "images/deep/b.png", "index.css"],
+        )
+        self.assertEqual(scan_tree(os.path.join(self.tmp.name, "missing")), {})
+
+    def test_initial_sync_copies_everything(self):
+        result = sync_directory(self.source, self.dest, jobs=4)
+        self.assertEqual(sorted(result.copied), result.files)
+        self.assertEqual(self._read(self.dest, "images/deep/b.png"), "PNG-B" * 1000)
+
+    def test_second_sync_skips_unchanged(self):
+        sync_directory(self.source, self.dest)
+        result = sync_directory(self.source, self.dest)
+        self.assertEqual(result.copied, [])
+        self.assertEqual(len(result.skipped), 3)
+
+    def test_changed_file_is_copied(self):
+        sync_directory(self.source, self.dest)
+        self._write(self.source, "index.css", "body { color: red; }")
+        result = sync_directory(self.source, self.dest)
+        self.assertEqual(result.copied, ["index.css"])
+        self.assertEqual(self._read(self.dest, "index.css"), "body { color: red; }")
+
+    def test_is_synced(self):
+        self.assertFalse(is_synced(self.source, self.dest, []))
+        first = sync_directory(self.source, self.dest)
+        self.assertTrue(is_synced(self.source, self.dest, first.files))
+        self._write(self.source, "index.css", "body { color: red; }")
+        self.assertFalse(is_synced(self.source, self.dest, first.files))
+        second = sync_directory(self.source, self.dest, first.files)
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        self.assertFalse(is_synced(self.source, self.dest, second.files))
+
+    def test_hash_mode_ignores_mtime(self):
+        first = sync_directory(self.source, self.dest)
+        os.utime(os.path.join(self.source, "index.css"), (0, 0))
+        result = sync_directory(self.source, self.dest, first.files, use_hash=True)
+        self.assertEqual(result.copied, [])
+
+    def test_removed_file_is_deleted(self):
+        first = sync_directory(self.source, self.dest)
+        generated = self._write(self.dest, "index.html", "<p>page</p>")
+        os.remove(os.path.join(self.source, "images", "deep", "b.png"))
+
+        result = sync_directory(self.source, self.dest, first.files)
+        self.assertEqual(result.removed, ["images/deep/b.png"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "deep")))
+        # Files the sync did not create are left alone
+        self.assertTrue(os.path.exists(generated))
+
+    def test_hardlink_mode(self):
+        sync_directory(self.source, self.dest, link=True)
+        source_stat = os.stat(os.path.join(self.source, "index.css"))
+        dest_stat = os.stat(os.path.join(self.dest, "index.css"))
+        self.assertTrue(os.path.samestat(source_stat, dest_stat))
+
+    def test_copy_file_replaces_instead_of_modifying(self):
+        source = os.path.join(self.source, "index.css")
+        dest = self._write(self.dest, "index.css", "old")
+        other = os.path.join(self.tmp.name, "other.css")
+        os.link(dest, other)
+
+        copy_file(source, dest)
+        self.assertEqual(self._read(self.dest, "index.css"), "body {}")
+        # The other hardlink to the old file keeps its content
+        self.assertEqual(self._read(self.tmp.name, "other.css"), "old")
+        self.assertFalse(needs_copy(source, os.stat(source), dest))
+
+
+if __name__ == "__main__":
+    unittest.main()
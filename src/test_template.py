@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from template import Template, load_template, rewrite_root_urls
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_fills_slots(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render(Title="Home", Content="<p>Hi</p>"),
+            "<title>Home</title><main><p>Hi</p></main>",
+        )
+        self.assertEqual(template.slot_names, {"Title", "Content"})
+
+    def test_repeated_slot(self):
+        template = Template("{{ Title }} - {{ Title }}")
+        self.assertEqual(template.render(Title="A"), "A - A")
+
+    def test_missing_value_keeps_placeholder(self):
+        template = Template("<p>{{ Unknown }}</p>")
+        self.assertEqual(template.render(), "<p>{{ Unknown }}</p>")
+
+    def test_basepath_applied_at_compile_time(self):
+        template = Template('<link href="/index.css" /><img src="/logo.png" />{{ Content }}', "/site/")
+        self.assertEqual(
+            template.render(Content='<a href="/x">x</a>'),
+            '<link href="/site/index.css" /><img src="/site/logo.png" /><a href="/x">x</a>',
+        )
+
+    def test_stream_matches_render(self):
+        template = Template('<title>{{ Title }}</title><a href="/">{{ Content }}</a>{{ Other }}', "/site/")
+        chunks = []
+        template.stream(chunks.append, Title="T", Content=(part for part in ["<p>a</p>", "<p>b</p>"]))
+        self.assertEqual("".join(chunks), template.render(Title="T", Content="<p>a</p><p>b</p>"))
+
+    def test_rewrite_root_urls(self):
+        html = '<a href="/blog">b</a><img src="/a.png"><a href="https://x.y/">x</a>'
+        self.assertEqual(
+            rewrite_root_urls(html, "/site/"),
+            '<a href="/site/blog">b</a><img src="/site/a.png"><a href="https://x.y/">x</a>',
+        )
+        self.assertEqual(rewrite_root_urls(html, "/"), html)
+
+    def test_load_template_cached_until_changed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("<h1>{{ Title }}</h1>")
+
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+
+            with open(path, "w") as f:
+                f.write("<h2>{{ Title }}</h2>")
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+            second = load_template(path)
+            self.assertIsNot(second, first)
+            self.assertEqual(second.render(Title="T"), "<h2>T</h2>")
+
+
+if __name__ == "__main__":
+    unittest.main()
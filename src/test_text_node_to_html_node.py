@@ -4,6 +4,7 @@ from enum import Enum
 from textnode import TextNode, TextType
 from htmlnode import LeafNode
 from text_node_to_html_node import text_node_to_html_node
+from url_rewriter import UrlRewriter
 
 
 class TestTextNodeToHTMLNode(unittest.TestCase):
@@ -51,6 +52,11 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.props, {"src": "image.jpg", "alt": "Alt text for image"})
         self.assertIsInstance(html_node, LeafNode)
         
+    def test_link_with_rewriter(self):
+        node = TextNode("Home", TextType.LINK, "/blog/")
+        html_node = text_node_to_html_node(node, UrlRewriter("/site/"))
+        self.assertEqual(html_node.props, {"href": "/site/blog/"})
+        
     def test_invalid_type(self):
         # Create a mock TextNode with an invalid TextType
         class MockTextType(Enum):
@@ -0,0 +1,40 @@
+import unittest
+
+from url_rewriter import UrlRewriter, pretty_path, url_rewriter
+
+
+class TestUrlRewriter(unittest.TestCase):
+    def test_basepath(self):
+        rewriter = UrlRewriter("/site/")
+        self.assertEqual(rewriter("/blog/tom"), "/site/blog/tom")
+        self.assertEqual(rewriter("/"), "/site/")
+        self.assertEqual(rewriter("/a.png?v=2#top"), "/site/a.png?v=2#top")
+
+    def test_non_root_urls_unchanged(self):
+        rewriter = UrlRewriter("/site/", pretty_urls=True)
+        for url in ["https://example.com/", "//cdn.example.com/x.js", "images/a.png", "#top", ""]:
+            self.assertEqual(rewriter(url), url)
+
+    def test_pretty_urls(self):
+        rewriter = UrlRewriter("/", pretty_urls=True)
+        self.assertEqual(rewriter("/blog/tom/index.html"), "/blog/tom/")
+        self.assertEqual(rewriter("/contact.md#form"), "/contact/#form")
+        self.assertEqual(rewriter("/index.md"), "/")
+        self.assertEqual(rewriter("/index.css"), "/index.css")
+        self.assertEqual(pretty_path("/blog/tom"), "/blog/tom")
+
+    def test_fingerprints(self):
+        rewriter = UrlRewriter("/site/", fingerprints={"/index.css": "/index.3f2a.css"})
+        self.assertEqual(rewriter("/index.css"), "/site/index.3f2a.css")
+        self.assertFalse(rewriter.is_identity())
+        self.assertTrue(UrlRewriter().is_identity())
+
+    def test_url_rewriter(self):
+        rewriter = UrlRewriter("/x/")
+        self.assertIs(url_rewriter(rewriter), rewriter)
+        self.assertEqual(url_rewriter("/y/").basepath, "/y/")
+        self.assertEqual(UrlRewriter("/y/").key(), url_rewriter("/y/").key())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from build_manifest import BuildManifest
+import watch
+from watch import InotifyWatcher, PollingWatcher, SiteWatcher
+
+
+class TestWatchers(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "content"))
+        self.page = os.path.join(self.root, "content", "index.md")
+        self.template = os.path.join(self.root, "template.html")
+        for path in (self.page, self.template):
+            with open(path, "w") as f:
+                f.write("start")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _check_watcher(self, watcher):
+        try:
+            with open(self.page, "w") as f:
+                f.write("changed")
+            self.assertIn(self.page, watcher.read_changes(timeout=2))
+
+            os.makedirs(os.path.join(self.root, "content", "new"))
+            new_page = os.path.join(self.root, "content", "new", "index.md")
+            with open(new_page, "w") as f:
+                f.write("# New")
+            changes = set()
+            for _ in range(3):
+                changes |= watcher.read_changes(timeout=0.5)
+            self.assertIn(new_page, changes)
+
+            with open(self.template, "w") as f:
+                f.write("changed")
+            self.assertIn(self.template, watcher.read_changes(timeout=2))
+        finally:
+            watcher.close()
+
+    def test_polling_watcher(self):
+        watcher = PollingWatcher([os.path.join(self.root, "content")], [self.template], interval=0.01)
+        self._check_watcher(watcher)
+
+    def test_inotify_watcher(self):
+        try:
+            watcher = InotifyWatcher([os.path.join(self.root, "content")], [self.template])
+        except (OSError, AttributeError):
+            self.skipTest("inotify is not available")
+        self._check_watcher(watcher)
+
+    def test_timeout_returns_empty(self):
+        watcher = PollingWatcher([os.path.join(self.root, "content")], interval=0.01)
+        self.assertEqual(watcher.read_changes(timeout=0.05), set())
+
+
+class TestSiteWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self._write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self._write("content/index.md", "# Home")
+        self._write("content/about/index.md", "# About")
+        self._write("static/index.css", "body {}")
+        manifest = BuildManifest(".build/manifest.json", "template.html")
+        self.watcher = SiteWatcher(manifest)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_markdown_edit_rebuilds_one_page(self):
+        steps = self.watcher.plan({"content/about/index.md"})
+        self.assertEqual([action for action, _ in steps], ["page"])
+        self.assertEqual(steps[0][1].dest, os.path.join("docs", "about", "index.html"))
+
+    def test_template_edit_rebuilds_every_page(self):
+        steps = self.watcher.plan({"template.html"})
+        self.assertEqual(len(steps), 2)
+
+    def test_static_edit_and_delete(self):
+        steps = self.watcher.plan({"static/index.css"})
+        self.assertEqual(steps, [("copy", "index.css")])
+        self.watcher.run_steps(steps)
+        self.assertTrue(os.path.exists("docs/index.css"))
+
+        os.remove("static/index.css")
+        steps = self.watcher.plan({"static/index.css"})
+        self.assertEqual(steps, [("remove_static", "index.css")])
+        self.watcher.run_steps(steps)
+        self.assertFalse(os.path.exists("docs/index.css"))
+
+    def test_deleted_page_removes_output(self):
+        self.watcher.run_steps(self.watcher.plan({"template.html"}))
+        os.remove("content/about/index.md")
+        steps = self.watcher.plan({"content/about/index.md"})
+        self.assertEqual(steps, [("remove_page", os.path.join("docs", "about", "index.html"))])
+        self.watcher.run_steps(steps)
+        self.assertFalse(os.path.exists("docs/about"))
+
+    def test_listing_pages_follow_content(self):
+        self._write("content/blog/tom/index.md", "---\ntags: [tolkien]\n---\n# Tom")
+        self.watcher.refresh_jobs()
+        self.watcher.run_steps(self.watcher.plan({"template.html"}))
+        self.assertTrue(os.path.exists("docs/tags/tolkien/index.html"))
+
+        # Editing the body leaves the listings alone
+        self._write("content/blog/tom/index.md", "---\ntags: [tolkien]\n---\n# Tom\n\nMore")
+        self.assertEqual([action for action, _ in self.watcher.plan({"content/blog/tom/index.md"})], ["page"])
+
+        # Retagging rewrites them and removes the tag page that vanished
+        self._write("content/blog/tom/index.md", "---\ntags: [opinion]\n---\n# Tom")
+        steps = self.watcher.plan({"content/blog/tom/index.md"})
+        self.assertEqual([action for action, _ in steps], ["page", "listings"])
+        self.watcher.run_steps(steps)
+        self.assertTrue(os.path.exists("docs/tags/opinion/index.html"))
+        self.assertFalse(os.path.exists("docs/tags/tolkien"))
+
+    def test_edit_rereads_only_the_changed_page(self):
+        self._write("content/about/index.md", "---\ntitle: About us\n---\n# About")
+        with mock.patch("watch.read_page_meta", wraps=watch.read_page_meta) as read_page_meta, \
+                mock.patch("watch.collect_routes") as collect_routes:
+            self.watcher.plan({"content/about/index.md"})
+        self.assertEqual([call.args[0].source for call in read_page_meta.call_args_list],
+                         ["content/about/index.md"])
+        collect_routes.assert_not_called()
+        self.assertEqual(self.watcher.index.by_source["content/about/index.md"].title, "About us")
+
+    def test_cancelled_rebuild_returns_remaining_steps(self):
+        steps = self.watcher.plan({"template.html"})
+        calls = []
+
+        def cancelled():
+            calls.append(1)
+            return len(calls) > 1
+
+        remaining = self.watcher.run_steps(steps, cancelled)
+        self.assertEqual(remaining, steps[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
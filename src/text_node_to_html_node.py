@@ -1,7 +1,17 @@
 from textnode import TextNode, TextType
-from htmlnode import LeafNode
+from htmlnode import LeafNode, shared_props
 
-def text_node_to_html_node(text_node):
+def text_node_to_html_node(text_node, rewriter=None):
+    """
+    Convert a TextNode to a LeafNode.
+    
+    Args:
+        text_node: The TextNode to convert
+        rewriter: Optional UrlRewriter applied to LINK and IMAGE URLs
+        
+    Returns:
+        A LeafNode
+    """
     if text_node.text_type == TextType.TEXT:
         return LeafNode(None, text_node.text)
     elif text_node.text_type == TextType.BOLD:
@@ -11,8 +21,10 @@ def text_node_to_html_node(text_node):
     elif text_node.text_type == TextType.CODE:
         return LeafNode("code", text_node.text)
     elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        url = text_node.url if rewriter is None else rewriter(text_node.url)
+        return LeafNode("a", text_node.text, shared_props(href=url))
     elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        url = text_node.url if rewriter is None else rewriter(text_node.url)
+        return LeafNode("img", "", shared_props(src=url, alt=text_node.text))
     else:
         raise ValueError(f"Invalid TextType: {text_node.text_type}")
\ No newline at end of file
@@ -0,0 +1,90 @@
+import posixpath
+
+
+class UrlRewriter:
+    """
+    Resolves the URLs of links and images while the HTML tree is built.
+
+    Only root-relative URLs ("/blog/tom") are changed; absolute URLs,
+    protocol-relative URLs ("//cdn.example.com/x.js"), relative paths and
+    fragments are returned as they are.
+
+    Args:
+        basepath: Base URL path for the site (default: "/")
+        pretty_urls: Point links at directory URLs: "/blog/index.html",
+            "/blog/index.md" and "/blog.md" all become "/blog/"
+        fingerprints: Mapping of asset URL to its fingerprinted URL,
+            e.g. {"/index.css": "/index.3f2a9c.css"}
+    """
+
+    def __init__(self, basepath="/", pretty_urls=False, fingerprints=None):
+        self.basepath = basepath
+        self.pretty_urls = pretty_urls
+        self.fingerprints = dict(fingerprints or {})
+
+    def key(self):
+        """
+        A hashable value identifying the rewriter's configuration.
+        """
+        return (self.basepath, self.pretty_urls, tuple(sorted(self.fingerprints.items())))
+
+    def is_identity(self):
+        """
+        True if the rewriter never changes a URL.
+        """
+        return self.basepath == "/" and not self.pretty_urls and not self.fingerprints
+
+    def __call__(self, url):
+        """
+        Rewrite one URL.
+
+        Args:
+            url: The URL as written in the markdown or template
+
+        Returns:
+            The URL to put in the HTML
+        """
+        if not url or url[0] != "/" or url.startswith("//"):
+            return url
+
+        # Keep the query string and fragment out of the path handling
+        split_at = len(url)
+        for marker in ("?", "#"):
+            position = url.find(marker)
+            if position != -1:
+                split_at = min(split_at, position)
+        path, suffix = url[:split_at], url[split_at:]
+
+        if path in self.fingerprints:
+            path = self.fingerprints[path]
+        elif self.pretty_urls:
+            path = pretty_path(path)
+        return self.basepath + path[1:] + suffix
+
+
+def pretty_path(path):
+    """
+    Map a root-relative path to the directory URL of the page it names.
+
+    Args:
+        path: A root-relative path, e.g. "/blog/tom/index.html" or "/contact.md"
+
+    Returns:
+        The directory URL, e.g. "/blog/tom/" or "/contact/"
+    """
+    directory, name = posixpath.split(path)
+    stem, extension = posixpath.splitext(name)
+    if extension not in (".html", ".md"):
+        return path
+    if stem == "index":
+        return directory.rstrip("/") + "/"
+    return posixpath.join(directory, stem) + "/"
+
+
+def url_rewriter(basepath_or_rewriter):
+    """
+    Return a UrlRewriter for a base path string, or the rewriter itself.
+    """
+    if isinstance(basepath_or_rewriter, UrlRewriter):
+        return basepath_or_rewriter
+    return UrlRewriter(basepath_or_rewriter or "/")
@@ -0,0 +1,478 @@
+import os
+import time
+import queue
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from build_manifest import hash_file, remove_output_file
+from generate_pages_recursive import collect_routes
+from listing_pages import LISTING_PAGE_SIZE, generate_listing_pages, listing_fingerprint, plan_listing_pages
+from metadata_index import read_page_meta
+from page_executor import PageJob, render_job
+from static_sync import copy_file
+
+# inotify event flags (see inotify(7))
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+              IN_DELETE | IN_DELETE_SELF | IN_ATTRIB)
+
+# Header of each event read from an inotify file descriptor: wd, mask, cookie, len
+EVENT_HEADER = struct.Struct("iIII")
+
+# How long to wait for more events after the first one before rebuilding
+DEBOUNCE_SECONDS = 0.02
+
+
+class InotifyWatcher:
+    """
+    Watch directories recursively and single files with Linux inotify,
+    called through ctypes so no third-party package is needed.
+    """
+
+    def __init__(self, directories, files=()):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self._fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._dirs = {}
+        self._recursive = set()
+        self._files = {os.path.normpath(path) for path in files}
+
+        for directory in directories:
+            self._add_tree(os.path.normpath(directory))
+        for path in self._files:
+            self._add_watch(os.path.dirname(path) or ".")
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self._dirs[wd] = directory
+        return wd
+
+    def _add_tree(self, root):
+        """
+        Watch root and every directory below it.
+
+        Returns:
+            The files found, so a newly created tree can be reported as changed
+        """
+        found = []
+        for dirpath, _, filenames in os.walk(root):
+            self._add_watch(dirpath)
+            self._recursive.add(dirpath)
+            found.extend(os.path.join(dirpath, name) for name in filenames)
+        return found
+
+    def read_changes(self, timeout=None):
+        """
+        Wait for file changes.
+
+        Args:
+            timeout: Seconds to wait, or None to wait forever
+
+        Returns:
+            A set of changed file paths (empty if the timeout expired)
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        data = os.read(self._fd, 64 * 1024)
+        changes = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._dirs[wd]
+                continue
+
+            path = os.path.normpath(os.path.join(directory, name)) if name else directory
+            in_tree = directory in self._recursive
+            if mask & IN_ISDIR:
+                # A directory appeared inside a watched tree: watch it and
+                # report the files it already contains
+                if in_tree and mask & (IN_CREATE | IN_MOVED_TO):
+                    changes.update(self._add_tree(path))
+                elif in_tree and mask & IN_MOVED_FROM:
+                    changes.add(path)
+            elif in_tree or path in self._files:
+                changes.add(path)
+        return changes
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """
+    Portable fallback that detects changes by comparing file stats.
+    """
+
+    def __init__(self, directories, files=(), interval=0.5):
+        self.directories = [os.path.normpath(d) for d in directories]
+        self.files = [os.path.normpath(f) for f in files]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        paths = list(self.files)
+        for root in self.directories:
+            for dirpath, _, filenames in os.walk(root):
+                paths.extend(os.path.join(dirpath, name) for name in filenames)
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read_changes(self, timeout=None):
+        """
+        Wait for file changes.
+
+        Args:
+            timeout: Seconds to wait, or None to wait forever
+
+        Returns:
+            A set of changed file paths (empty if the timeout expired)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changes = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changes:
+                return changes
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+def create_watcher(directories, files=(), poll=False):
+    """
+    Create an inotify watcher, falling back to polling where inotify is
+    unavailable (or when poll is True).
+    """
+    if not poll:
+        try:
+            return InotifyWatcher(directories, files)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directories, files)
+
+
+class SiteWatcher:
+    """
+    Keep a built site up to date by rebuilding only what a change affects.
+
+    A .md edit regenerates the pages rendered from that file, a static file
+    edit copies or removes that one file, and a template edit regenerates
+    every page. Rebuilds run in this process, so the parser modules and the
+    compiled template stay warm between changes. If another change arrives
+    while a rebuild is running, the rebuild stops between two steps, the new
+    change is handled first and the unfinished steps are resumed after it.
+
+    The routes and metadata index are kept between changes: an edited page
+    only has its own header read again, and listing pages are only
+    rebuilt when its title, date, tags or summary changed.
+
+    The sitemap, feed and search index are left as the last full build
+    wrote them, and links are not re-checked.
+    """
+
+    def __init__(self, manifest, content_dir="content", static_dir="static",
+                 template_path="template.html", dest_dir="docs", basepath="/", drafts=False,
+                 page_size=LISTING_PAGE_SIZE):
+        self.manifest = manifest
+        self.content_dir = os.path.normpath(content_dir)
+        self.static_dir = os.path.normpath(static_dir)
+        self.template_path = os.path.normpath(template_path)
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.drafts = drafts
+        self.page_size = page_size
+        self.changes = queue.Queue()
+        self.jobs = []
+        self.routes = []
+        self.index = None
+        self.refresh_jobs()
+
+    def refresh_jobs(self):
+        """
+        Re-walk the content directory after files were added or removed.
+        """
+        print(f"Processing content directory: {self.content_dir}")
+        self.routes, self.index = collect_routes(self.content_dir, self.dest_dir, self.drafts)
+        print(f"Collected {len(self.routes)} pages")
+        self.jobs = [PageJob(route.source, self.template_path, route.dest, self.basepath)
+                     for route in self.routes]
+
+    def _reread_page(self, path):
+        """
+        Read an edited page's header again and update the index with it.
+
+        Returns:
+            None if the page's metadata is unchanged, "draft" if it became a
+            draft that is left out, else "changed"
+        """
+        old = self.index.by_source[path]
+        route = next(route for route in self.routes if route.source == path)
+        page = read_page_meta(route)
+        if page == old:
+            return None
+        if page.draft and not self.drafts:
+            return "draft"
+        self.index.replace(page)
+        return "changed"
+
+    def _plan_listings(self):
+        """
+        The listing pages the content calls for now, from the metadata index.
+        """
+        if not self.page_size:
+            return []
+        return plan_listing_pages(self.index, self.routes, self.dest_dir, self.page_size)
+
+    def _listing_dests(self):
+        """
+        The listing pages currently in the output.
+        """
+        return {os.path.join(self.dest_dir, key) for key, entry in self.manifest.pages.items()
+                if "listing" in entry}
+
+    def _listings_changed(self):
+        """
+        True if a listing page has to be written or removed.
+        """
+        listings = self._plan_listings()
+        if {listing.dest for listing in listings} != self._listing_dests():
+            return True
+        return any(self.manifest.listing_rebuild_reason(listing.dest, listing_fingerprint(listing))
+                   for listing in listings)
+
+    def _update_listings(self, force=False):
+        """
+        Regenerate the listing pages that changed and remove vanished ones.
+        """
+        listed = {listing.dest for listing in self._plan_listings()}
+        for dest in sorted(self._listing_dests() - listed):
+            if os.path.exists(dest):
+                print(f"Removing stale output: {dest}")
+                remove_output_file(dest, self.dest_dir)
+            self.manifest.forget(dest)
+        if self.page_size:
+            generate_listing_pages(self.index, self.routes, self.template_path, self.dest_dir, self.basepath,
+                                   self.manifest, page_size=self.page_size, force=force)
+
+    def _under(self, path, root):
+        return path == root or path.startswith(root + os.sep)
+
+    def plan(self, paths):
+        """
+        Turn a set of changed paths into an ordered list of rebuild steps.
+
+        Args:
+            paths: Changed file paths
+
+        Returns:
+            A list of (action, argument) tuples
+        """
+        steps = []
+        paths = {os.path.normpath(path) for path in paths}
+
+        if self.template_path in paths:
+            self.manifest.template_hash = hash_file(self.template_path)
+            steps = [("page", job) for job in self.jobs]
+            if self._listing_dests() or self._plan_listings():
+                steps.append(("listings", True))
+            return steps
+
+        content_paths = {p for p in paths if self._under(p, self.content_dir)}
+        known_sources = self.index.by_source
+        walk = False
+        listings_changed = False
+        for path in sorted(content_paths):
+            if not os.path.exists(path) or path not in known_sources:
+                walk = True
+                continue
+            reread = self._reread_page(path)
+            walk = walk or reread == "draft"
+            listings_changed = listings_changed or reread == "changed"
+        if walk:
+            # Pages were added, removed or turned into drafts: re-walk and
+            # drop outputs that vanished
+            old_dests = {job.dest for job in self.jobs}
+            self.refresh_jobs()
+            for dest in sorted(old_dests - {job.dest for job in self.jobs}):
+                steps.append(("remove_page", dest))
+
+        for job in self.jobs:
+            if job.source in content_paths:
+                self.manifest.invalidate(job.source)
+                steps.append(("page", job))
+
+        # Listing pages whose entries changed are rebuilt after the pages
+        if (walk or listings_changed) and self._listings_changed():
+            steps.append(("listings", False))
+
+        for path in sorted(paths):
+            if self._under(path, self.static_dir) and path != self.static_dir:
+                rel_path = os.path.relpath(path, self.static_dir)
+                if os.path.isfile(path):
+                    steps.append(("copy", rel_path))
+                elif not os.path.exists(path):
+                    steps.append(("remove_static", rel_path))
+        return steps
+
+    def run_step(self, step):
+        """
+        Execute one rebuild step and keep the manifest in sync with it.
+        """
+        action, argument = step
+        if action == "page":
+            _, links = render_job(argument)
+            self.manifest.record(argument.source, argument.dest, links)
+        elif action == "remove_page":
+            if os.path.exists(argument):
+                print(f"Removing stale output: {argument}")
+                remove_output_file(argument, self.dest_dir)
+            self.manifest.forget(argument)
+        elif action == "listings":
+            self._update_listings(force=argument)
+        elif action == "copy":
+            dest_path = os.path.join(self.dest_dir, argument)
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            print(f"Copying file: {os.path.join(self.static_dir, argument)} -> {dest_path}")
+            copy_file(os.path.join(self.static_dir, argument), dest_path)
+            if argument not in self.manifest.static_files:
+                self.manifest.static_files = sorted(self.manifest.static_files + [argument])
+        elif action == "remove_static":
+            dest_path = os.path.join(self.dest_dir, argument)
+            if os.path.lexists(dest_path):
+                print(f"Removing file: {dest_path}")
+                remove_output_file(dest_path, self.dest_dir)
+            self.manifest.static_files = [p for p in self.manifest.static_files if p != argument]
+        else:
+            raise ValueError(f"Unknown rebuild step: {action}")
+
+    def run_steps(self, steps, cancelled=None):
+        """
+        Execute rebuild steps until done or cancelled.
+
+        Args:
+            steps: List of steps from plan()
+            cancelled: Callable returning True when the rebuild should stop
+
+        Returns:
+            The steps that were not executed
+        """
+        for index, step in enumerate(steps):
+            if cancelled is not None and cancelled():
+                return steps[index:]
+            self.run_step(step)
+        return []
+
+    def _collect_changes(self, watcher, stop):
+        while not stop.is_set():
+            changes = watcher.read_changes(timeout=0.5)
+            if changes:
+                self.changes.put(changes)
+
+    def _drain(self, first):
+        """
+        Gather a burst of change notifications into one set.
+        """
+        paths = set(first)
+        time.sleep(DEBOUNCE_SECONDS)
+        while True:
+            try:
+                paths |= self.changes.get_nowait()
+            except queue.Empty:
+                return paths
+
+    def run(self, poll=False):
+        """
+        Watch the site sources and rebuild on every change until interrupted.
+        """
+        watcher = create_watcher([self.content_dir, self.static_dir], [self.template_path], poll)
+        kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+        print(f"Watching {self.content_dir}/, {self.static_dir}/ and {self.template_path} ({kind})")
+
+        stop = threading.Event()
+        thread = threading.Thread(target=self._collect_changes, args=(watcher, stop), daemon=True)
+        thread.start()
+
+        remaining = []
+        try:
+            while True:
+                paths = self._drain(self.changes.get())
+                started = time.perf_counter()
+
+                # New changes go first; work interrupted earlier resumes after them
+                steps = self.plan(paths)
+                steps += [step for step in remaining if step not in steps]
+                remaining = self.run_steps(steps, cancelled=lambda: not self.changes.empty())
+                self.manifest.save()
+
+                elapsed = (time.perf_counter() - started) * 1000
+                if remaining:
+                    print(f"Rebuild interrupted by a new change after {elapsed:.1f} ms")
+                else:
+                    print(f"Rebuilt {len(steps)} item(s) in {elapsed:.1f} ms")
+        except KeyboardInterrupt:
+            print("Stopping watch mode")
+        finally:
+            stop.set()
+            thread.join()
+            watcher.close()
+
+
+def serve(directory, port):
+    """
+    Serve a directory over HTTP from a background thread.
+
+    Files are looked up by path on every request, so the server keeps
+    working when the output directory is rebuilt or replaced.
+
+    Returns:
+        The running ThreadingHTTPServer
+    """
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"Serving {directory}/ at http://localhost:{port}/")
+    return server